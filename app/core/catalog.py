@@ -1,23 +1,25 @@
 from __future__ import annotations
 
 import os
+from typing import Final
 
 # Vote threshold: when a book title gets this many upvotes, auto-create & learn
-VOTE_THRESHOLD = int(os.getenv("VOTE_THRESHOLD", "3"))
+VOTE_THRESHOLD: Final[int] = int(os.getenv("VOTE_THRESHOLD", "3"))
 
 # Scheduled discovery interval in seconds (default 6 hours, 0 to disable)
-DISCOVERY_INTERVAL = int(os.getenv("DISCOVERY_INTERVAL", str(6 * 3600)))
+DISCOVERY_INTERVAL: Final[int] = int(os.getenv("DISCOVERY_INTERVAL", str(6 * 3600)))
 
 # Max books to discover per scheduled run
-DISCOVERY_BATCH_SIZE = int(os.getenv("DISCOVERY_BATCH_SIZE", "5"))
+DISCOVERY_BATCH_SIZE: Final[int] = int(os.getenv("DISCOVERY_BATCH_SIZE", "5"))
 
 # ─── Topic tags for interest-driven discovery ───
-TOPIC_TAGS = [
+# A tuple literal is folded into a single constant at compile time.
+TOPIC_TAGS: Final[tuple[str, ...]] = (
     "Psychology", "Philosophy", "Economics", "Physics",
     "Computer Science", "Biology", "History", "Mathematics",
     "Business & Strategy", "Neuroscience", "Literature",
     "Political Science", "Sociology", "Art & Design", "Self-Development",
-]
+)
 
 # Number of books to discover per topic
-TOPIC_DISCOVER_COUNT = int(os.getenv("TOPIC_DISCOVER_COUNT", "5"))
+TOPIC_DISCOVER_COUNT: Final[int] = int(os.getenv("TOPIC_DISCOVER_COUNT", "5"))
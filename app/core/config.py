@@ -14,6 +14,13 @@ _default_upload = "/tmp/uploads" if os.getenv("VERCEL") else str(DATA_DIR / "upl
 UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", _default_upload))
 DB_PATH = Path(os.getenv("DB_PATH", DATA_DIR / "chatbook.db"))
 
+# Read once at import: the auth/quota helpers consult this on every request.
+ENABLE_AUTH = bool(os.getenv("ENABLE_AUTH"))
+
+# Serverless runtimes freeze the process once the response is sent, so work
+# can't be left running on background threads there.
+IS_SERVERLESS = bool(os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+
 APP_NAME = os.getenv("APP_NAME", "Feynman")
 APP_TITLE = os.getenv("APP_TITLE", "Feynman")
 
@@ -60,3 +67,34 @@ NOVITA_EMBED_MODEL = os.getenv("NOVITA_EMBED_MODEL", "qwen/qwen3-embedding-0.6b"
 MAX_CHUNK_CHARS = int(os.getenv("MAX_CHUNK_CHARS", "1200"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "120"))
 TOP_K = int(os.getenv("TOP_K", "5"))
+# Best cosine score a catalog book's retrieved chunks must reach to answer
+# from them alone; weaker hits only win if no book content can be fetched
+# instead. Vectors are unit-normalized, so scores are plain cosines: with the
+# Gemini and OpenAI embedding models a best hit under 0.3 is rarely on topic.
+# 0 disables the gate.
+RAG_MIN_SCORE = float(os.getenv("RAG_MIN_SCORE", "0.3"))
+
+# On-disk format for new chunk vectors: "float16" (default) or "int8" (half the
+# bytes again, quantized per vector). Existing rows of any format stay readable.
+VECTOR_STORAGE = os.getenv("VECTOR_STORAGE", "float16").strip().lower()
+
+# Seconds an async chat waits on one provider before moving to the next
+# (slow-tail responses would otherwise stall the whole fallback chain). Set a
+# little above the providers' typical reply time; 0 waits for the full HTTP
+# timeout. Grounded (web search) calls routinely take 15-30s and get their own,
+# longer budget.
+CHAT_REQUEST_TIMEOUT = float(os.getenv("CHAT_REQUEST_TIMEOUT", "8"))
+CHAT_GROUNDED_TIMEOUT = float(os.getenv("CHAT_GROUNDED_TIMEOUT", "30"))
+
+# In-process cache for repeated LLM prompts: entry lifetime in seconds (0 disables) and max entries.
+CHAT_CACHE_TTL = int(os.getenv("CHAT_CACHE_TTL", "3600"))
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "1024"))
+
+# Worker threads for uploaded-book indexing and catalog-book learning. Kept
+# separate from the request threadpool so a burst of jobs can't starve it.
+INDEX_WORKERS = int(os.getenv("INDEX_WORKERS", "2"))
+LEARN_WORKERS = int(os.getenv("LEARN_WORKERS", "4"))
+
+# Seconds get_agent()/find_agent_by_name() results are reused within a process
+# (0 disables). Writes in the same process invalidate immediately.
+AGENT_CACHE_TTL = float(os.getenv("AGENT_CACHE_TTL", "5"))
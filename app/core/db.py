@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+import copy
 import json
 import logging
 import os
+import queue
+import threading
+import time
 import uuid
 from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import Any, Iterable
 
+import orjson
+
 log = logging.getLogger(__name__)
 
-from .config import DB_PATH, DATA_DIR
+from .config import AGENT_CACHE_TTL, DB_PATH, DATA_DIR
 
 _RAW_DATABASE_URL = os.getenv("DATABASE_URL", "") or os.getenv("POSTGRES_URL", "")
 
@@ -36,6 +42,11 @@ def _utcnow() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _loads(raw: str | bytes | None, default: str = "{}") -> Any:
+    """Parse a stored JSON column; orjson is several times faster than json on list reads."""
+    return orjson.loads(raw or default)
+
+
 def _ensure_dirs() -> None:
     if not _USE_PG:
         from pathlib import Path
@@ -48,6 +59,103 @@ def _pg():
     import psycopg2.extras
     return psycopg2
 
+
+# ─── SQLite connection pool ───
+# Opening a sqlite3 connection per call re-does the file open, schema parse
+# and PRAGMA setup every time, and throws away the page cache. Connections
+# are kept in a small per-path LIFO pool instead (keyed by path so tests that
+# patch DB_PATH get their own connections). The queue does the locking.
+
+_SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+_SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=8000",
+)
+# sqlite3 keeps an LRU of prepared statements per connection, keyed by SQL
+# text; pooled connections live long enough for it to pay off, so size it to
+# hold every distinct query in this module rather than the default 128.
+_SQLITE_STATEMENT_CACHE = 256
+_sqlite_pools: dict[str, queue.LifoQueue] = {}
+_sqlite_pools_lock = threading.Lock()
+_RO_SUFFIX = "?mode=ro"
+# create_vote's upsert needs the unique index on LOWER(title); init_db clears
+# this when the index can't be built and votes fall back to select-then-write.
+_votes_title_unique = True
+
+
+def _sqlite_connect(path: str, readonly: bool = False):
+    import sqlite3
+    if readonly:
+        # A mode=ro handle never takes the write lock, so readers don't queue
+        # behind a writer; query_only turns any accidental write into an error.
+        from pathlib import Path
+        uri = Path(path).resolve().as_uri() + _RO_SUFFIX
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=_SQLITE_STATEMENT_CACHE)
+        conn.execute("PRAGMA query_only=1")
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False, cached_statements=_SQLITE_STATEMENT_CACHE)
+    conn.row_factory = sqlite3.Row
+    for pragma in _SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _sqlite_pool(key: str) -> queue.LifoQueue:
+    with _sqlite_pools_lock:
+        pool = _sqlite_pools.get(key)
+        if pool is None:
+            pool = queue.LifoQueue(maxsize=_SQLITE_POOL_SIZE)
+            _sqlite_pools[key] = pool
+        return pool
+
+
+def _sqlite_release(pool: queue.LifoQueue, conn) -> None:
+    try:
+        pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def _close_sqlite_pools(path: str) -> None:
+    """Close every pooled connection (read/write and read-only) for `path`."""
+    for key in (path, path + _RO_SUFFIX):
+        with _sqlite_pools_lock:
+            pool = _sqlite_pools.pop(key, None)
+        while pool is not None and not pool.empty():
+            pool.get_nowait().close()
+
+
+@contextmanager
+def _sqlite_borrow(readonly: bool = False):
+    _ensure_dirs()
+    path = str(DB_PATH)
+    if readonly and not os.path.exists(path):
+        # mode=ro can't create the file; let a read-write handle create it
+        # (an empty database) rather than failing the read.
+        readonly = False
+    pool = _sqlite_pool(path + _RO_SUFFIX if readonly else path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _sqlite_connect(path, readonly)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            conn.close()
+            raise
+        _sqlite_release(pool, conn)
+        raise
+    else:
+        _sqlite_release(pool, conn)
+
+
 @contextmanager
 def get_conn():
     if _USE_PG:
@@ -63,15 +171,19 @@ def get_conn():
         finally:
             conn.close()
     else:
-        import sqlite3
-        _ensure_dirs()
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        try:
+        with _sqlite_borrow() as conn:
+            yield conn
+
+
+@contextmanager
+def get_ro_conn():
+    """Connection for read-only queries. SQLite uses a separate read-only pool."""
+    if _USE_PG:
+        with get_conn() as conn:
+            yield conn
+    else:
+        with _sqlite_borrow(readonly=True) as conn:
             yield conn
-            conn.commit()
-        finally:
-            conn.close()
 
 
 def _fetchone(conn, query: str, params: tuple = ()) -> dict[str, Any] | None:
@@ -106,15 +218,30 @@ def _execute(conn, query: str, params: tuple = ()):
         return conn.execute(query, params)
 
 
+_EXECUTEMANY_PAGE_SIZE = 500
+
+
 def _executemany(conn, query: str, params_list: list[tuple]):
     if _USE_PG:
+        import psycopg2.extras
         cur = conn.cursor()
-        for p in params_list:
-            cur.execute(query, p)
+        # execute_batch sends page_size statements per round-trip instead of one each
+        psycopg2.extras.execute_batch(cur, query, params_list, page_size=_EXECUTEMANY_PAGE_SIZE)
     else:
         conn.executemany(query, params_list)
 
 
+def _begin_write(conn) -> None:
+    """Open the write transaction up front for multi-statement writers.
+
+    On SQLite this takes the write lock once (BEGIN IMMEDIATE, which honours
+    busy_timeout) rather than per statement; PostgreSQL connections are
+    already inside a transaction.
+    """
+    if not _USE_PG and not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
 def _q(query: str) -> str:
     """Convert ? placeholders to %s for PostgreSQL."""
     if _USE_PG:
@@ -130,6 +257,8 @@ def _conflict_ignore(query: str) -> str:
 
 
 def init_db() -> None:
+    global _votes_title_unique
+    _agent_cache.clear()
     with get_conn() as conn:
         if _USE_PG:
             # ── Create tables (schema matches the latest version) ──
@@ -161,6 +290,26 @@ def init_db() -> None:
                 )
             """)
             _execute(conn, "CREATE INDEX IF NOT EXISTS idx_chunks_agent_id ON chunks(agent_id)")
+            # Case-insensitive title lookups (find_agent_by_name, catalog seeding)
+            _execute(conn, "CREATE INDEX IF NOT EXISTS idx_agents_name_lower ON agents(LOWER(name))")
+            _execute(conn, """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key TEXT PRIMARY KEY,
+                    vector BYTEA NOT NULL,
+                    dim INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            _execute(conn, """
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body BYTEA NOT NULL,
+                    fetched_at BIGINT NOT NULL
+                )
+            """)
+            _execute(conn, "CREATE INDEX IF NOT EXISTS idx_http_cache_fetched ON http_cache(fetched_at)")
             # Migration: add tsvector column for full-text search
             try:
                 _execute(conn, "SAVEPOINT sp_chunks_search_vec")
@@ -199,6 +348,18 @@ def init_db() -> None:
                     created_at TEXT NOT NULL
                 )
             """)
+            # Migration: one vote row per case-insensitive title so create_vote can upsert
+            try:
+                _execute(conn, "SAVEPOINT sp_votes_title_u")
+                _dedupe_votes(conn)
+                _execute(conn, "DROP INDEX IF EXISTS idx_votes_title_lower")
+                _execute(conn, "CREATE UNIQUE INDEX IF NOT EXISTS idx_votes_title_lower_u ON votes(LOWER(title))")
+                _execute(conn, "RELEASE SAVEPOINT sp_votes_title_u")
+                _votes_title_unique = True
+            except Exception:
+                log.exception("Failed to create unique index on votes(LOWER(title))")
+                _execute(conn, "ROLLBACK TO SAVEPOINT sp_votes_title_u")
+                _votes_title_unique = False
             _execute(conn, """
                 CREATE TABLE IF NOT EXISTS minds (
                     id TEXT PRIMARY KEY,
@@ -260,6 +421,7 @@ def init_db() -> None:
                 )
             """)
             _execute(conn, "CREATE INDEX IF NOT EXISTS idx_session_messages_session ON session_messages(session_id)")
+            _execute(conn, "CREATE INDEX IF NOT EXISTS idx_session_messages_created ON session_messages(session_id, created_at)")
 
             # AI-generated books
             _execute(conn, """
@@ -552,6 +714,11 @@ def init_db() -> None:
                     log.error(
                         "PK on mind_works(mind_id, agent_id) blocked by duplicates: %s", _e)
         else:
+            # WAL lets readers run alongside a writer and, with
+            # synchronous=NORMAL, avoids an fsync per commit. The journal
+            # mode is persisted in the database file, so setting it once here
+            # covers every pooled connection opened afterwards.
+            _execute(conn, "PRAGMA journal_mode=WAL")
             _execute(conn, """
                 CREATE TABLE IF NOT EXISTS agents (
                     id TEXT PRIMARY KEY,
@@ -578,6 +745,26 @@ def init_db() -> None:
                 )
             """)
             _execute(conn, "CREATE INDEX IF NOT EXISTS idx_chunks_agent_id ON chunks(agent_id)")
+            # Case-insensitive title lookups (find_agent_by_name, catalog seeding)
+            _execute(conn, "CREATE INDEX IF NOT EXISTS idx_agents_name_lower ON agents(LOWER(name))")
+            _execute(conn, """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    dim INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            _execute(conn, """
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body BLOB NOT NULL,
+                    fetched_at INTEGER NOT NULL
+                )
+            """)
+            _execute(conn, "CREATE INDEX IF NOT EXISTS idx_http_cache_fetched ON http_cache(fetched_at)")
             # FTS5 full-text search index for hybrid search
             _execute(conn, """
                 CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
@@ -614,6 +801,15 @@ def init_db() -> None:
                     created_at TEXT NOT NULL
                 )
             """)
+            # Migration: one vote row per case-insensitive title so create_vote can upsert
+            try:
+                _dedupe_votes(conn)
+                _execute(conn, "DROP INDEX IF EXISTS idx_votes_title_lower")
+                _execute(conn, "CREATE UNIQUE INDEX IF NOT EXISTS idx_votes_title_lower_u ON votes(LOWER(title))")
+                _votes_title_unique = True
+            except Exception:
+                log.exception("Failed to create unique index on votes(LOWER(title))")
+                _votes_title_unique = False
             _execute(conn, """
                 CREATE TABLE IF NOT EXISTS minds (
                     id TEXT PRIMARY KEY,
@@ -681,6 +877,7 @@ def init_db() -> None:
                 )
             """)
             _execute(conn, "CREATE INDEX IF NOT EXISTS idx_session_messages_session ON session_messages(session_id)")
+            _execute(conn, "CREATE INDEX IF NOT EXISTS idx_session_messages_created ON session_messages(session_id, created_at)")
 
             # AI-generated books
             _execute(conn, """
@@ -807,12 +1004,51 @@ def init_db() -> None:
         pass
 
 
+# ─── Agent read cache ───
+# get_agent() and find_agent_by_name() are called several times per chat
+# request. Hits are served for AGENT_CACHE_TTL seconds; every write to the
+# agents table in this process clears the cache, so only other workers' writes
+# can be seen late, by at most the TTL.
+
+class _AgentCache:
+    def __init__(self, ttl: float, maxsize: int = 10_000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: dict[tuple[str, str], tuple[float, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        # Callers are free to mutate what they get back.
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: tuple[str, str], agent: dict[str, Any]) -> None:
+        if self.ttl <= 0:
+            return
+        entry = (time.monotonic() + self.ttl, copy.deepcopy(agent))
+        with self._lock:
+            if len(self._data) >= self.maxsize:
+                self._data.clear()
+            self._data[key] = entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_agent_cache = _AgentCache(AGENT_CACHE_TTL)
+
+
 def create_agent(name: str, agent_type: str, source: str | None, meta: dict[str, Any], user_id: str | None = None) -> str:
     agent_id = str(uuid.uuid4())
     with get_conn() as conn:
         _execute(conn, _q(
             "INSERT INTO agents (id, name, type, source, status, meta_json, user_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
         ), (agent_id, name, agent_type, source, "indexing", json.dumps(meta), user_id, _utcnow()))
+    _agent_cache.clear()
     return agent_id
 
 
@@ -824,14 +1060,59 @@ def update_agent_status(agent_id: str, status: str, meta: dict[str, Any] | None
             _execute(conn, _q(
                 "UPDATE agents SET status = ?, meta_json = ? WHERE id = ?"
             ), (status, json.dumps(meta), agent_id))
+    _agent_cache.clear()
 
 
-def get_agent(agent_id: str) -> dict[str, Any] | None:
+def claim_agent_status(agent_id: str, expected: str, status: str) -> bool:
+    """Atomically move an agent from `expected` to `status`.
+
+    Returns True only for the caller whose UPDATE made the change, so it can be
+    used as a claim that holds across threads and worker processes.
+    """
     with get_conn() as conn:
+        cur = _execute(conn, _q(
+            "UPDATE agents SET status = ? WHERE id = ? AND status = ?"
+        ), (status, agent_id, expected))
+        claimed = cur.rowcount > 0
+    if claimed:
+        _agent_cache.clear()
+    return claimed
+
+
+def get_agent(agent_id: str) -> dict[str, Any] | None:
+    agent = _agent_cache.get(("id", agent_id))
+    if agent is not None:
+        return agent
+    with get_ro_conn() as conn:
         row = _fetchone(conn, _q("SELECT * FROM agents WHERE id = ?"), (agent_id,))
         if not row:
             return None
-        return _row_to_agent(row)
+        agent = _row_to_agent(row)
+    _agent_cache.set(("id", agent_id), agent)
+    return agent
+
+
+def list_agents_by_ids(agent_ids: list[str]) -> list[dict[str, Any]]:
+    """get_agent() for many ids in one query. Unknown ids are skipped; order follows `agent_ids`."""
+    found: dict[str, dict[str, Any]] = {}
+    misses: list[str] = []
+    for agent_id in dict.fromkeys(agent_ids):
+        agent = _agent_cache.get(("id", agent_id))
+        if agent is not None:
+            found[agent_id] = agent
+        else:
+            misses.append(agent_id)
+    if misses:
+        with get_ro_conn() as conn:
+            for start in range(0, len(misses), _EXECUTEMANY_PAGE_SIZE):
+                batch = misses[start:start + _EXECUTEMANY_PAGE_SIZE]
+                placeholders = ", ".join(["?"] * len(batch))
+                rows = _fetchall(conn, _q(f"SELECT * FROM agents WHERE id IN ({placeholders})"), tuple(batch))
+                for row in rows:
+                    agent = _row_to_agent(row)
+                    found[agent["id"]] = agent
+                    _agent_cache.set(("id", agent["id"]), agent)
+    return [found[agent_id] for agent_id in agent_ids if agent_id in found]
 
 
 def list_agents(limit: int | None = None) -> list[dict[str, Any]]:
@@ -847,20 +1128,19 @@ def list_agents(limit: int | None = None) -> list[dict[str, Any]]:
     if limit is not None:
         sql += " LIMIT ?"
         params = params + (limit,)
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         rows = _fetchall(conn, _q(sql), params)
         return [_row_to_agent(r) for r in rows]
 
 
 def _row_to_agent(row: dict[str, Any]) -> dict[str, Any]:
-    meta_json = row["meta_json"] or "{}"
     return {
         "id": row["id"],
         "name": row["name"],
         "type": row["type"],
         "source": row["source"],
         "status": row["status"],
-        "meta": json.loads(meta_json),
+        "meta": _loads(row["meta_json"]),
         "user_id": row.get("user_id"),
         "is_deleted": bool(row.get("is_deleted", False)),
         "created_at": row["created_at"],
@@ -869,6 +1149,7 @@ def _row_to_agent(row: dict[str, Any]) -> dict[str, Any]:
 
 def add_chunks(agent_id: str, chunk_records: Iterable[dict[str, Any]]) -> None:
     with get_conn() as conn:
+        _begin_write(conn)
         params_list = [
             (
                 rec["id"],
@@ -887,7 +1168,7 @@ def add_chunks(agent_id: str, chunk_records: Iterable[dict[str, Any]]) -> None:
 
 
 def get_chunks(agent_id: str) -> list[dict[str, Any]]:
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         return _fetchall(conn, _q(
             "SELECT id, chunk_index, text, vector, dim, norm FROM chunks WHERE agent_id = ? ORDER BY chunk_index ASC"
         ), (agent_id,))
@@ -895,7 +1176,7 @@ def get_chunks(agent_id: str) -> list[dict[str, Any]]:
 
 def get_chunks_text_only(agent_id: str) -> list[dict[str, Any]]:
     """Lightweight variant that skips vector/dim/norm — for the reader."""
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         return _fetchall(conn, _q(
             "SELECT id, chunk_index, text FROM chunks WHERE agent_id = ? ORDER BY chunk_index ASC"
         ), (agent_id,))
@@ -906,7 +1187,7 @@ def get_chunks_batch(agent_ids: list[str]) -> list[dict[str, Any]]:
     if not agent_ids:
         return []
     placeholders = ",".join(["?"] * len(agent_ids))
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         return _fetchall(conn, _q(
             f"SELECT id, agent_id, chunk_index, text, vector, dim, norm FROM chunks WHERE agent_id IN ({placeholders}) ORDER BY agent_id, chunk_index ASC"
         ), tuple(agent_ids))
@@ -914,7 +1195,7 @@ def get_chunks_batch(agent_ids: list[str]) -> list[dict[str, Any]]:
 
 def keyword_search_chunks(query: str, agent_ids: list[str] | None = None, limit: int = 30) -> list[dict[str, Any]]:
     """FTS keyword search over chunks. Returns [] if FTS is unavailable."""
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         if _USE_PG:
             where_agent = ""
             params: list = [query, query, limit]
@@ -1011,7 +1292,7 @@ def add_message(agent_id: str, role: str, content: str, user_id: str | None = No
 def list_messages(agent_id: str, limit: int = 50, user_id: str | None = None) -> list[dict[str, Any]]:
     if not user_id:
         return []
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         row = _fetchone(conn, _q(
             "SELECT id FROM chat_sessions WHERE session_type = 'book' AND mind_id = ? AND user_id = ?"
         ), (agent_id, user_id))
@@ -1023,17 +1304,88 @@ def list_messages(agent_id: str, limit: int = 50, user_id: str | None = None) ->
         return list(reversed(rows))
 
 
+# ─── Embedding cache ───
+
+def get_cached_embeddings(keys: list[str]) -> dict[str, bytes]:
+    """Return {key: float32 vector bytes} for the keys present in the cache."""
+    found: dict[str, bytes] = {}
+    if not keys:
+        return found
+    with get_ro_conn() as conn:
+        for start in range(0, len(keys), _EXECUTEMANY_PAGE_SIZE):
+            batch = keys[start:start + _EXECUTEMANY_PAGE_SIZE]
+            placeholders = ",".join(["?"] * len(batch))
+            rows = _fetchall(conn, _q(
+                f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})"
+            ), tuple(batch))
+            found.update((r["key"], bytes(r["vector"])) for r in rows)
+    return found
+
+
+def put_cached_embeddings(entries: list[tuple[str, bytes, int]]) -> None:
+    """Store (key, float32 vector bytes, dim) entries; existing keys are left as is."""
+    if not entries:
+        return
+    now = _utcnow()
+    binary = _pg().Binary if _USE_PG else bytes
+    with get_conn() as conn:
+        _begin_write(conn)
+        _executemany(conn, _conflict_ignore(_q(
+            "INSERT OR IGNORE INTO embedding_cache (key, vector, dim, created_at) VALUES (?, ?, ?, ?)"
+        )), [(key, binary(vector), dim, now) for key, vector, dim in entries])
+
+
+# ─── HTTP response cache ───
+
+def get_http_cache(url: str) -> dict[str, Any] | None:
+    """Cached response for *url*: {etag, last_modified, body, fetched_at} or None."""
+    with get_ro_conn() as conn:
+        row = _fetchone(conn, _q(
+            "SELECT etag, last_modified, body, fetched_at FROM http_cache WHERE url = ?"
+        ), (url,))
+    if not row:
+        return None
+    return {**row, "body": bytes(row["body"])}
+
+
+def put_http_cache(
+    url: str, etag: str | None, last_modified: str | None, body: bytes, fetched_at: int,
+    max_age: int | None = None,
+) -> None:
+    """Store a response body. With *max_age*, also drop entries not fetched or
+    revalidated within that many seconds of *fetched_at*, bounding the table."""
+    binary = _pg().Binary if _USE_PG else bytes
+    with get_conn() as conn:
+        _begin_write(conn)
+        _execute(conn, _q(
+            "INSERT INTO http_cache (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (url) DO UPDATE SET etag = excluded.etag, last_modified = excluded.last_modified, "
+            "body = excluded.body, fetched_at = excluded.fetched_at"
+        ), (url, etag, last_modified, binary(body), fetched_at))
+        if max_age is not None:
+            _execute(conn, _q("DELETE FROM http_cache WHERE fetched_at < ?"), (fetched_at - max_age,))
+
+
+def touch_http_cache(url: str, fetched_at: int) -> None:
+    """Mark a cached response as revalidated (HTTP 304) without rewriting its body."""
+    with get_conn() as conn:
+        _begin_write(conn)
+        _execute(conn, _q("UPDATE http_cache SET fetched_at = ? WHERE url = ?"), (fetched_at, url))
+
+
 # ─── Questions CRUD ───
 
 def add_questions(agent_id: str, questions: list[str]) -> None:
+    now = _utcnow()
     with get_conn() as conn:
+        _begin_write(conn)
         _executemany(conn, _q(
             "INSERT INTO questions (id, agent_id, text, created_at) VALUES (?, ?, ?, ?)"
-        ), [(str(uuid.uuid4()), agent_id, q, _utcnow()) for q in questions])
+        ), [(str(uuid.uuid4()), agent_id, q, now) for q in questions])
 
 
 def list_questions(agent_id: str) -> list[str]:
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         rows = _fetchall(conn, _q(
             "SELECT text FROM questions WHERE agent_id = ? ORDER BY created_at ASC"
         ), (agent_id,))
@@ -1042,10 +1394,38 @@ def list_questions(agent_id: str) -> list[str]:
 
 # ─── Votes CRUD ───
 
+def _dedupe_votes(conn) -> None:
+    """Fold case-insensitive duplicate vote titles into one row, summing counts."""
+    dup = _fetchone(conn, "SELECT 1 AS x FROM votes GROUP BY LOWER(title) HAVING COUNT(*) > 1 LIMIT 1")
+    if not dup:
+        return
+    _execute(conn, """
+        UPDATE votes SET count = (
+            SELECT SUM(v2.count) FROM votes v2 WHERE LOWER(v2.title) = LOWER(votes.title)
+        )
+        WHERE id IN (SELECT MIN(id) FROM votes GROUP BY LOWER(title) HAVING COUNT(*) > 1)
+    """)
+    _execute(conn, "DELETE FROM votes WHERE id NOT IN (SELECT MIN(id) FROM votes GROUP BY LOWER(title))")
+
+
 def create_vote(title: str) -> dict[str, Any]:
+    if not _votes_title_unique:
+        return _create_vote_without_upsert(title)
     with get_conn() as conn:
+        row = _fetchone(conn, _q(
+            "INSERT INTO votes (id, title, count, created_at) VALUES (?, ?, 1, ?) "
+            "ON CONFLICT ((LOWER(title))) DO UPDATE SET count = votes.count + 1 "
+            "RETURNING id, title, count"
+        ), (str(uuid.uuid4()), title, _utcnow()))
+        return {"id": row["id"], "title": row["title"], "count": row["count"]}
+
+
+def _create_vote_without_upsert(title: str) -> dict[str, Any]:
+    """create_vote() for a votes table missing its unique LOWER(title) index."""
+    with get_conn() as conn:
+        _begin_write(conn)
         existing = _fetchone(conn, _q(
-            "SELECT id, title, count, created_at FROM votes WHERE LOWER(title) = LOWER(?)"
+            "SELECT id, title, count FROM votes WHERE LOWER(title) = LOWER(?)"
         ), (title,))
         if existing:
             _execute(conn, _q("UPDATE votes SET count = count + 1 WHERE id = ?"), (existing["id"],))
@@ -1059,16 +1439,18 @@ def create_vote(title: str) -> dict[str, Any]:
 
 def upvote(vote_id: str) -> dict[str, Any] | None:
     with get_conn() as conn:
-        row = _fetchone(conn, _q("SELECT id, title, count FROM votes WHERE id = ?"), (vote_id,))
+        row = _fetchone(conn, _q(
+            "UPDATE votes SET count = count + 1 WHERE id = ? RETURNING id, title, count"
+        ), (vote_id,))
         if not row:
             return None
-        _execute(conn, _q("UPDATE votes SET count = count + 1 WHERE id = ?"), (vote_id,))
-        return {"id": row["id"], "title": row["title"], "count": row["count"] + 1}
+        return {"id": row["id"], "title": row["title"], "count": row["count"]}
 
 
 def delete_agent(agent_id: str, user_id: str | None = None) -> bool:
     """Soft-delete: mark agent as deleted. Only the uploader (owner) may delete."""
     with get_conn() as conn:
+        _begin_write(conn)
         agent = _fetchone(conn, _q("SELECT user_id FROM agents WHERE id = ?"), (agent_id,))
         if not agent:
             return False
@@ -1078,11 +1460,13 @@ def delete_agent(agent_id: str, user_id: str | None = None) -> bool:
         cur = _execute(conn, _q(
             "UPDATE agents SET is_deleted = ? WHERE id = ?"
         ), (deleted_val, agent_id))
-        return cur.rowcount > 0
+        deleted = cur.rowcount > 0
+    _agent_cache.clear()
+    return deleted
 
 
 def list_votes() -> list[dict[str, Any]]:
-    with get_conn() as conn:
+    with get_ro_conn() as conn:
         return _fetchall(conn, "SELECT id, title, count, created_at FROM votes ORDER BY count DESC")
 
 
@@ -1090,23 +1474,7 @@ def list_votes() -> list[dict[str, Any]]:
 
 def ensure_catalog_agents(catalog: list[dict[str, Any]]) -> None:
     """Idempotently seed catalog books as agents. Skips titles that already exist."""
-    with get_conn() as conn:
-        existing_rows = _fetchall(conn, "SELECT name FROM agents")
-        existing = {row["name"].lower() for row in existing_rows}
-        for book in catalog:
-            if book["title"].lower() in existing:
-                continue
-            agent_id = str(uuid.uuid4())
-            meta = {
-                "title": book["title"],
-                "author": book.get("author", ""),
-                "isbn": book.get("isbn"),
-                "category": book.get("category", ""),
-                "description": book.get("description", ""),
-            }
-            _execute(conn, _q(
-                "INSERT INTO agents (id, name, type, source, status, meta_json, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
-            ), (agent_id, book["title"], "catalog", book.get("author", ""), "catalog", json.dumps(meta), _utcnow()))
+    create_catalog_agents_bulk(catalog)
 
 
 def rename_agent(agent_id: str, new_name: str) -> None:
@@ -1123,28 +1491,70 @@ def rename_agent(agent_id: str, new_name: str) -> None:
         _execute(conn, _q(
             "UPDATE ai_books SET title = ?, updated_at = ? WHERE agent_id = ?"
         ), (new_name, _utcnow(), agent_id))
+    _agent_cache.clear()
 
 
 def update_agent_meta(agent_id: str, updates: dict[str, Any]) -> None:
     """Merge updates into agent's meta_json without overwriting other keys."""
+    if not updates:
+        return
+    # Merge in the database in one statement instead of SELECT + parse + dump + UPDATE.
+    if _USE_PG:
+        sql = "UPDATE agents SET meta_json = (COALESCE(meta_json, '{}')::jsonb || %s::jsonb)::text WHERE id = %s"
+        params: tuple[Any, ...] = (json.dumps(updates), agent_id)
+    else:
+        # json_set (not json_patch) keeps dict.update semantics: nested dicts are
+        # replaced rather than deep-merged and None is stored as null.
+        pairs = ", ".join(["?, json(?)"] * len(updates))
+        sql = f"UPDATE agents SET meta_json = json_set(COALESCE(meta_json, '{{}}'), {pairs}) WHERE id = ?"
+        params = tuple(
+            v for key, value in updates.items() for v in ("$." + json.dumps(key), json.dumps(value))
+        ) + (agent_id,)
     with get_conn() as conn:
-        row = _fetchone(conn, _q("SELECT meta_json FROM agents WHERE id = ?"), (agent_id,))
-        if not row:
-            return
-        meta = json.loads(row["meta_json"] or "{}")
-        meta.update(updates)
-        _execute(conn, _q("UPDATE agents SET meta_json = ? WHERE id = ?"), (json.dumps(meta), agent_id))
+        _execute(conn, sql, params)
+    _agent_cache.clear()
 
 
 def find_agent_by_name(name: str) -> dict[str, Any] | None:
     """Find an agent by name (case-insensitive)."""
-    with get_conn() as conn:
+    agent = _agent_cache.get(("name", name.lower()))
+    if agent is not None:
+        return agent
+    with get_ro_conn() as conn:
         row = _fetchone(conn, _q(
             "SELECT * FROM agents WHERE LOWER(name) = LOWER(?)"
         ), (name,))
         if not row:
             return None
-        return _row_to_agent(row)
+        agent = _row_to_agent(row)
+    _agent_cache.set(("name", name.lower()), agent)
+    return agent
+
+
+def find_agents_by_names(names: list[str]) -> dict[str, dict[str, Any]]:
+    """find_agent_by_name() for many names in one query, keyed by lowercased name."""
+    found: dict[str, dict[str, Any]] = {}
+    misses: list[str] = []
+    for key in dict.fromkeys(name.lower() for name in names):
+        agent = _agent_cache.get(("name", key))
+        if agent is not None:
+            found[key] = agent
+        else:
+            misses.append(key)
+    if misses:
+        with get_ro_conn() as conn:
+            for start in range(0, len(misses), _EXECUTEMANY_PAGE_SIZE):
+                batch = misses[start:start + _EXECUTEMANY_PAGE_SIZE]
+                placeholders = ", ".join(["LOWER(?)"] * len(batch))
+                rows = _fetchall(conn, _q(
+                    f"SELECT * FROM agents WHERE LOWER(name) IN ({placeholders})"
+                ), tuple(batch))
+                for row in rows:
+                    key = row["name"].lower()
+                    if key not in found:
+                        found[key] = _row_to_agent(row)
+                        _agent_cache.set(("name", key), found[key])
+    return found
 
 
 def find_existing_upload(name: str) -> dict[str, Any] | None:
@@ -1171,9 +1581,67 @@ def create_catalog_agent(title: str, author: str = "", isbn: str | None = None,
         _execute(conn, _q(
             "INSERT INTO agents (id, name, type, source, status, meta_json, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
         ), (agent_id, title, "catalog", author, "catalog", json.dumps(meta), _utcnow()))
+    _agent_cache.clear()
     return agent_id
 
 
+def _agent_ids_by_name(conn, titles: list[str]) -> dict[str, str]:
+    """Map lowercased title -> agent id for the titles that already exist.
+
+    Probes idx_agents_name_lower with bounded IN lists instead of reading every
+    agent name; chunks stay well under SQLite's bound-parameter limit.
+    """
+    ids: dict[str, str] = {}
+    for start in range(0, len(titles), _EXECUTEMANY_PAGE_SIZE):
+        batch = titles[start:start + _EXECUTEMANY_PAGE_SIZE]
+        placeholders = ", ".join(["LOWER(?)"] * len(batch))
+        rows = _fetchall(conn, _q(
+            f"SELECT id, name FROM agents WHERE LOWER(name) IN ({placeholders})"
+        ), tuple(batch))
+        ids.update((r["name"].lower(), r["id"]) for r in rows)
+    return ids
+
+
+def create_catalog_agents_bulk(books: list[dict[str, Any]]) -> list[tuple[str, bool]]:
+    """Create catalog agents for many discovered books on one connection.
+
+    Each book dict takes the keyword arguments of create_catalog_agent (`title`
+    required). Returns one (agent_id, created) pair per input book, in order;
+    titles that already exist (case-insensitively) map to the existing agent.
+    """
+    titles = [b["title"] for b in books]
+    if not titles:
+        return []
+    now = _utcnow()
+    with get_conn() as conn:
+        _begin_write(conn)
+        ids = _agent_ids_by_name(conn, titles)
+        existing = set(ids)
+        params_list = []
+        for book in books:
+            key = book["title"].lower()
+            if key in ids:
+                continue
+            meta = {
+                "title": book["title"], "author": book.get("author", ""), "isbn": book.get("isbn"),
+                "category": book.get("category", ""), "description": book.get("description", ""),
+            }
+            ids[key] = str(uuid.uuid4())
+            params_list.append((ids[key], book["title"], "catalog", meta["author"], "catalog", json.dumps(meta), now))
+        if params_list:
+            _executemany(conn, _q(
+                "INSERT INTO agents (id, name, type, source, status, meta_json, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)"
+            ), params_list)
+    if params_list:
+        _agent_cache.clear()
+    result = []
+    for title in titles:
+        key = title.lower()
+        result.append((ids[key], key not in existing))
+        existing.add(key)
+    return result
+
+
 # ─── Minds CRUD ───
 
 def create_mind(data: dict[str, Any]) -> str:
@@ -1247,8 +1715,8 @@ def _row_to_mind(row: dict[str, Any]) -> dict[str, Any]:
         "bio_summary": row["bio_summary"] or "",
         "persona": row["persona"],
         "thinking_style": row["thinking_style"] or "",
-        "typical_phrases": json.loads(row["typical_phrases"] or "[]"),
-        "works": json.loads(row["works"] or "[]"),
+        "typical_phrases": _loads(row["typical_phrases"], "[]"),
+        "works": _loads(row["works"], "[]"),
         "avatar_seed": row["avatar_seed"] or "",
         "version": row["version"],
         "chat_count": row["chat_count"],
@@ -1475,7 +1943,7 @@ def _row_to_session(row: dict[str, Any]) -> dict[str, Any]:
         "title": row["title"],
         "session_type": row.get("session_type", "chat"),
         "mind_id": row.get("mind_id"),
-        "meta": json.loads(row.get("meta_json") or "{}"),
+        "meta": _loads(row.get("meta_json")),
         "updated_at": row["updated_at"],
         "created_at": row["created_at"],
     }
@@ -1513,7 +1981,7 @@ def list_session_messages(session_id: str, user_id: str | None = None) -> list[d
             "SELECT id, role, content, meta_json, created_at FROM session_messages WHERE session_id = ? ORDER BY created_at ASC"
         ), (session_id,))
         return [{"id": r["id"], "role": r["role"], "content": r["content"],
-                 "meta": json.loads(r.get("meta_json") or "{}"), "created_at": r["created_at"]} for r in rows]
+                 "meta": _loads(r.get("meta_json")), "created_at": r["created_at"]} for r in rows]
 
 
 # ─── Pro: User & Usage helpers ───
@@ -1847,6 +2315,7 @@ def update_ai_book_status(book_id: str, status: str) -> None:
                     agent_status = "ready" if row["chapters_written"] > 0 else "error"
                 _execute(conn, _q("UPDATE agents SET status = ? WHERE id = ?"),
                          (agent_status, row["agent_id"]))
+    _agent_cache.clear()
 
 
 def update_ai_book_chapter(book_id: str, chapter_num: int, chapter_data: dict[str, Any]) -> None:
@@ -1855,7 +2324,7 @@ def update_ai_book_chapter(book_id: str, chapter_num: int, chapter_data: dict[st
         row = _fetchone(conn, _q("SELECT content_json, chapters_written FROM ai_books WHERE id = ?"), (book_id,))
         if not row:
             return
-        content = json.loads(row["content_json"] or "{}")
+        content = _loads(row["content_json"])
         content[str(chapter_num)] = chapter_data
         written = row["chapters_written"] + 1
         _execute(conn, _q(
@@ -1871,9 +2340,9 @@ def _row_to_ai_book(row: dict[str, Any]) -> dict[str, Any]:
         "status": row["status"],
         "title": row["title"],
         "description": row["description"],
-        "outline": json.loads(row["outline_json"] or "{}"),
-        "content": json.loads(row["content_json"] or "{}"),
-        "preferences": json.loads(row["preferences_json"] or "{}"),
+        "outline": _loads(row["outline_json"]),
+        "content": _loads(row["content_json"]),
+        "preferences": _loads(row["preferences_json"]),
         "chapters_total": row["chapters_total"],
         "chapters_written": row["chapters_written"],
         "created_at": row["created_at"],
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Any, Callable
+
+from .db import get_cached_embeddings, put_cached_embeddings
+
+log = logging.getLogger(__name__)
+
+# Content-addressed embedding cache: identical (model, task_type, text) inputs
+# are embedded once and served from the database afterwards. Vectors are kept
+# as full float32 so cached and freshly computed results are interchangeable.
+#
+# Only document embeddings are stored: chunks come back when a book is
+# re-indexed, whereas chat queries are mostly one-off, and storing each one
+# would put a write on the query path and grow the table without bound.
+_CACHED_TASK_TYPES = frozenset({"RETRIEVAL_DOCUMENT"})
+
+
+def _cache_key(model: str, task_type: str | None, text: str) -> str:
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=20).hexdigest()
+    return f"{model}:{task_type or ''}:{digest}"
+
+
+def get_or_compute_many(
+    texts: list[str],
+    model: str,
+    task_type: str | None,
+    compute_batch: Callable[[list[str]], list[list[float]]],
+) -> list[list[float]]:
+    """Embed `texts`, calling `compute_batch` only for texts not already cached."""
+    if not texts:
+        return []
+    import numpy as np  # deferred like the indexer's: only needed once embedding
+
+    keys = [_cache_key(model, task_type, t) for t in texts]
+    try:
+        cached = get_cached_embeddings(list(dict.fromkeys(keys)))
+    except Exception as exc:
+        log.debug("Embedding cache lookup failed: %s", exc)
+        cached = {}
+
+    miss_idx = [i for i, key in enumerate(keys) if key not in cached]
+    computed: list[list[float]] = []
+    if miss_idx:
+        computed = compute_batch([texts[i] for i in miss_idx])
+        if len(computed) != len(miss_idx):
+            # Let the caller's own count check report the provider error.
+            return computed
+        fresh: dict[str, tuple[bytes, int]] = {}
+        for i, vec in zip(miss_idx, computed):
+            arr = np.asarray(vec, dtype=np.float32)
+            fresh[keys[i]] = (arr.tobytes(), arr.shape[0])
+        try:
+            put_cached_embeddings([(key, blob, dim) for key, (blob, dim) in fresh.items()])
+        except Exception as exc:
+            log.debug("Embedding cache store failed: %s", exc)
+
+    results: list[list[float]] = [None] * len(texts)  # type: ignore[list-item]
+    for i, vec in zip(miss_idx, computed):
+        results[i] = vec
+    for i, key in enumerate(keys):
+        if results[i] is None:
+            results[i] = np.frombuffer(cached[key], dtype=np.float32).tolist()
+    return results
+
+
+def embed_with_cache(embedder: Any, texts: list[str], task_type: str | None = None) -> list[list[float]]:
+    """embedder.embed_texts() behind the cache, keyed by provider and model name.
+
+    Repeated texts (boilerplate pages, recurring headings) are embedded once
+    and their vector shared. Query embeddings, and providers without a
+    concrete model name, are computed directly without touching the cache.
+    """
+    unique = list(dict.fromkeys(texts))
+    model = getattr(embedder, "embed_model", None)
+    if task_type not in _CACHED_TASK_TYPES or not isinstance(model, str) or not model:
+        vectors = embedder.embed_texts(unique, task_type=task_type)
+    else:
+        vectors = get_or_compute_many(
+            unique,
+            f"{embedder.name}:{model}",
+            task_type,
+            lambda batch: embedder.embed_texts(batch, task_type=task_type),
+        )
+    if len(unique) == len(texts) or len(vectors) != len(unique):
+        # Nothing to broadcast, or a count mismatch for the caller to report.
+        return vectors
+    by_text = dict(zip(unique, vectors))
+    return [by_text[t] for t in texts]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+
+import httpx
+
+# One pooled client per purpose, created on first use and kept for the life of
+# the process so repeated calls to the same host reuse TCP/TLS connections.
+# Callers pass their own per-request timeout.
+
+_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60)
+
+_clients: dict[str, httpx.Client] = {}
+_clients_lock = threading.Lock()
+# Async clients belong to the event loop that first used them; the app runs a
+# single loop, so one per purpose is enough.
+_async_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def get_client(name: str) -> httpx.Client:
+    """Return the shared client for `name` (e.g. "providers", "sources")."""
+    client = _clients.get(name)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = httpx.Client(timeout=60, limits=_LIMITS)
+            _clients[name] = client
+        return client
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """Async counterpart of get_client(), for use from the event loop."""
+    client = _async_clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=60, limits=_LIMITS)
+        _async_clients[name] = client
+    return client
+
+
+async def aclose_clients() -> None:
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def close_clients() -> None:
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+def _forget_clients_after_fork() -> None:
+    # The child must not reuse sockets owned by the parent; drop (don't close)
+    # the inherited clients and let the child open its own on first use.
+    global _clients_lock
+    _clients.clear()
+    _async_clients.clear()
+    _clients_lock = threading.Lock()
+
+
+atexit.register(close_clients)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_clients_after_fork)
@@ -1,36 +1,99 @@
 from __future__ import annotations
 
 import hashlib
+import logging
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-import numpy as np
-
-from .db import add_chunks, get_agent, update_agent_status
+from .config import IS_SERVERLESS, VECTOR_STORAGE
+from .db import add_chunks, get_agent, update_agent_meta, update_agent_status
+from .embed_cache import embed_with_cache
 from .providers import pick_provider, ProviderError
 from .questions import generate_questions
 from .text_utils import chunk_text
 
+log = logging.getLogger(__name__)
+
+# Question generation is an LLM round-trip; run it off the indexing path so the
+# agent is marked ready as soon as its chunks are stored.
+_DEFER_QUESTIONS = not IS_SERVERLESS
+_questions_pool: ThreadPoolExecutor | None = None
+_questions_pool_lock = threading.Lock()
+
+
+def _get_questions_pool() -> ThreadPoolExecutor:
+    global _questions_pool
+    with _questions_pool_lock:
+        if _questions_pool is None:
+            _questions_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="questions")
+        return _questions_pool
 
-def _vector_bytes(values: list[float]) -> tuple[bytes, int, float]:
-    array = np.array(values, dtype=np.float32)
-    norm = float(np.linalg.norm(array))
-    if norm == 0.0:
-        norm = 1.0
-    return array.tobytes(), array.shape[0], norm
+
+def _vector_rows(embeddings: list[list[float]]) -> list[tuple[bytes, int, float]]:
+    """Pack embeddings into (bytes, dim, norm) rows in one vectorized pass.
+
+    Vectors are stored L2-normalized (norm 1.0) so retrieval scores by a plain
+    dot product. With VECTOR_STORAGE=int8 each vector is instead scaled so its
+    largest component is ±127, and the norm of the int8 vector is stored:
+    dividing by it on load recovers the unit vector.
+    """
+    import numpy as np  # deferred: only indexing needs it, not importers of this module
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2:
+        raise ProviderError("Embeddings have inconsistent dimensions")
+    dim = matrix.shape[1]
+    if VECTOR_STORAGE == "int8":
+        peaks = np.abs(matrix).max(axis=1)
+        peaks[peaks == 0.0] = 1.0
+        packed = np.rint(matrix * (127.0 / peaks)[:, None]).astype(np.int8)
+        wide = packed.astype(np.float32)
+        qnorms = np.sqrt(np.einsum("ij,ij->i", wide, wide))
+        return [(packed[i].tobytes(), dim, float(qnorms[i])) for i in range(packed.shape[0])]
+
+    norms = np.einsum("ij,ij->i", matrix, matrix)
+    np.sqrt(norms, out=norms)
+    norms[norms == 0.0] = 1.0
+    matrix /= norms[:, None]
+    # Stored as float16: cosine ranking is insensitive to the lost precision and
+    # it halves the BLOB bytes read per query. Readers infer the width from dim.
+    packed = matrix.astype(np.float16)
+    return [(packed[i].tobytes(), dim, 1.0) for i in range(packed.shape[0])]
 
 
 def _content_hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+def _generate_questions_later(agent_id: str, text: str) -> None:
+    try:
+        questions = generate_questions(agent_id, text)
+        update_agent_meta(agent_id, {"questions": questions})
+    except Exception as exc:
+        log.warning("Question generation failed for agent %s: %s", agent_id, exc)
+
+
+def schedule_questions(agent_id: str, text: str) -> None:
+    """Generate study questions for a freshly indexed agent in the background.
+
+    Call only after the agent's meta has been written: the job merges its
+    questions into meta, and a later full-meta write would erase them. A no-op
+    when questions are generated inline (serverless).
+    """
+    if _DEFER_QUESTIONS:
+        _get_questions_pool().submit(_generate_questions_later, agent_id, text[:3000])
+
+
 def index_text(agent_id: str, text: str, update_status: bool = True, force: bool = False) -> dict[str, Any]:
     """Index text into chunks + embeddings.
 
     Args:
         update_status: If True (default), sets agent status to "ready" with meta.
             If False, only indexes and returns meta without changing status.
-            Use False when the caller needs to merge additional data into meta first.
+            Use False when the caller needs to merge additional data into meta first;
+            it must then call schedule_questions() once it has written meta.
         force: If True, re-index even if content hash matches.
     """
     content_hash = _content_hash(text)
@@ -45,13 +108,12 @@ def index_text(agent_id: str, text: str, update_status: bool = True, force: bool
         raise ValueError("No text to index")
 
     embedder = pick_provider("embed")
-    embeddings = embedder.embed_texts(chunks, task_type="RETRIEVAL_DOCUMENT")
+    embeddings = embed_with_cache(embedder, chunks, task_type="RETRIEVAL_DOCUMENT")
     if len(embeddings) != len(chunks):
         raise ProviderError("Embedding count mismatch")
 
     records = []
-    for idx, (chunk, emb) in enumerate(zip(chunks, embeddings)):
-        vector_bytes, dim, norm = _vector_bytes(emb)
+    for idx, (chunk, (vector_bytes, dim, norm)) in enumerate(zip(chunks, _vector_rows(embeddings))):
         records.append(
             {
                 "id": str(uuid.uuid4()),
@@ -65,16 +127,20 @@ def index_text(agent_id: str, text: str, update_status: bool = True, force: bool
 
     add_chunks(agent_id, records)
 
-    # Generate study questions from a sample of the text
-    questions = generate_questions(agent_id, text)
-
     meta = {
         "chunk_count": len(chunks),
         "embed_provider": embedder.name,
         "embed_model": getattr(embedder, "embed_model", None),
-        "questions": questions,
         "content_hash": content_hash,
+        # Changes on every (re)index so in-memory chunk stores keyed on it go stale
+        "index_id": uuid.uuid4().hex,
     }
+    # Generate study questions from a sample of the text. Deferred questions land
+    # in the questions table (what the API reads) and are merged into meta after
+    # the status write below, which replaces meta wholesale.
+    if not _DEFER_QUESTIONS:
+        meta["questions"] = generate_questions(agent_id, text)
     if update_status:
         update_agent_status(agent_id, "ready", meta)
+        schedule_questions(agent_id, text)
     return meta
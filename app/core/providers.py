@@ -1,18 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import itertools
+import json
 import logging
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Iterator
 
 import httpx
+import orjson
 
 from . import config
+from .http_client import get_async_client, get_client
 
 log = logging.getLogger(__name__)
 
 _CHAT_TIMEOUT = 30
 _EMBED_TIMEOUT = 60
+_OPENAI_EMBED_BATCH = 256  # inputs per /embeddings request (API cap is 2048 and ~300k tokens)
 
 
 class ProviderError(RuntimeError):
@@ -32,6 +42,7 @@ class ChatResult:
     raw: dict[str, Any]
     grounding: list[dict[str, str]] | None = None  # [{title, url, snippet}]
     usage: TokenUsage | None = None
+    cached: bool = False  # served from _chat_cache; no tokens were spent
 
 
 class BaseProvider:
@@ -49,6 +60,45 @@ class BaseProvider:
     def chat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
         raise NotImplementedError
 
+    async def achat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+        """Async chat(). Providers without a native async client run chat() on a worker thread."""
+        return await asyncio.to_thread(
+            self.chat, system=system, user=user, history=history, use_grounding=use_grounding, timeout=timeout,
+        )
+
+    def chat_stream(self, system: str, user: str, history: list[dict[str, str]] | None = None, timeout: int | None = None) -> Iterator[str]:
+        """Yield the reply as text fragments. Providers without streaming yield it whole."""
+        yield self.chat(system=system, user=user, history=history, timeout=timeout).content
+
+
+# ─── Streaming (server-sent events) ───
+
+def _sse_events(resp: httpx.Response) -> Iterator[str]:
+    """Data payload of each event in an SSE response; iter_lines() rejoins lines split across reads."""
+    data: list[str] = []
+    for line in resp.iter_lines():
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[6:] if line.startswith("data: ") else line[5:])
+    if data:
+        yield "\n".join(data)
+
+
+def _stream_events(name: str, url: str, headers: dict[str, str], payload: dict[str, Any], timeout: int | None) -> Iterator[str]:
+    try:
+        with get_client("providers").stream(
+            "POST", url, headers=headers, json=payload, timeout=timeout or _CHAT_TIMEOUT,
+        ) as resp:
+            if resp.status_code >= 400:
+                resp.read()
+                raise ProviderError(f"{name} error {resp.status_code}: {resp.text}")
+            yield from _sse_events(resp)
+    except httpx.HTTPError as exc:
+        raise ProviderError(f"{name} network error: {exc}") from exc
+
 
 class OpenAICompatibleProvider(BaseProvider):
     def __init__(self, name: str, api_key: str, base_url: str, chat_model: str, embed_model: str | None = None):
@@ -72,35 +122,57 @@ class OpenAICompatibleProvider(BaseProvider):
 
     def _post(self, path: str, payload: dict[str, Any], timeout: int | None = None) -> dict[str, Any]:
         url = f"{self.base_url}{path}"
-        with httpx.Client(timeout=timeout or _CHAT_TIMEOUT) as client:
-            resp = client.post(url, headers=self._headers(), json=payload)
+        resp = get_client("providers").post(url, headers=self._headers(), json=payload, timeout=timeout or _CHAT_TIMEOUT)
+        return self._decode(resp)
+
+    async def _apost(self, path: str, payload: dict[str, Any], timeout: int | None = None) -> dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        resp = await get_async_client("providers").post(url, headers=self._headers(), json=payload, timeout=timeout or _CHAT_TIMEOUT)
+        return self._decode(resp)
+
+    def _decode(self, resp: httpx.Response) -> dict[str, Any]:
         if resp.status_code >= 400:
             raise ProviderError(f"{self.name} error {resp.status_code}: {resp.text}")
-        return resp.json()
+        return orjson.loads(resp.content)
 
     def embed_texts(self, texts: list[str], task_type: str | None = None) -> list[list[float]]:
         if not self.embed_model:
             raise ProviderError(f"{self.name} does not support embeddings (missing model)")
-        payload = {
-            "model": self.embed_model,
-            "input": texts,
-        }
-        data = self._post("/embeddings", payload, timeout=_EMBED_TIMEOUT)
-        return [item["embedding"] for item in data.get("data", [])]
-
-    def chat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+        embeddings: list[list[float]] = []
+        # One request per batch: whole books exceed the per-request input limits.
+        for i in range(0, len(texts), _OPENAI_EMBED_BATCH):
+            payload = {
+                "model": self.embed_model,
+                "input": texts[i : i + _OPENAI_EMBED_BATCH],
+            }
+            data = self._post("/embeddings", payload, timeout=_EMBED_TIMEOUT)
+            items = sorted(data.get("data", []), key=lambda item: item.get("index", 0))
+            embeddings.extend(item["embedding"] for item in items)
+        return embeddings
+
+    def _chat_payload(self, system: str, user: str, history: list[dict[str, str]] | None) -> dict[str, Any]:
         messages: list[dict[str, str]] = []
         if system:
             messages.append({"role": "system", "content": system})
         if history:
             messages.extend(history)
         messages.append({"role": "user", "content": user})
-        payload = {
+        return {
             "model": self.chat_model,
             "messages": messages,
             "temperature": 0.2,
         }
-        data = self._post("/chat/completions", payload, timeout=timeout)
+
+    def chat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+        data = self._post("/chat/completions", self._chat_payload(system, user, history), timeout=timeout)
+        return self._chat_result(data)
+
+    async def achat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+        data = await self._apost("/chat/completions", self._chat_payload(system, user, history), timeout=timeout)
+        return self._chat_result(data)
+
+    @staticmethod
+    def _chat_result(data: dict[str, Any]) -> ChatResult:
         content = data["choices"][0]["message"]["content"]
         usage = None
         if "usage" in data:
@@ -112,6 +184,18 @@ class OpenAICompatibleProvider(BaseProvider):
             )
         return ChatResult(content=content, raw=data, usage=usage)
 
+    def chat_stream(self, system: str, user: str, history: list[dict[str, str]] | None = None, timeout: int | None = None) -> Iterator[str]:
+        payload = self._chat_payload(system, user, history)
+        payload["stream"] = True
+        url = f"{self.base_url}/chat/completions"
+        for data in _stream_events(self.name, url, self._headers(), payload, timeout):
+            if data == "[DONE]":
+                break
+            choices = orjson.loads(data).get("choices") or []
+            text = (choices[0].get("delta") or {}).get("content") if choices else None
+            if text:
+                yield text
+
 
 class GeminiProvider(BaseProvider):
     name = "gemini"
@@ -144,23 +228,51 @@ class GeminiProvider(BaseProvider):
         last_err: str | None = None
         for i, key in enumerate(self.api_keys):
             try:
-                with httpx.Client(timeout=timeout or _CHAT_TIMEOUT) as client:
-                    resp = client.post(url, headers=self._headers(key), json=payload)
-                if resp.status_code >= 400:
-                    last_err = f"{resp.status_code}: {resp.text[:200]}"
-                    if i < len(self.api_keys) - 1:
-                        log.info("Gemini key #%d failed (%s), rotating to next key", i + 1, last_err[:100])
-                        continue
-                    raise ProviderError(f"Gemini error {last_err}")
-                return resp.json()
+                resp = get_client("providers").post(
+                    url, headers=self._headers(key), json=payload, timeout=timeout or _CHAT_TIMEOUT,
+                )
             except httpx.HTTPError as exc:
-                last_err = str(exc)[:200]
-                if i < len(self.api_keys) - 1:
-                    log.info("Gemini key #%d network error (%s), rotating to next key", i + 1, last_err[:100])
-                    continue
-                raise ProviderError(f"Gemini network error: {last_err}") from exc
+                last_err = self._network_failure(i, exc)
+                continue
+            data, last_err = self._key_result(i, resp)
+            if data is not None:
+                return data
+        raise ProviderError(f"Gemini all keys failed: {last_err}")
+
+    async def _apost(self, path: str, payload: dict[str, Any], timeout: int | None = None) -> dict[str, Any]:
+        """Async _post(), with the same key rotation."""
+        url = f"{self.base_url}{path}"
+        last_err: str | None = None
+        for i, key in enumerate(self.api_keys):
+            try:
+                resp = await get_async_client("providers").post(
+                    url, headers=self._headers(key), json=payload, timeout=timeout or _CHAT_TIMEOUT,
+                )
+            except httpx.HTTPError as exc:
+                last_err = self._network_failure(i, exc)
+                continue
+            data, last_err = self._key_result(i, resp)
+            if data is not None:
+                return data
         raise ProviderError(f"Gemini all keys failed: {last_err}")
 
+    def _key_result(self, i: int, resp: httpx.Response) -> tuple[dict[str, Any] | None, str | None]:
+        """(decoded body, None) on success; (None, error) when the next key should be tried."""
+        if resp.status_code < 400:
+            return orjson.loads(resp.content), None
+        last_err = f"{resp.status_code}: {resp.text[:200]}"
+        if i < len(self.api_keys) - 1:
+            log.info("Gemini key #%d failed (%s), rotating to next key", i + 1, last_err[:100])
+            return None, last_err
+        raise ProviderError(f"Gemini error {last_err}")
+
+    def _network_failure(self, i: int, exc: httpx.HTTPError) -> str:
+        last_err = str(exc)[:200]
+        if i < len(self.api_keys) - 1:
+            log.info("Gemini key #%d network error (%s), rotating to next key", i + 1, last_err[:100])
+            return last_err
+        raise ProviderError(f"Gemini network error: {last_err}") from exc
+
     def embed_texts(self, texts: list[str], task_type: str | None = None) -> list[list[float]]:
         task_type = task_type or "RETRIEVAL_DOCUMENT"
         path = f"/models/{self.embed_model}:batchEmbedContents"
@@ -209,14 +321,14 @@ class GeminiProvider(BaseProvider):
                 all_embeddings.append(item.get("values", []))
         return all_embeddings
 
-    def chat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+    def _chat_payload(self, system: str, user: str) -> dict[str, Any]:
         parts: list[dict[str, str]] = []
         prompt = system.strip()
         if prompt:
             prompt = f"{prompt}\n\n"
         prompt += user
         parts.append({"text": prompt})
-        payload: dict[str, Any] = {
+        return {
             "contents": [
                 {
                     "role": "user",
@@ -224,10 +336,28 @@ class GeminiProvider(BaseProvider):
                 }
             ]
         }
+
+    def _grounded_payload(self, system: str, user: str, use_grounding: bool, json_mode: bool = False) -> dict[str, Any]:
+        payload = self._chat_payload(system, user)
         if use_grounding:
             payload["tools"] = [{"google_search": {}}]
+        elif json_mode:
+            # Constrain the reply to bare JSON (no fences or commentary).
+            payload["generationConfig"] = {"responseMimeType": "application/json"}
+        return payload
+
+    def chat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None, json_mode: bool = False) -> ChatResult:
+        path = f"/models/{self.chat_model}:generateContent"
+        data = self._post(path, self._grounded_payload(system, user, use_grounding, json_mode), timeout=timeout)
+        return self._chat_result(data)
+
+    async def achat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None, json_mode: bool = False) -> ChatResult:
         path = f"/models/{self.chat_model}:generateContent"
-        data = self._post(path, payload, timeout=timeout)
+        data = await self._apost(path, self._grounded_payload(system, user, use_grounding, json_mode), timeout=timeout)
+        return self._chat_result(data)
+
+    @staticmethod
+    def _chat_result(data: dict[str, Any]) -> ChatResult:
         candidates = data.get("candidates", [])
         if not candidates:
             raise ProviderError("Gemini returned no candidates")
@@ -258,6 +388,29 @@ class GeminiProvider(BaseProvider):
 
         return ChatResult(content=text, raw=data, grounding=grounding, usage=usage)
 
+    def chat_stream(self, system: str, user: str, history: list[dict[str, str]] | None = None, timeout: int | None = None) -> Iterator[str]:
+        url = f"{self.base_url}/models/{self.chat_model}:streamGenerateContent?alt=sse"
+        payload = self._chat_payload(system, user)
+        for i, key in enumerate(self.api_keys):
+            events = _stream_events("Gemini", url, self._headers(key), payload, timeout)
+            try:
+                # Keys can only be rotated before anything has been yielded.
+                first = next(events, None)
+            except ProviderError as exc:
+                if i < len(self.api_keys) - 1:
+                    log.info("Gemini key #%d failed (%s), rotating to next key", i + 1, str(exc)[:100])
+                    continue
+                raise
+            if first is None:
+                return
+            for data in itertools.chain((first,), events):
+                for candidate in orjson.loads(data).get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+            return
+        raise ProviderError("Gemini key missing")
+
 
 def _openai_provider() -> OpenAICompatibleProvider:
     return OpenAICompatibleProvider(
@@ -309,7 +462,14 @@ class AnthropicProvider(BaseProvider):
     def has_key(self) -> bool:
         return bool(self.api_key)
 
-    def chat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+    def _headers(self) -> dict[str, str]:
+        return {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "Content-Type": "application/json",
+        }
+
+    def _chat_payload(self, system: str, user: str, history: list[dict[str, str]] | None) -> dict[str, Any]:
         messages: list[dict[str, Any]] = []
         if history:
             messages.extend(history)
@@ -320,17 +480,30 @@ class AnthropicProvider(BaseProvider):
             "messages": messages,
         }
         if system:
-            payload["system"] = system
-        headers = {
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01",
-            "Content-Type": "application/json",
-        }
-        with httpx.Client(timeout=timeout or _CHAT_TIMEOUT) as client:
-            resp = client.post(f"{self.base_url}/v1/messages", headers=headers, json=payload)
+            # Mark the system prompt as a cacheable prefix. Anthropic ignores
+            # the marker for prompts below its minimum cacheable length.
+            payload["system"] = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        return payload
+
+    def chat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+        resp = get_client("providers").post(
+            f"{self.base_url}/v1/messages", headers=self._headers(),
+            json=self._chat_payload(system, user, history), timeout=timeout or _CHAT_TIMEOUT,
+        )
+        return self._chat_result(resp)
+
+    async def achat(self, system: str, user: str, history: list[dict[str, str]] | None = None, use_grounding: bool = False, timeout: int | None = None) -> ChatResult:
+        resp = await get_async_client("providers").post(
+            f"{self.base_url}/v1/messages", headers=self._headers(),
+            json=self._chat_payload(system, user, history), timeout=timeout or _CHAT_TIMEOUT,
+        )
+        return self._chat_result(resp)
+
+    @staticmethod
+    def _chat_result(resp: httpx.Response) -> ChatResult:
         if resp.status_code >= 400:
             raise ProviderError(f"anthropic error {resp.status_code}: {resp.text}")
-        data = resp.json()
+        data = orjson.loads(resp.content)
         content = "".join(b.get("text", "") for b in data.get("content", []))
         usage = None
         if "usage" in data:
@@ -342,6 +515,22 @@ class AnthropicProvider(BaseProvider):
             )
         return ChatResult(content=content, raw=data, usage=usage)
 
+    def chat_stream(self, system: str, user: str, history: list[dict[str, str]] | None = None, timeout: int | None = None) -> Iterator[str]:
+        payload = self._chat_payload(system, user, history)
+        payload["stream"] = True
+        url = f"{self.base_url}/v1/messages"
+        for data in _stream_events("anthropic", url, self._headers(), payload, timeout):
+            event = orjson.loads(data)
+            kind = event.get("type")
+            if kind == "content_block_delta":
+                text = (event.get("delta") or {}).get("text")
+                if text:
+                    yield text
+            elif kind == "message_stop":
+                break
+            elif kind == "error":
+                raise ProviderError(f"anthropic stream error: {event.get('error')}")
+
 
 def _anthropic_provider() -> AnthropicProvider:
     return AnthropicProvider(
@@ -360,21 +549,37 @@ def _gemini_provider() -> GeminiProvider:
     )
 
 
+_PROVIDER_FACTORIES = {
+    "openai": _openai_provider,
+    "gemini": _gemini_provider,
+    "kimi": _kimi_provider,
+    "deepseek": _deepseek_provider,
+    "novita": _novita_provider,
+    "anthropic": _anthropic_provider,
+}
+_SETTING_NAMES: dict[str, tuple[str, ...]] = {}
+
+
+def _provider_settings(name: str) -> tuple[Any, ...]:
+    """Current values of the config.<NAME>_* settings a provider is built from."""
+    names = _SETTING_NAMES.get(name)
+    if names is None:
+        prefix = f"{name.upper()}_"
+        names = _SETTING_NAMES[name] = tuple(sorted(a for a in vars(config) if a.startswith(prefix)))
+    return tuple(tuple(v) if isinstance(v, list) else v for v in (getattr(config, a) for a in names))
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_provider(name: str, settings: tuple[Any, ...]) -> BaseProvider:
+    return _PROVIDER_FACTORIES[name]()
+
+
 def get_provider(name: str) -> BaseProvider:
+    """Shared provider instance; a new one is built only when its settings change."""
     name = name.lower()
-    if name == "openai":
-        return _openai_provider()
-    if name == "gemini":
-        return _gemini_provider()
-    if name == "kimi":
-        return _kimi_provider()
-    if name == "deepseek":
-        return _deepseek_provider()
-    if name == "novita":
-        return _novita_provider()
-    if name == "anthropic":
-        return _anthropic_provider()
-    raise ProviderError(f"Unknown provider: {name}")
+    if name not in _PROVIDER_FACTORIES:
+        raise ProviderError(f"Unknown provider: {name}")
+    return _cached_provider(name, _provider_settings(name))
 
 
 def pick_provider(kind: str) -> BaseProvider:
@@ -399,6 +604,12 @@ def pick_provider(kind: str) -> BaseProvider:
     raise ProviderError(f"No available provider for {kind}")
 
 
+def _json_mode_kwargs(provider: BaseProvider, json_mode: bool) -> dict[str, bool]:
+    # Only Gemini accepts json_mode; its array-or-object JSON output suits every
+    # caller, unlike OpenAI's json_object mode, which only allows objects.
+    return {"json_mode": True} if json_mode and isinstance(provider, GeminiProvider) else {}
+
+
 def chat_with_fallback(
     system: str,
     user: str,
@@ -407,6 +618,8 @@ def chat_with_fallback(
     max_total_seconds: float | None = None,
     timeout: int | None = None,
     provider_order: list[str] | None = None,
+    use_cache: bool = False,
+    json_mode: bool = False,
 ) -> tuple[ChatResult, BaseProvider]:
     """Try each provider in order until one succeeds. Returns (result, provider).
 
@@ -417,7 +630,16 @@ def chat_with_fallback(
     full budget before the deadline. *provider_order* overrides the default
     PROVIDER_ORDER for this call only — useful when a different ordering is
     better suited to the task (e.g. Gemini-first for fast JSON generation).
+    *use_cache* serves an identical recent prompt from the in-process chat
+    cache, whichever provider answered it; grounded calls are never cached.
+    *json_mode* asks providers that support it (Gemini) for a bare JSON reply;
+    others answer as usual, so callers still parse leniently.
     """
+    cache_key = _fallback_cache_key(system, user, history) if use_cache and not use_grounding else None
+    if cache_key is not None:
+        hit = _chat_cache.get(cache_key)
+        if hit is not None:
+            return hit
     per_timeout = timeout or _CHAT_TIMEOUT
     if max_total_seconds is None:
         max_total_seconds = per_timeout + 20
@@ -438,10 +660,193 @@ def chat_with_fallback(
                 history=history,
                 use_grounding=use_grounding and isinstance(provider, GeminiProvider),
                 timeout=per_timeout,
+                **_json_mode_kwargs(provider, json_mode),
+            )
+            if cache_key is not None:
+                _chat_cache.set(cache_key, (_as_cached(result), provider))
+            return result, provider
+        except Exception as exc:
+            log.warning("Provider %s failed: %s", name, exc)
+            errors.append(f"{name}: {exc}")
+            continue
+    raise ProviderError("All providers failed: " + "; ".join(errors))
+
+
+async def achat_with_fallback(
+    system: str,
+    user: str,
+    history: list[dict[str, str]] | None = None,
+    use_grounding: bool = False,
+    max_total_seconds: float | None = None,
+    timeout: int | None = None,
+    provider_order: list[str] | None = None,
+    use_cache: bool = False,
+    json_mode: bool = False,
+) -> tuple[ChatResult, BaseProvider]:
+    """chat_with_fallback() for async callers: same ordering and budgets, without holding a thread.
+
+    Each provider gets *timeout* seconds before the next one is tried; when not
+    given, config.CHAT_REQUEST_TIMEOUT, or config.CHAT_GROUNDED_TIMEOUT for a
+    grounded attempt (0 for either means the full _CHAT_TIMEOUT). Raises
+    TimeoutError when every provider attempted timed out, ProviderError for
+    any other failure.
+    """
+    cache_key = _fallback_cache_key(system, user, history) if use_cache and not use_grounding else None
+    if cache_key is not None:
+        hit = _chat_cache.get(cache_key)
+        if hit is not None:
+            return hit
+    per_timeout = timeout or _CHAT_TIMEOUT
+    if max_total_seconds is None:
+        max_total_seconds = per_timeout + 20
+    errors: list[str] = []
+    attempted = timed_out = 0
+    deadline = time.monotonic() + max_total_seconds
+    order = provider_order if provider_order is not None else config.PROVIDER_ORDER
+    for name in order:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            errors.append("deadline exceeded")
+            break
+        provider = get_provider(name)
+        if not provider.has_key():
+            continue
+        attempted += 1
+        grounded = use_grounding and isinstance(provider, GeminiProvider)
+        budget = config.CHAT_GROUNDED_TIMEOUT if grounded else config.CHAT_REQUEST_TIMEOUT
+        wait = min(timeout or budget or per_timeout, remaining)
+        try:
+            result = await asyncio.wait_for(
+                provider.achat(
+                    system=system,
+                    user=user,
+                    history=history,
+                    use_grounding=grounded,
+                    timeout=per_timeout,
+                    **_json_mode_kwargs(provider, json_mode),
+                ),
+                timeout=wait,
             )
+            if cache_key is not None:
+                _chat_cache.set(cache_key, (_as_cached(result), provider))
             return result, provider
+        except TimeoutError:
+            log.warning("Provider %s timed out after %.0fs", name, wait)
+            timed_out += 1
+            errors.append(f"{name}: timed out")
         except Exception as exc:
             log.warning("Provider %s failed: %s", name, exc)
             errors.append(f"{name}: {exc}")
+    if attempted and timed_out == attempted:
+        raise TimeoutError("All providers timed out: " + "; ".join(errors))
+    raise ProviderError("All providers failed: " + "; ".join(errors))
+
+
+def chat_stream_with_fallback(
+    system: str,
+    user: str,
+    history: list[dict[str, str]] | None = None,
+    timeout: int | None = None,
+    provider_order: list[str] | None = None,
+) -> Iterator[str]:
+    """Stream the reply from the first provider that produces output.
+
+    Providers are only switched before the first fragment; an error after
+    that propagates to the consumer.
+    """
+    errors: list[str] = []
+    order = provider_order if provider_order is not None else config.PROVIDER_ORDER
+    for name in order:
+        provider = get_provider(name)
+        if not provider.has_key():
             continue
+        try:
+            stream = provider.chat_stream(system=system, user=user, history=history, timeout=timeout or _CHAT_TIMEOUT)
+            first = next(stream)
+        except StopIteration:
+            return
+        except Exception as exc:
+            log.warning("Provider %s failed: %s", name, exc)
+            errors.append(f"{name}: {exc}")
+            continue
+        yield first
+        yield from stream
+        return
     raise ProviderError("All providers failed: " + "; ".join(errors))
+
+
+# ─── Chat response cache ───
+# Question generation, query expansion and similar calls send byte-identical
+# prompts at low temperature; serving repeats from memory skips the LLM
+# round-trip. Grounded (web search) calls are never cached.
+
+class _TTLCache:
+    """Thread-safe LRU whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_chat_cache = _TTLCache(config.CHAT_CACHE_SIZE, config.CHAT_CACHE_TTL)
+
+
+def _prompt_key(*parts: str, history: list[dict[str, str]] | None) -> str:
+    joined = "\x00".join((*parts, json.dumps(history or [], sort_keys=True, ensure_ascii=False)))
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _chat_cache_key(provider: BaseProvider, system: str, user: str, history: list[dict[str, str]] | None) -> str:
+    return _prompt_key(provider.name, str(getattr(provider, "chat_model", "")), system, user, history=history)
+
+
+def _fallback_cache_key(system: str, user: str, history: list[dict[str, str]] | None) -> str:
+    # Any provider's answer will do, so the provider is not part of the key.
+    return _prompt_key("*fallback*", system, user, history=history)
+
+
+def _as_cached(result: ChatResult) -> ChatResult:
+    """The copy of *result* that cache hits return: flagged, with no usage to bill."""
+    return replace(result, usage=None, cached=True)
+
+
+def cached_chat(
+    provider: BaseProvider,
+    system: str,
+    user: str,
+    history: list[dict[str, str]] | None = None,
+    timeout: int | None = None,
+) -> ChatResult:
+    """provider.chat() served from the in-process cache when the same prompt was seen recently."""
+    key = _chat_cache_key(provider, system, user, history)
+    result = _chat_cache.get(key)
+    if result is None:
+        result = provider.chat(system=system, user=user, history=history, timeout=timeout)
+        _chat_cache.set(key, _as_cached(result))
+    return result
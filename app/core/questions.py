@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import re
+
 from .db import add_questions, list_questions
-from .providers import pick_provider, ProviderError
+from .providers import cached_chat, pick_provider, ProviderError
+
+# Leading "1. ", "2) ", "3 - " numbering or "- " / "* " bullets on a returned line.
+_NUM_PREFIX = re.compile(r"^\s*(?:\d+\s*[.):\-]|[-*\u2022])\s*")
 
 
 def generate_questions(agent_id: str, text_sample: str, count: int = 5) -> list[str]:
@@ -23,17 +28,12 @@ def generate_questions(agent_id: str, text_sample: str, count: int = 5) -> list[
 
     try:
         provider = pick_provider("chat")
-        result = provider.chat(
+        result = cached_chat(
+            provider,
             system="You are a Socratic tutor. Generate insightful study questions.",
             user=prompt,
         )
-        lines = [line.strip() for line in result.content.strip().split("\n") if line.strip()]
-        # Strip numbering prefixes like "1. " or "1) "
-        questions = []
-        for line in lines:
-            cleaned = line.lstrip("0123456789.)- ").strip()
-            if cleaned:
-                questions.append(cleaned)
+        questions = [q for q in (_NUM_PREFIX.sub("", line).strip() for line in result.content.splitlines()) if q]
         questions = questions[:count]
     except ProviderError:
         # Fallback questions if LLM is unavailable
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+import threading
+from collections import OrderedDict
 from typing import Any
 
 import numpy as np
@@ -8,16 +11,185 @@ import logging
 
 from .config import TOP_K
 from .db import get_chunks, get_chunks_batch, keyword_search_chunks, list_agents
+from .embed_cache import embed_with_cache
 from .providers import get_provider, pick_provider, ProviderError
 
 log = logging.getLogger(__name__)
 
 RRF_K = 60
 _EXPAND_MIN_AGENTS = 3
+# Vector hits kept per requested result before fusion; ranks deeper than this
+# add next to nothing to a chunk's RRF score.
+_CANDIDATES_PER_RESULT = 10
+
+
+# Bytes per component -> storage dtype. Older rows are float32; new ones float16,
+# or int8 when quantized (their stored norm undoes the quantization scale).
+_VECTOR_DTYPES = {1: np.int8, 2: np.float16, 4: np.float32}
 
 
 def _bytes_to_vector(blob: bytes, dim: int) -> np.ndarray:
-    return np.frombuffer(blob, dtype=np.float32, count=dim)
+    dtype = _VECTOR_DTYPES.get(len(blob) // dim, np.float32) if dim else np.float32
+    return np.frombuffer(blob, dtype=dtype, count=dim).astype(np.float32, copy=False)
+
+
+def _stack_vectors(rows: list[dict]) -> np.ndarray:
+    """Decode chunk rows into one (N, dim) float32 matrix of unit-length rows.
+
+    Float rows are stored normalized (norm 1.0); int8 rows and rows written
+    before normalization are divided by their stored norm here, once per load
+    rather than per query.
+    """
+    if not rows:
+        return np.empty((0, 0), dtype=np.float32)
+    dim = rows[0]["dim"]
+    width = len(rows[0]["vector"])
+    if dim and all(r["dim"] == dim and len(r["vector"]) == width for r in rows):
+        dtype = _VECTOR_DTYPES.get(width // dim, np.float32)
+        matrix = np.frombuffer(b"".join(r["vector"] for r in rows), dtype=dtype)
+        matrix = matrix.reshape(len(rows), dim).astype(np.float32)
+    else:
+        # Mixed widths (float32 rows from before a re-index alongside float16 ones).
+        matrix = np.vstack([_bytes_to_vector(r["vector"], r["dim"]) for r in rows])
+    norms = np.fromiter((r["norm"] for r in rows), dtype=np.float32, count=len(rows))
+    legacy = (norms != 1.0) & (norms != 0.0)
+    if legacy.any():
+        matrix[legacy] /= norms[legacy, None]
+    return matrix
+
+
+def _cosine_scores(matrix: np.ndarray, query_vec: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every unit row against the query: a single matrix-vector product."""
+    if not len(matrix):
+        return np.empty(0, dtype=np.float32)
+    query_norm = float(np.linalg.norm(query_vec)) or 1.0
+    return matrix @ (query_vec / np.float32(query_norm))
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, ties in index order.
+
+    Same result as a stable full argsort cut to k, but partitions first so
+    only the candidates are sorted.
+    """
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    kth = -np.partition(-scores, k - 1)[k - 1]
+    idx = np.flatnonzero(scores >= kth)
+    return idx[np.argsort(-scores[idx], kind="stable")][:k]
+
+
+# ─── Per-agent chunk store ───
+# Reading BLOBs out of the database and decoding them is most of the cost of a
+# retrieval. Each agent's chunks are kept in memory as parallel columns plus one
+# float32 matrix (structure-of-arrays), keyed by the agent's index version so a
+# re-index is picked up without explicit invalidation. Bounded by total bytes.
+
+_STORE_CACHE_BYTES = int(os.getenv("RAG_STORE_CACHE_MB", "256")) * 1024 * 1024
+
+
+class ChunkStore:
+    """One agent's chunks: ids/chunk_indexes/texts columns and an (N, dim) matrix."""
+
+    __slots__ = ("ids", "chunk_indexes", "texts", "matrix")
+
+    def __init__(self, rows: list[dict]):
+        self.ids = [r["id"] for r in rows]
+        self.chunk_indexes = [r["chunk_index"] for r in rows]
+        self.texts = [r["text"] for r in rows]
+        self.matrix = _stack_vectors(rows)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + sum(len(t) for t in self.texts)
+
+
+def index_version(meta: dict[str, Any] | None) -> str | None:
+    """Cache key for an agent's current chunks, or None if it can't be identified."""
+    meta = meta or {}
+    if meta.get("index_id"):
+        return str(meta["index_id"])
+    if meta.get("content_hash"):
+        return f"{meta['content_hash']}:{meta.get('embed_model')}:{meta.get('chunk_count')}"
+    return None
+
+
+class _StoreCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, tuple[str, ChunkStore]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, agent_id: str, version: str) -> ChunkStore | None:
+        with self._lock:
+            entry = self._data.get(agent_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._data.move_to_end(agent_id)
+            return entry[1]
+
+    def put(self, agent_id: str, version: str, store: ChunkStore) -> None:
+        size = store.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(agent_id, None)
+            if old is not None:
+                self._bytes -= old[1].nbytes
+            self._data[agent_id] = (version, store)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+_stores = _StoreCache(_STORE_CACHE_BYTES)
+
+
+def _load_store(agent_id: str, version: str | None) -> ChunkStore:
+    if version:
+        store = _stores.get(agent_id, version)
+        if store is not None:
+            return store
+    store = ChunkStore(get_chunks(agent_id))
+    if version:
+        _stores.put(agent_id, version, store)
+    return store
+
+
+def _load_stores(agent_ids: list[str], versions: dict[str, str | None]) -> dict[str, ChunkStore]:
+    """Stores for several agents; cache misses are read in one batched query."""
+    stores: dict[str, ChunkStore] = {}
+    missing: list[str] = []
+    for aid in agent_ids:
+        version = versions.get(aid)
+        store = _stores.get(aid, version) if version else None
+        if store is None:
+            missing.append(aid)
+        else:
+            stores[aid] = store
+    if missing:
+        grouped: dict[str, list[dict]] = {aid: [] for aid in missing}
+        for row in get_chunks_batch(missing):
+            if row["agent_id"] in grouped:
+                grouped[row["agent_id"]].append(row)
+        for aid, rows in grouped.items():
+            store = ChunkStore(rows)
+            stores[aid] = store
+            if versions.get(aid):
+                _stores.put(aid, versions[aid], store)
+    return stores
 
 
 def _rrf_fuse(keyword_results: list[dict], vector_results: list[dict]) -> list[dict]:
@@ -35,6 +207,9 @@ def _rrf_fuse(keyword_results: list[dict], vector_results: list[dict]) -> list[d
         scores[cid] = scores.get(cid, 0.0) + 1.0 / (RRF_K + rank + 1)
         if cid not in items:
             items[cid] = item
+        elif "vector_score" in item:
+            # Keep the raw similarity so callers can judge match quality.
+            items[cid] = {**items[cid], "vector_score": item["vector_score"]}
 
     ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
     return [{**items[cid], "score": score} for cid, score in ranked]
@@ -61,7 +236,18 @@ def _expand_query(query: str) -> list[str]:
         return []
 
 
-def retrieve(agent_id: str, query: str, top_k: int | None = None, provider_name: str | None = None) -> list[dict[str, Any]]:
+def retrieve(
+    agent_id: str,
+    query: str,
+    top_k: int | None = None,
+    provider_name: str | None = None,
+    version: str | None = None,
+) -> list[dict[str, Any]]:
+    """Hybrid vector + keyword retrieval over one agent's chunks.
+
+    *version* (see index_version) lets the agent's decoded chunks be reused
+    from memory across queries; without it they are read fresh every call.
+    """
     top_k = top_k or TOP_K
     if provider_name:
         embedder = get_provider(provider_name)
@@ -70,28 +256,22 @@ def retrieve(agent_id: str, query: str, top_k: int | None = None, provider_name:
     else:
         embedder = pick_provider("embed")
 
-    query_vec_list = embedder.embed_texts([query], task_type="RETRIEVAL_QUERY")
+    query_vec_list = embed_with_cache(embedder, [query], task_type="RETRIEVAL_QUERY")
     query_vec = np.array(query_vec_list[0], dtype=np.float32)
-    query_norm = np.linalg.norm(query_vec)
-    if query_norm == 0.0:
-        query_norm = 1.0
-
-    rows = get_chunks(agent_id)
-    vector_results = []
-    for row in rows:
-        vec = _bytes_to_vector(row["vector"], row["dim"])
-        denom = float(query_norm * row["norm"]) or 1.0
-        score = float(np.dot(query_vec, vec) / denom)
-        vector_results.append(
-            {
-                "id": row["id"],
-                "chunk_index": row["chunk_index"],
-                "text": row["text"],
-                "score": score,
-            }
-        )
 
-    vector_results.sort(key=lambda x: x["score"], reverse=True)
+    store = _load_store(agent_id, version)
+    scores = _cosine_scores(store.matrix, query_vec)
+    order = _top_indices(scores, top_k * _CANDIDATES_PER_RESULT)
+    vector_results = [
+        {
+            "id": store.ids[i],
+            "chunk_index": store.chunk_indexes[i],
+            "text": store.texts[i],
+            "score": score,
+            "vector_score": score,
+        }
+        for i, score in zip(order.tolist(), scores[order].tolist())
+    ]
 
     # Hybrid: fuse with keyword search if available
     kw_results = keyword_search_chunks(query, agent_ids=[agent_id], limit=top_k * 3)
@@ -103,24 +283,6 @@ def retrieve(agent_id: str, query: str, top_k: int | None = None, provider_name:
     return vector_results[:top_k]
 
 
-def _score_rows(rows: list[dict], ready_agents: dict, query_vec: np.ndarray, query_norm: float) -> list[dict]:
-    """Score chunk rows against a query vector."""
-    results = []
-    for row in rows:
-        agent_id = row["agent_id"]
-        agent = ready_agents.get(agent_id)
-        if not agent:
-            continue
-        vec = _bytes_to_vector(row["vector"], row["dim"])
-        denom = float(query_norm * row["norm"]) or 1.0
-        score = float(np.dot(query_vec, vec) / denom)
-        results.append({
-            "id": row["id"], "agent_id": agent_id, "agent_name": agent["name"],
-            "chunk_index": row["chunk_index"], "text": row["text"], "score": score,
-        })
-    return results
-
-
 def retrieve_cross_book(query: str, top_k: int | None = None, agent_ids: list[str] | None = None, expand: bool = True) -> list[dict[str, Any]]:
     """Retrieve chunks across ready agents for global chat. Optionally filter by agent_ids."""
     top_k = top_k or TOP_K
@@ -132,25 +294,57 @@ def retrieve_cross_book(query: str, top_k: int | None = None, agent_ids: list[st
         ready_agents = {k: v for k, v in ready_agents.items() if k in agent_ids}
 
     ready_ids = list(ready_agents.keys())
-    rows = get_chunks_batch(ready_ids)
+    versions = {aid: index_version(a.get("meta")) for aid, a in ready_agents.items()}
+    stores = _load_stores(ready_ids, versions)
 
     # Multi-query expansion: generate alternative queries when the library is large enough
     queries = [query]
     if expand and top_k >= 3 and len(ready_agents) > _EXPAND_MIN_AGENTS:
         queries.extend(_expand_query(query))
 
-    # Score all queries and merge (dedup by chunk id, keep highest score)
-    all_scored: dict[str, dict] = {}
-    for q in queries:
-        q_vec_list = embedder.embed_texts([q], task_type="RETRIEVAL_QUERY")
-        q_vec = np.array(q_vec_list[0], dtype=np.float32)
-        q_norm = float(np.linalg.norm(q_vec)) or 1.0
-        for item in _score_rows(rows, ready_agents, q_vec, q_norm):
-            cid = item["id"]
-            if cid not in all_scored or item["score"] > all_scored[cid]["score"]:
-                all_scored[cid] = item
-
-    vector_results = sorted(all_scored.values(), key=lambda x: x["score"], reverse=True)
+    q_vec_list = embed_with_cache(embedder, queries, task_type="RETRIEVAL_QUERY")
+    if len(q_vec_list) != len(queries):
+        raise ProviderError("Embedding count mismatch")
+    q_vecs = np.asarray(q_vec_list, dtype=np.float32)
+
+    # Stack every agent's store into one matrix (in library order); agents
+    # embedded with a different dimension than the query can't be compared
+    # and are left out.
+    parts = [
+        (aid, stores[aid]) for aid in ready_ids
+        if len(stores[aid]) and stores[aid].matrix.shape[1] == q_vecs.shape[1]
+    ]
+    if parts:
+        matrix = np.vstack([store.matrix for _, store in parts])
+    else:
+        matrix = _stack_vectors([])
+    starts = np.cumsum([0] + [len(store) for _, store in parts])
+
+    # Score all queries against the stacked matrix; keep each chunk's best score
+    best = np.full(len(matrix), -np.inf, dtype=np.float32)
+    for q_vec in q_vecs:
+        np.maximum(best, _cosine_scores(matrix, q_vec), out=best)
+
+    # Candidates: the overall top hits plus each agent's own best chunk, so
+    # per-agent dedup below still sees every agent.
+    order = _top_indices(best, top_k * _CANDIDATES_PER_RESULT)
+    if len(order) < len(best):
+        agent_bests = [
+            int(starts[p]) + int(np.argmax(best[starts[p]:starts[p + 1]]))
+            for p in range(len(parts))
+        ]
+        order = np.union1d(order, agent_bests)
+        order = order[np.argsort(-best[order], kind="stable")]
+    owners = np.searchsorted(starts, order, side="right") - 1
+    vector_results = []
+    for pos, part, score in zip(order.tolist(), owners.tolist(), best[order].tolist()):
+        aid, store = parts[part]
+        i = pos - int(starts[part])
+        vector_results.append({
+            "id": store.ids[i], "agent_id": aid, "agent_name": ready_agents[aid]["name"],
+            "chunk_index": store.chunk_indexes[i], "text": store.texts[i],
+            "score": score, "vector_score": score,
+        })
 
     # Hybrid: fuse with keyword search if available
     kw_results = keyword_search_chunks(query, agent_ids=ready_ids or None, limit=top_k * 3)
@@ -1,14 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from typing import Any
 
 from . import config
 from .db import get_chunks
 from .providers import ProviderError, pick_provider
-from .rag import retrieve, build_context
+from .rag import build_context, index_version, retrieve
 from .sources import fetch_book_content
 
 log = logging.getLogger(__name__)
@@ -47,9 +47,12 @@ class RAGSkill(BaseSkill):
     def execute(self, agent: dict[str, Any], query: str, **kwargs: Any) -> SkillResult | None:
         agent_id = agent["id"]
         top_k = kwargs.get("top_k")
-        embed_provider = (agent.get("meta") or {}).get("embed_provider")
+        meta = agent.get("meta") or {}
         try:
-            chunks = retrieve(agent_id, query, top_k, provider_name=embed_provider)
+            chunks = retrieve(
+                agent_id, query, top_k,
+                provider_name=meta.get("embed_provider"), version=index_version(meta),
+            )
         except ProviderError:
             return None
         if not chunks:
@@ -58,7 +61,7 @@ class RAGSkill(BaseSkill):
         return SkillResult(
             context=context,
             skill_name=self.name,
-            metadata={"chunks": chunks},
+            metadata={"chunks": chunks, "max_score": max(c.get("vector_score", 0.0) for c in chunks)},
         )
 
 
@@ -133,38 +136,61 @@ ALL_SKILLS: list[BaseSkill] = sorted(
 )
 
 
+def _gates_weak_rag(agent: dict[str, Any]) -> bool:
+    """Whether low-score RAG hits may be traded for fetched book content.
+
+    Only catalog books carry a real title and author to look up; uploads,
+    topics and AI-written books would fetch content for the wrong work.
+    """
+    meta = agent.get("meta") or {}
+    return (
+        config.RAG_MIN_SCORE > 0
+        and agent.get("type") == "catalog"
+        and bool(meta.get("title"))
+        and bool(meta.get("author"))
+    )
+
+
 def resolve_skills(agent: dict[str, Any], query: str, **kwargs: Any) -> SkillResult:
-    """Try skills by priority, return the first successful result."""
+    """Try skills by priority, return the first successful result.
+
+    For catalog books, RAG hits below config.RAG_MIN_SCORE are held back:
+    fetched book content is preferred over them, but they still beat the
+    generic fallbacks.
+    """
+    gate = _gates_weak_rag(agent)
+    weak_rag: SkillResult | None = None
     for skill in ALL_SKILLS:
         if not skill.is_available(agent):
             continue
+        if weak_rag is not None and skill.name != ContentFetchSkill.name:
+            log.info("Agent %s: using low-score RAG context", agent.get("id"))
+            return weak_rag
         try:
             result = skill.execute(agent, query, **kwargs)
-            if result is not None:
-                log.info("Agent %s: skill '%s' resolved", agent.get("id"), skill.name)
-                return result
+            if result is None:
+                continue
+            if gate and skill.name == RAGSkill.name and result.metadata["max_score"] < config.RAG_MIN_SCORE:
+                weak_rag = result
+                continue
+            log.info("Agent %s: skill '%s' resolved", agent.get("id"), skill.name)
+            return result
         except Exception as exc:
             log.warning("Skill %s failed for agent %s: %s", skill.name, agent.get("id"), exc)
+    if weak_rag is not None:
+        return weak_rag
     # Should never reach here because LLMKnowledgeSkill always succeeds
     return SkillResult(context="", skill_name="none")
 
 
-def resolve_multi_agent(agents: list[dict[str, Any]], query: str, **kwargs: Any) -> list[SkillResult]:
-    """Resolve skills for multiple agents in parallel."""
-    if len(agents) <= 1:
-        return [resolve_skills(a, query, **kwargs) for a in agents]
-
-    results: list[SkillResult | None] = [None] * len(agents)
-    with ThreadPoolExecutor(max_workers=min(len(agents), 6)) as pool:
-        future_to_idx = {
-            pool.submit(resolve_skills, agent, query, **kwargs): i
-            for i, agent in enumerate(agents)
-        }
-        for future in as_completed(future_to_idx):
-            idx = future_to_idx[future]
-            try:
-                results[idx] = future.result()
-            except Exception as exc:
-                log.warning("Skill resolution failed for agent %s: %s", agents[idx].get("id"), exc)
-                results[idx] = SkillResult(context="", skill_name="none")
-    return results  # type: ignore[return-value]
+async def aresolve_agent_skill(agent: dict[str, Any], query: str, top_k: int | None = None) -> SkillResult:
+    """resolve_skills() for one agent without blocking the event loop.
+
+    Meant to be fanned out with asyncio.gather so N books cost max-of-N
+    rather than sum-of-N; failures resolve to an empty result.
+    """
+    try:
+        return await asyncio.to_thread(resolve_skills, agent, query, top_k=top_k)
+    except Exception as exc:
+        log.warning("Skill resolution failed for agent %s: %s", agent.get("id"), exc)
+        return SkillResult(context="", skill_name="none")
@@ -1,23 +1,68 @@
 from __future__ import annotations
 
 import logging
-
-import httpx
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote, quote_plus
 
+import orjson
+
+from .db import get_http_cache, put_http_cache, touch_http_cache
+from .http_client import get_client
+
 log = logging.getLogger(__name__)
 
+# Book metadata barely changes: responses are served from the local cache for
+# a day, then revalidated with If-None-Match / If-Modified-Since where the
+# origin supplied validators.
+_HTTP_CACHE_TTL = 24 * 3600
+# Entries nobody has asked for in this long are dropped on the next store.
+_HTTP_CACHE_MAX_AGE = 30 * _HTTP_CACHE_TTL
+
+
+def _cached_get(url: str, timeout: float) -> bytes | None:
+    """GET *url* through the HTTP cache. Returns the body, or None on an HTTP error."""
+    try:
+        cached = get_http_cache(url)
+    except Exception as exc:
+        log.debug("HTTP cache lookup failed: %s", exc)
+        cached = None
+    now = int(time.time())
+    if cached and now - cached["fetched_at"] < _HTTP_CACHE_TTL:
+        return cached["body"]
+
+    headers: dict[str, str] = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+    resp = get_client("sources").get(url, headers=headers, timeout=timeout)
+    try:
+        if resp.status_code == 304 and cached:
+            touch_http_cache(url, now)
+            return cached["body"]
+        if resp.status_code >= 400:
+            return None
+        if resp.status_code == 200:
+            put_http_cache(
+                url, resp.headers.get("etag"), resp.headers.get("last-modified"), resp.content, now,
+                max_age=_HTTP_CACHE_MAX_AGE,
+            )
+    except Exception as exc:
+        log.debug("HTTP cache store failed: %s", exc)
+    return resp.content
+
 
 def fetch_wikipedia_summary(topic: str, lang: str = "zh") -> str:
     topic = topic.strip()
     if not topic:
         return ""
     url = f"https://{lang}.wikipedia.org/api/rest_v1/page/summary/{quote(topic)}"
-    with httpx.Client(timeout=30) as client:
-        resp = client.get(url)
-    if resp.status_code >= 400:
+    body = _cached_get(url, timeout=30)
+    if body is None:
         return ""
-    data = resp.json()
+    data = orjson.loads(body)
     return (data.get("extract") or "").strip()
 
 
@@ -28,11 +73,10 @@ def fetch_open_library_text(title: str, author: str = "") -> str:
         if author:
             params += f"&author={quote_plus(author)}"
         url = f"https://openlibrary.org/search.json?{params}&limit=3"
-        with httpx.Client(timeout=30) as client:
-            resp = client.get(url)
-        if resp.status_code >= 400:
+        body = _cached_get(url, timeout=30)
+        if body is None:
             return ""
-        data = resp.json()
+        data = orjson.loads(body)
         docs = data.get("docs", [])
         if not docs:
             return ""
@@ -56,10 +100,9 @@ def fetch_open_library_text(title: str, author: str = "") -> str:
         work_key = doc.get("key")
         if work_key:
             work_url = f"https://openlibrary.org{work_key}.json"
-            with httpx.Client(timeout=15) as client:
-                wresp = client.get(work_url)
-            if wresp.status_code < 400:
-                work = wresp.json()
+            work_body = _cached_get(work_url, timeout=15)
+            if work_body is not None:
+                work = orjson.loads(work_body)
                 desc = work.get("description")
                 if isinstance(desc, dict):
                     desc = desc.get("value", "")
@@ -79,11 +122,10 @@ def fetch_google_books_info(title: str, author: str = "") -> str:
         if author:
             q += f"+inauthor:{author}"
         url = f"https://www.googleapis.com/books/v1/volumes?q={quote_plus(q)}&maxResults=3"
-        with httpx.Client(timeout=30) as client:
-            resp = client.get(url)
-        if resp.status_code >= 400:
+        body = _cached_get(url, timeout=30)
+        if body is None:
             return ""
-        data = resp.json()
+        data = orjson.loads(body)
         items = data.get("items", [])
         if not items:
             return ""
@@ -113,23 +155,34 @@ def fetch_google_books_info(title: str, author: str = "") -> str:
 
 def fetch_book_content(title: str, author: str = "") -> str:
     """Orchestrator: try Open Library → Google Books → Wikipedia → return best result."""
-    # Try Open Library first (may have full descriptions)
-    text = fetch_open_library_text(title, author)
+    # The three lookups are independent network calls, so start them together
+    # and pick the result in the same priority order as before.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        ol_future = pool.submit(fetch_open_library_text, title, author)
+        gb_future = pool.submit(fetch_google_books_info, title, author)
+        wiki_future = pool.submit(_safe_wikipedia_summary, title, "en")
+        text, gb, wiki = ol_future.result(), gb_future.result(), wiki_future.result()
+
+    # Prefer Open Library (may have full descriptions), supplemented with Google Books
     if text and len(text) > 100:
-        # Supplement with Google Books if available
-        gb = fetch_google_books_info(title, author)
         if gb:
             text += "\n\n--- Google Books ---\n\n" + gb
         return text
 
-    # Try Google Books
-    text = fetch_google_books_info(title, author)
-    if text and len(text) > 50:
-        return text
+    # Then Google Books
+    if gb and len(gb) > 50:
+        return gb
 
-    # Fallback to Wikipedia (try English)
-    wiki = fetch_wikipedia_summary(title, lang="en")
+    # Fallback to Wikipedia (English)
     if wiki:
         return f"Title: {title}" + (f" by {author}" if author else "") + f"\n\nWikipedia: {wiki}"
 
     return ""
+
+
+def _safe_wikipedia_summary(topic: str, lang: str) -> str:
+    try:
+        return fetch_wikipedia_summary(topic, lang=lang)
+    except Exception as exc:
+        log.warning("Wikipedia fetch failed: %s", exc)
+        return ""
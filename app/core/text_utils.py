@@ -1,19 +1,66 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from html.parser import HTMLParser
 from io import StringIO
+import logging
+import multiprocessing
+import os
 from pathlib import Path
 import re
+import threading
 
 from pypdf import PdfReader
 
-from .config import CHUNK_OVERLAP, MAX_CHUNK_CHARS
+from .config import CHUNK_OVERLAP, IS_SERVERLESS, MAX_CHUNK_CHARS
+
+log = logging.getLogger(__name__)
 
 SUPPORTED_EXTENSIONS = {".txt", ".pdf", ".epub", ".md"}
 
-WHITESPACE_RE = re.compile(r"\s+")
+_SECTION_SPLIT_RE = re.compile(r"(?=\n#{1,3}\s)|\n{2,}")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
 _SUPPORTED_LIST = ", ".join(sorted(SUPPORTED_EXTENSIONS))
 
+# Books at least this long are extracted across worker processes; below it the
+# cost of starting workers outweighs the parallelism.
+_PDF_PARALLEL_MIN_PAGES = 64
+_PDF_MAX_WORKERS = 8
+
+# One pool for the whole process, created on first use, so concurrent uploads
+# share at most _PDF_MAX_WORKERS workers. Workers are spawned, not forked: the
+# server process holds threads, HTTP clients and pooled DB connections that a
+# forked child must not inherit.
+_pdf_pool: ProcessPoolExecutor | None = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool(workers: int) -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pdf_pool
+
+
+def _discard_pdf_pool() -> None:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _forget_pdf_pool_after_fork() -> None:
+    # The pool's workers and bookkeeping threads belong to the parent.
+    global _pdf_pool, _pdf_pool_lock
+    _pdf_pool = None
+    _pdf_pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pdf_pool_after_fork)
+
 
 class _HTMLTextExtractor(HTMLParser):
     """Minimal HTML→plain-text converter for EPUB chapter content."""
@@ -41,8 +88,9 @@ def html_to_plain_text(html: str) -> str:
 
 
 def normalize_text(text: str) -> str:
-    text = text.replace("\u00a0", " ")
-    return WHITESPACE_RE.sub(" ", text).strip()
+    # str.split() breaks on the same Unicode whitespace as \s (NBSP included)
+    # and drops leading/trailing runs, in one pass of C.
+    return " ".join(text.split())
 
 
 def _extract_epub(path: Path) -> str:
@@ -60,14 +108,76 @@ def _extract_epub(path: Path) -> str:
     return "\n".join(parts)
 
 
+def _read_pdf_pages(path: str, start: int, stop: int) -> list[str]:
+    """Text of pages [start, stop), via PDFium; pypdf reads what PDFium can't."""
+    try:
+        import pypdfium2 as pdfium  # type: ignore[import-untyped]
+    except ImportError:
+        pdfium = None
+    if pdfium is not None:
+        try:
+            pdf = pdfium.PdfDocument(path)
+            try:
+                pages: list[str] = []
+                for i in range(start, stop):
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    pages.append(textpage.get_text_bounded())
+                    textpage.close()
+                    page.close()
+                return pages
+            finally:
+                pdf.close()
+        except Exception as exc:
+            log.debug("PDFium extraction failed for %s, falling back to pypdf: %s", path, exc)
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _read_pdf_range(args: tuple[str, int, int]) -> list[str]:
+    return _read_pdf_pages(*args)
+
+
+def _pdf_page_count(path: str) -> int:
+    try:
+        import pypdfium2 as pdfium  # type: ignore[import-untyped]
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    except Exception:
+        return len(PdfReader(path).pages)
+
+
+def _extract_pdf(path: Path) -> str:
+    src = str(path)
+    count = _pdf_page_count(src)
+    workers = min(os.cpu_count() or 1, _PDF_MAX_WORKERS)
+    if IS_SERVERLESS or workers < 2 or count < _PDF_PARALLEL_MIN_PAGES:
+        return "\n".join(_read_pdf_pages(src, 0, count))
+
+    # Pages are independent: give each worker a contiguous range so it opens
+    # the document once, and keep the ranges in order for joining.
+    step = -(-count // workers)
+    ranges = [(src, start, min(start + step, count)) for start in range(0, count, step)]
+    try:
+        parts = list(_get_pdf_pool(workers).map(_read_pdf_range, ranges))
+    except Exception as exc:
+        log.warning("Parallel PDF extraction failed, extracting sequentially: %s", exc)
+        # A broken pool (e.g. a worker was killed) stays broken; start afresh next time.
+        _discard_pdf_pool()
+        return "\n".join(_read_pdf_pages(src, 0, count))
+    return "\n".join(page for part in parts for page in part)
+
+
 def extract_text_from_file(path: Path) -> str:
     suffix = path.suffix.lower()
     if suffix == ".txt" or suffix == ".md":
         return normalize_text(path.read_text(encoding="utf-8", errors="ignore"))
     if suffix == ".pdf":
-        reader = PdfReader(str(path))
-        pages = [page.extract_text() or "" for page in reader.pages]
-        return normalize_text("\n".join(pages))
+        return normalize_text(_extract_pdf(path))
     if suffix == ".epub":
         return normalize_text(_extract_epub(path))
     raise ValueError(
@@ -83,34 +193,37 @@ def chunk_text(text: str, max_chars: int | None = None, overlap: int | None = No
     overlap = overlap if overlap is not None else CHUNK_OVERLAP
 
     # Step 1: Split on headings and double newlines
-    sections = re.split(r"(?=\n#{1,3}\s)|\n{2,}", text)
-    sections = [s.strip() for s in sections if s and s.strip()]
+    sections = [s.strip() for s in _SECTION_SPLIT_RE.split(text) if s and s.strip()]
 
-    # Step 2: Merge small sections, split oversized ones
+    # Step 2: Merge small sections, split oversized ones. Sections are already
+    # stripped, so a merged chunk's length is known without building it; parts
+    # are only joined once per emitted chunk.
     merged: list[str] = []
-    current = ""
+    parts: list[str] = []
+    size = 0
     for section in sections:
-        candidate = (current + "\n\n" + section).strip() if current else section
-        if len(candidate) <= max_chars:
-            current = candidate
+        if parts and size + 2 + len(section) <= max_chars:
+            parts.append(section)
+            size += 2 + len(section)
+            continue
+        if parts:
+            merged.append("\n\n".join(parts))
+        if len(section) <= max_chars:
+            parts = [section]
+            size = len(section)
         else:
-            if current:
-                merged.append(current)
-            if len(section) <= max_chars:
-                current = section
-            else:
-                for sub in _split_by_sentences(section, max_chars, overlap):
-                    merged.append(sub)
-                current = ""
-    if current:
-        merged.append(current)
+            merged.extend(_split_by_sentences(section, max_chars, overlap))
+            parts = []
+            size = 0
+    if parts:
+        merged.append("\n\n".join(parts))
 
     return merged if merged else [text[:max_chars]]
 
 
 def _split_by_sentences(text: str, max_chars: int, overlap: int) -> list[str]:
     """Fall back to sentence-level splitting for oversized sections."""
-    sentences = re.split(r"(?<=[.!?])\s+", text)
+    sentences = _SENTENCE_SPLIT_RE.split(text)
     chunks: list[str] = []
     current = ""
     for sent in sentences:
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import queue
 import re
+import shutil
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterator
 
 import os
 
 from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+import orjson
 from pydantic import BaseModel, Field
 
 from .core import config
@@ -28,13 +33,16 @@ from .core.catalog import (
 from .core.db import (
     add_message,
     add_session_message,
+    claim_agent_status,
     create_agent,
     create_catalog_agent,
+    create_catalog_agents_bulk,
     create_chat_session,
     create_vote,
     delete_agent,
     delete_chat_session,
     find_agent_by_name,
+    find_agents_by_names,
     find_existing_upload,
     find_mind_by_name,
     get_agent,
@@ -42,6 +50,7 @@ from .core.db import (
     get_mind,
     init_db,
     list_agents,
+    list_agents_by_ids,
     list_chat_sessions,
     list_messages,
     list_minds,
@@ -64,8 +73,11 @@ from .core.db import (
     update_ai_book_outline,
     update_ai_book_status,
 )
-from .core.indexer import index_text
-from .core.providers import GeminiProvider, ProviderError, chat_with_fallback, pick_provider
+from .core.indexer import index_text, schedule_questions
+from .core.http_client import aclose_clients
+from .core.providers import (
+    GeminiProvider, ProviderError, achat_with_fallback, chat_stream_with_fallback, chat_with_fallback, pick_provider,
+)
 from .core.rag import build_context, retrieve, retrieve_cross_book
 from .core.minds import (
     SEED_MINDS,
@@ -78,7 +90,7 @@ from .core.minds import (
     suggest_minds_for_topic,
     suggest_minds_hybrid,
 )
-from .core.skills import resolve_multi_agent, resolve_skills
+from .core.skills import SkillResult, aresolve_agent_skill, resolve_skills
 from .core.sources import fetch_book_content, fetch_wikipedia_summary
 from .core.text_utils import extract_text_from_file
 from .core.url_fetch import fetch_url_as_book_text
@@ -93,7 +105,9 @@ log = logging.getLogger(__name__)
 
 _STALE_WRITING_SECONDS = 5 * 60
 
-app = FastAPI(title=config.APP_TITLE)
+# Endpoint dicts are encoded with orjson: faster than the stdlib encoder
+# FastAPI uses by default.
+app = FastAPI(title=config.APP_TITLE, default_response_class=ORJSONResponse)
 
 
 @app.exception_handler(Exception)
@@ -116,7 +130,7 @@ app.add_middleware(
 )
 
 # ─── Pro: Auth middleware (only when ENABLE_AUTH=true) ───
-if os.getenv("ENABLE_AUTH"):
+if config.ENABLE_AUTH:
     from .pro.auth import AuthMiddleware
     app.add_middleware(AuthMiddleware)
 
@@ -127,7 +141,7 @@ if _has_stripe:
     app.include_router(stripe_router)
 
 # ─── Pro: Subscription status (always available when auth is on) ───
-if os.getenv("ENABLE_AUTH"):
+if config.ENABLE_AUTH:
     from .core.db import get_user as _get_user
 
     @app.get("/api/pro/subscription")
@@ -160,17 +174,17 @@ if os.getenv("ENABLE_AUTH"):
 
 # Quota helpers (no-op when auth is disabled)
 def _check_quota(request: Request, action: str) -> None:
-    if os.getenv("ENABLE_AUTH"):
+    if config.ENABLE_AUTH:
         from .pro.quota import check_quota
         check_quota(request, action)
 
 def _check_upload_limit(request: Request) -> None:
-    if os.getenv("ENABLE_AUTH"):
+    if config.ENABLE_AUTH:
         from .pro.quota import check_upload_limit
         check_upload_limit(request)
 
 def _check_ai_book_quota(request: Request) -> None:
-    if os.getenv("ENABLE_AUTH"):
+    if config.ENABLE_AUTH:
         from .pro.quota import check_ai_book_quota
         check_ai_book_quota(request)
 
@@ -180,7 +194,7 @@ def _resolve_creator_name(user_id: str) -> str:
         return ""
     if "@" in user_id:
         return user_id.split("@")[0]
-    if os.getenv("ENABLE_AUTH"):
+    if config.ENABLE_AUTH:
         from .core.db import get_user as _get_user_fn
         u = _get_user_fn(user_id)
         if u:
@@ -202,7 +216,7 @@ def _resolve_og_author(agent: dict | None, book: dict | None) -> str:
     return meta.get("author") or agent.get("source") or ""
 
 def _track_usage(request: Request, action: str, tokens: int = 0) -> None:
-    if os.getenv("ENABLE_AUTH"):
+    if config.ENABLE_AUTH:
         from .pro.quota import track_usage
         track_usage(request, action, tokens)
 
@@ -213,29 +227,33 @@ static_dir = Path(__file__).resolve().parent / "static"
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
 
-_VERBOSE_CITE_RE = re.compile(
-    r"\[(?:Google [\w\s]+?|Context|Source|Sources|Ref|Reference|Passage)\s*((?:\d+(?:\s*,\s*)?)+)\]"
+# One pass over a response handles both citation forms: verbose ones like
+# [Context 1, 2] (group 1), rewritten to [1, 2], and plain [1] / [2, 3]
+# (group 2), kept as-is for frontend rendering.
+_CITATION_RE = re.compile(
+    r"\[(?:(?:Google [\w\s]+?|Context|Source|Sources|Ref|Reference|Passage)\s*((?:\d+(?:\s*,\s*)?)+)"
+    r"|([\d,\s]+))\]"
 )
+# A skill's own [n] markers plus an optional (from "Title") suffix, stripped
+# before its context is merged into the global chat prompt.
+_SKILL_CITE_RE = re.compile(r"\[\d+\]\s*(?:\(from\s+\"[^\"]*\"\)\s*)?")
 
 
-def _normalize_citations(text: str) -> str:
-    """Normalize verbose citations like [Context 1, 2] to clean [1, 2] format.
-    Pure [1, 2] citations are kept as-is for frontend rendering."""
-    def _replace(m):
-        nums = m.group(1).strip()
-        return f"[{nums}]"
-    return _VERBOSE_CITE_RE.sub(_replace, text)
-
-
-def _extract_cited_numbers(text: str) -> set[int]:
-    """Extract all citation numbers from bracket groups like [1] or [2, 3, 4]."""
+def _normalize_and_extract(text: str) -> tuple[str, set[int]]:
+    """Normalize verbose citations to [1, 2] form and collect every cited number."""
     cited: set[int] = set()
-    for group in re.findall(r"\[([\d,\s]+)\]", text):
-        for num in group.split(","):
+    if "[" not in text:
+        return text, cited
+
+    def _replace(m: re.Match[str]) -> str:
+        verbose, plain = m.groups()
+        for num in (verbose or plain).split(","):
             num = num.strip()
             if num.isdigit():
                 cited.add(int(num))
-    return cited
+        return f"[{verbose.strip()}]" if verbose is not None else m.group(0)
+
+    return _CITATION_RE.sub(_replace, text), cited
 
 
 _SNIPPET_META_RE = re.compile(
@@ -251,6 +269,29 @@ def _clean_snippet(text: str, max_len: int = 150) -> str:
     return cleaned[:max_len] + ("..." if len(cleaned) > max_len else "")
 
 
+def _cited_references(
+    chunks: list[dict[str, Any]], cited: set[int], book: str | None = None,
+) -> list[dict[str, Any]]:
+    """Reference entries for the 1-based chunk numbers an answer cited.
+
+    Only cited chunks are touched, so uncited ones never have their text
+    cleaned or copied. `book` overrides each chunk's agent_name.
+    """
+    references = []
+    for idx in sorted(cited):
+        if not 1 <= idx <= len(chunks):
+            continue
+        chunk = chunks[idx - 1]
+        text = chunk.get("text", "")
+        references.append({
+            "index": idx,
+            "book": book if book is not None else chunk.get("agent_name", "Unknown"),
+            "snippet": _clean_snippet(text),
+            "full_text": text.strip(),
+        })
+    return references
+
+
 _TOKEN_MARKUP = 2  # Display multiplier for profit margin
 
 
@@ -336,21 +377,33 @@ class VoteRequest(BaseModel):
 
 # ─── Background learning ───
 
-_learning_lock: set[str] = set()  # agent_ids currently being learned
+# Learning and indexing run on their own bounded pools rather than as
+# BackgroundTasks, which share the threadpool that serves sync endpoints.
+# Serverless runtimes freeze after the response, so there they stay
+# BackgroundTasks and finish before the invocation ends.
+_learn_pool = ThreadPoolExecutor(max_workers=config.LEARN_WORKERS, thread_name_prefix="learn")
+_index_pool = ThreadPoolExecutor(max_workers=config.INDEX_WORKERS, thread_name_prefix="index")
+
+
+def _schedule_learning(background_tasks: BackgroundTasks, agent_id: str) -> None:
+    if config.IS_SERVERLESS:
+        background_tasks.add_task(_learn_agent, agent_id)
+    else:
+        _learn_pool.submit(_learn_agent, agent_id)
 
 
 def _learn_agent(agent_id: str) -> None:
     """Background task: fetch content for a catalog agent, index it, set status ready."""
-    if agent_id in _learning_lock:
+    # Moving the agent out of "catalog" in one conditional UPDATE is the claim:
+    # concurrent triggers, in this process or another worker, see it already
+    # taken and return.
+    if not claim_agent_status(agent_id, "catalog", "indexing"):
         return
-    _learning_lock.add(agent_id)
     try:
         agent = get_agent(agent_id)
-        if not agent or agent["status"] not in ("catalog",):
+        if not agent:
             return
 
-        update_agent_status(agent_id, "indexing")
-
         meta = agent.get("meta") or {}
         title = meta.get("title") or agent["name"]
         author = meta.get("author") or ""
@@ -372,16 +425,35 @@ def _learn_agent(agent_id: str) -> None:
 
         merged = {**meta, **index_meta, "skills": skills}
         update_agent_status(agent_id, "ready", merged)
+        if not index_meta.get("skipped"):
+            schedule_questions(agent_id, text)
         log.info("Agent %s (%s) learned successfully", agent_id, title)
     except Exception as exc:
         log.error("Learning failed for agent %s: %s", agent_id, exc)
         update_agent_status(agent_id, "error", {"error": str(exc)})
-    finally:
-        _learning_lock.discard(agent_id)
 
 
 # ─── Scheduled discovery ───
 
+def _parse_llm_json(text: str) -> Any:
+    """Parse a model's JSON answer, tolerating code fences and surrounding prose.
+
+    JSON-mode replies parse directly; otherwise the span from the first "[" or
+    "{" to the last matching closer is parsed instead.
+    """
+    text = text.strip()
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    starts = [i for i in (text.find("["), text.find("{")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON found in model response")
+    start = min(starts)
+    end = text.rfind("]" if text[start] == "[" else "}")
+    return orjson.loads(text[start:end + 1])
+
+
 def _discover_books_for_topic(topic: str, count: int = TOPIC_DISCOVER_COUNT) -> tuple[list[dict[str, Any]], dict[str, int]]:
     """Use LLM to discover top books for a topic. Returns (books, usage)."""
     prompt = (
@@ -390,33 +462,29 @@ def _discover_books_for_topic(topic: str, count: int = TOPIC_DISCOVER_COUNT) ->
         "Only output the JSON array, no other text."
     )
     try:
-        result, _ = chat_with_fallback(system="You are a book recommendation expert.", user=prompt)
+        result, _ = chat_with_fallback(system="You are a book recommendation expert.", user=prompt, json_mode=True)
         usage = _usage_dict(result)
-        text = result.content.strip()
-        # Strip markdown code fences if present
-        if text.startswith("```"):
-            text = re.sub(r"^```\w*\n?", "", text)
-            text = re.sub(r"\n?```$", "", text)
-
-        books_data = json.loads(text)
+        books_data = _parse_llm_json(result.content)
     except Exception as exc:
         log.warning("LLM discovery for topic '%s' failed: %s", topic, exc)
         raise
 
-    results: list[dict[str, Any]] = []
+    books: list[dict[str, str]] = []
     for entry in books_data[:count]:
         title = entry.get("title", "").strip()
-        author = entry.get("author", "").strip()
-        desc = entry.get("description", "").strip()
         if not title:
             continue
-        agent_id = create_catalog_agent(
-            title=title, author=author, category=topic, description=desc,
-        )
-        existing = find_agent_by_name(title)
-        created = existing is not None and existing["id"] == agent_id
-        results.append({"id": agent_id, "title": title, "author": author, "created": created})
-        log.info("Discovered book: %s by %s [%s]", title, author, topic)
+        books.append({
+            "title": title,
+            "author": entry.get("author", "").strip(),
+            "category": topic,
+            "description": entry.get("description", "").strip(),
+        })
+
+    results: list[dict[str, Any]] = []
+    for book, (agent_id, created) in zip(books, create_catalog_agents_bulk(books)):
+        results.append({"id": agent_id, "title": book["title"], "author": book["author"], "created": created})
+        log.info("Discovered book: %s by %s [%s]", book["title"], book["author"], topic)
     return results, usage
 
 
@@ -432,10 +500,63 @@ def _background_discover(topic: str) -> None:
         log.warning("Background discovery for '%s' failed: %s", topic, exc)
 
 
-def _discover_books() -> None:
+# At most this many categories share one discovery prompt; beyond it the
+# answers get thinner per category.
+_DISCOVERY_MAX_CATEGORIES = 8
+_DISCOVERY_LLM_TIMEOUT = 30
+
+
+async def _discover_books_for_categories(counts: dict[str, int]) -> list[dict[str, Any]]:
+    """Discover books for several categories with a single LLM call.
+
+    `counts` maps category to the number of books wanted for it. Returns the
+    same records as _discover_books_for_topic(), across all categories.
+    """
+    wanted = "; ".join(f'"{cat}": {n}' for cat, n in counts.items())
+    prompt = (
+        f"Recommend must-read books for each of these categories (category: number of books): {wanted}. "
+        "Return a JSON object mapping each category name, exactly as given, to an array of objects "
+        "with keys: title, author, description (one sentence). "
+        "Only output the JSON object, no other text."
+    )
+    # A multi-category answer is long, so allow the full per-provider budget
+    # rather than the interactive-chat timeout.
+    result, _ = await achat_with_fallback(
+        system="You are a book recommendation expert.", user=prompt, timeout=_DISCOVERY_LLM_TIMEOUT,
+        json_mode=True,
+    )
+    by_category = _parse_llm_json(result.content)
+    if not isinstance(by_category, dict):
+        raise ValueError("expected a JSON object keyed by category")
+
+    books: list[dict[str, str]] = []
+    for cat, count in counts.items():
+        entries = by_category.get(cat)
+        if not isinstance(entries, list):
+            continue
+        for entry in entries[:count]:
+            title = str(entry.get("title", "")).strip()
+            if not title:
+                continue
+            books.append({
+                "title": title,
+                "author": str(entry.get("author", "")).strip(),
+                "category": cat,
+                "description": str(entry.get("description", "")).strip(),
+            })
+
+    results: list[dict[str, Any]] = []
+    created_flags = await run_in_threadpool(create_catalog_agents_bulk, books)
+    for book, (agent_id, created) in zip(books, created_flags):
+        results.append({"id": agent_id, "title": book["title"], "author": book["author"], "created": created})
+        log.info("Discovered book: %s by %s [%s]", book["title"], book["author"], book["category"])
+    return results
+
+
+async def _discover_books() -> None:
     """Scheduled discovery: pick underrepresented categories and discover new books via LLM."""
     try:
-        agents = list_agents(limit=5000)
+        agents = await run_in_threadpool(list_agents, limit=5000)
         # Count books per category
         cat_counts: dict[str, int] = {}
         for a in agents:
@@ -443,17 +564,17 @@ def _discover_books() -> None:
             if cat:
                 cat_counts[cat] = cat_counts.get(cat, 0) + 1
 
-        if not cat_counts:
+        if not cat_counts or DISCOVERY_BATCH_SIZE <= 0:
             return
 
-        # Pick the category with fewest books
+        # Spread the batch over the categories with the fewest books, giving
+        # any remainder to the smallest ones, and ask for all of them at once.
         sorted_cats = sorted(cat_counts.items(), key=lambda x: x[1])
-        created = 0
-        for cat, _ in sorted_cats:
-            if created >= DISCOVERY_BATCH_SIZE:
-                break
-            new_books, _ = _discover_books_for_topic(cat, count=DISCOVERY_BATCH_SIZE - created)
-            created += len(new_books)
+        cats = [cat for cat, _ in sorted_cats[:min(_DISCOVERY_MAX_CATEGORIES, DISCOVERY_BATCH_SIZE)]]
+        per_cat, extra = divmod(DISCOVERY_BATCH_SIZE, len(cats))
+        counts = {cat: per_cat + (1 if i < extra else 0) for i, cat in enumerate(cats)}
+        new_books = await _discover_books_for_categories(counts)
+        created = sum(1 for book in new_books if book["created"])
 
         if created:
             log.info("Scheduled discovery: %d new books", created)
@@ -461,17 +582,12 @@ def _discover_books() -> None:
         log.warning("Scheduled discovery run failed: %s", exc)
 
 
-_discovery_stop = threading.Event()
-
-
-def _discovery_loop() -> None:
-    """Daemon thread running periodic book discovery."""
-    while not _discovery_stop.is_set():
-        _discovery_stop.wait(DISCOVERY_INTERVAL)
-        if _discovery_stop.is_set():
-            break
+async def _discovery_loop() -> None:
+    """Event-loop task running periodic book discovery; cancelled at shutdown."""
+    while True:
+        await asyncio.sleep(DISCOVERY_INTERVAL)
         log.info("Running scheduled book discovery...")
-        _discover_books()
+        await _discover_books()
 
 
 # ─── LLM recommendation extraction ───
@@ -482,8 +598,19 @@ _BOOK_PATTERN = re.compile(
 )
 
 
+# Every _BOOK_PATTERN match opens with one of these quote marks.
+_TITLE_QUOTES = ('"', "\u201c", "\u300a")
+
+
+def _has_quoted_title(text: str) -> bool:
+    """Cheap test for whether `text` could hold a quoted title at all."""
+    return any(q in text for q in _TITLE_QUOTES)
+
+
 def _extract_recommended_books(text: str) -> list[dict[str, str]]:
     """Parse LLM response for book title mentions and return new ones."""
+    if not _has_quoted_title(text):
+        return []
     matches = _BOOK_PATTERN.findall(text)
     books: list[dict[str, str]] = []
     seen: set[str] = set()
@@ -496,19 +623,71 @@ def _extract_recommended_books(text: str) -> list[dict[str, str]]:
     return books
 
 
-def _process_recommendations(text: str) -> None:
-    """Create catalog agents for any books mentioned in LLM response that don't exist yet."""
+def _process_recommendations(texts: list[str]) -> None:
+    """Create catalog agents for any books mentioned in LLM responses that don't exist yet."""
     try:
-        books = _extract_recommended_books(text)
-        for book in books[:3]:  # limit to avoid spam
-            existing = find_agent_by_name(book["title"])
-            if not existing:
-                create_catalog_agent(title=book["title"], author=book["author"])
+        books: list[dict[str, str]] = []
+        seen: set[str] = set()
+        for text in texts:
+            for book in _extract_recommended_books(text)[:3]:  # limit to avoid spam
+                if book["title"].lower() not in seen:
+                    seen.add(book["title"].lower())
+                    books.append(book)
+        for book, (_, created) in zip(books, create_catalog_agents_bulk(books)):
+            if created:
                 log.info("Auto-created agent from LLM recommendation: %s", book["title"])
     except Exception as exc:
         log.warning("Recommendation processing failed: %s", exc)
 
 
+# Chat responses are queued and a single worker drains them in batches, so
+# concurrent chats share one lookup/insert transaction instead of each opening
+# their own. Serverless deployments have no long-lived worker and process each
+# response in its own background task.
+_REC_BATCH_WINDOW = 0.25  # seconds to keep collecting after the first response
+_REC_BATCH_MAX = 64
+_rec_queue: queue.Queue[str] = queue.Queue()
+_rec_stop = threading.Event()
+_rec_worker_running = threading.Event()
+
+
+def _schedule_recommendations(background_tasks: BackgroundTasks, text: str) -> None:
+    if not _has_quoted_title(text):
+        return
+    if _rec_worker_running.is_set():
+        _rec_queue.put_nowait(text)
+    else:
+        background_tasks.add_task(_process_recommendations, [text])
+
+
+def _drain_recommendations(first: str) -> list[str]:
+    batch = [first]
+    deadline = time.monotonic() + _REC_BATCH_WINDOW
+    while len(batch) < _REC_BATCH_MAX:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_rec_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _recommendation_loop() -> None:
+    """Daemon thread turning queued chat responses into catalog agents."""
+    _rec_worker_running.set()
+    try:
+        while not _rec_stop.is_set():
+            try:
+                first = _rec_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            _process_recommendations(_drain_recommendations(first))
+    finally:
+        _rec_worker_running.clear()
+
+
 # ─── Startup ───
 
 _SEED_BATCH_SIZE = int(os.getenv("SEED_BATCH_SIZE", "5"))
@@ -540,18 +719,22 @@ def _seed_minds_batch(batch_size: int = _SEED_BATCH_SIZE) -> int:
     return seeded
 
 
-_IS_SERVERLESS = bool(os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+_IS_SERVERLESS = config.IS_SERVERLESS
+
+
+_discovery_task: asyncio.Task[None] | None = None
 
 
 @app.on_event("startup")
-def on_startup() -> None:
+async def on_startup() -> None:
+    global _discovery_task
     if not (os.getenv("DATABASE_URL") or os.getenv("POSTGRES_URL")):
         config.DATA_DIR.mkdir(parents=True, exist_ok=True)
         config.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    init_db()
+    await run_in_threadpool(init_db)
 
     if not _IS_SERVERLESS:
-        # Traditional server: use background threads as before
+        # Traditional server: background work runs in-process
         def _seed_and_backfill():
             _seed_minds_batch(len(SEED_MINDS))
             from .core.minds import backfill_mind_embeddings
@@ -559,13 +742,16 @@ def on_startup() -> None:
         t_minds = threading.Thread(target=_seed_and_backfill, daemon=True)
         t_minds.start()
         if DISCOVERY_INTERVAL > 0:
-            t = threading.Thread(target=_discovery_loop, daemon=True)
-            t.start()
+            _discovery_task = asyncio.create_task(_discovery_loop())
+        threading.Thread(target=_recommendation_loop, daemon=True).start()
 
 
 @app.on_event("shutdown")
-def on_shutdown() -> None:
-    _discovery_stop.set()
+async def on_shutdown() -> None:
+    if _discovery_task is not None:
+        _discovery_task.cancel()
+    _rec_stop.set()
+    await aclose_clients()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -1236,30 +1422,49 @@ class SearchBookRequest(BaseModel):
 
 
 @app.post("/api/discover")
-def api_discover(payload: DiscoverRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
-    _check_quota(request, "discover")
+async def api_discover(payload: DiscoverRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
+    await run_in_threadpool(_check_quota, request, "discover")
     try:
-        books, usage = _discover_books_for_topic(payload.topic.strip(), count=payload.count)
+        books, usage = await run_in_threadpool(_discover_books_for_topic, payload.topic.strip(), count=payload.count)
     except ProviderError as exc:
         raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Discovery failed: {exc}")
     # Trigger background learning for each new agent
-    for book in books:
-        agent = get_agent(book["id"])
+    agents = await run_in_threadpool(lambda: [get_agent(book["id"]) for book in books])
+    for book, agent in zip(books, agents):
         if agent and agent["status"] == "catalog":
-            background_tasks.add_task(_learn_agent, book["id"])
-    _track_usage(request, "discover")
+            _schedule_learning(background_tasks, book["id"])
+    await run_in_threadpool(_track_usage, request, "discover")
     return {"topic": payload.topic.strip(), "books": books, "usage": usage}
 
 
+def _add_searched_books(books_data: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], list[str]]:
+    """Create catalog agents for identified books; returns (results, ids still in catalog status)."""
+    results = []
+    to_learn = []
+    for entry in books_data[:1]:
+        title = entry.get("title", "").strip()
+        author = entry.get("author", "").strip()
+        category = entry.get("category", "").strip()
+        desc = entry.get("description", "").strip()
+        if not title:
+            continue
+        agent_id = create_catalog_agent(title=title, author=author, category=category, description=desc)
+        results.append({"id": agent_id, "title": title, "author": author, "existing": False})
+        agent = get_agent(agent_id)
+        if agent and agent["status"] == "catalog":
+            to_learn.append(agent_id)
+    return results, to_learn
+
+
 @app.post("/api/search-book")
-def api_search_book(payload: SearchBookRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
+async def api_search_book(payload: SearchBookRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
     """Search for a specific book by name. Uses LLM to identify the book and add it."""
-    _check_quota(request, "discover")
+    await run_in_threadpool(_check_quota, request, "discover")
     query = payload.query.strip()
     # Check if already exists
-    existing = find_agent_by_name(query)
+    existing = await run_in_threadpool(find_agent_by_name, query)
     if existing:
         return {"books": [{"id": existing["id"], "title": existing["name"], "author": existing.get("source", ""), "existing": True}], "usage": {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}}
 
@@ -1270,31 +1475,21 @@ def api_search_book(payload: SearchBookRequest, request: Request, background_tas
         "description (one sentence). Only output the JSON array, no other text."
     )
     try:
-        result, _ = chat_with_fallback(system="You are a book identification expert.", user=prompt)
-        text = result.content.strip()
-        if text.startswith("```"):
-            text = re.sub(r"^```\w*\n?", "", text)
-            text = re.sub(r"\n?```$", "", text)
-        books_data = json.loads(text)
+        result, _ = await achat_with_fallback(
+            system="You are a book identification expert.", user=prompt, json_mode=True,
+        )
+        books_data = _parse_llm_json(result.content)
+    except TimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
     except ProviderError as exc:
         raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Search failed: {exc}")
 
-    results = []
-    for entry in books_data[:1]:
-        title = entry.get("title", "").strip()
-        author = entry.get("author", "").strip()
-        category = entry.get("category", "").strip()
-        desc = entry.get("description", "").strip()
-        if not title:
-            continue
-        agent_id = create_catalog_agent(title=title, author=author, category=category, description=desc)
-        results.append({"id": agent_id, "title": title, "author": author, "existing": False})
-        agent = get_agent(agent_id)
-        if agent and agent["status"] == "catalog":
-            background_tasks.add_task(_learn_agent, agent_id)
-    _track_usage(request, "discover")
+    results, to_learn = await run_in_threadpool(_add_searched_books, books_data)
+    for agent_id in to_learn:
+        _schedule_learning(background_tasks, agent_id)
+    await run_in_threadpool(_track_usage, request, "discover")
     return {"books": results, "usage": _usage_dict(result)}
 
 
@@ -1310,17 +1505,17 @@ def _verify_cron(request: Request) -> None:
 
 
 @app.get("/api/cron/discover")
-def api_cron_discover(request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
+async def api_cron_discover(request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
     """Cron-triggered book discovery. Replaces the daemon discovery loop."""
     _verify_cron(request)
-    agents = list_agents(limit=5000)
+    agents = await run_in_threadpool(list_agents, limit=5000)
     if not agents:
         return {"status": "skip", "reason": "no agents yet"}
-    _discover_books()
+    await _discover_books()
     # Trigger learning for any new catalog agents
-    for a in list_agents(limit=5000):
+    for a in await run_in_threadpool(list_agents, limit=5000):
         if a["status"] == "catalog":
-            background_tasks.add_task(_learn_agent, a["id"])
+            _schedule_learning(background_tasks, a["id"])
     return {"status": "ok"}
 
 
@@ -1426,7 +1621,7 @@ def api_debug_embedding_status() -> dict[str, Any]:
 def pro_config() -> dict[str, Any]:
     """Public config for frontend — safe to expose."""
     return {
-        "auth_enabled": bool(os.getenv("ENABLE_AUTH")),
+        "auth_enabled": config.ENABLE_AUTH,
         "supabase_url": os.getenv("SUPABASE_URL", "").strip(),
         "supabase_key": os.getenv("SUPABASE_ANON_KEY", os.getenv("SUPABASE_KEY", "")).strip(),
         "stripe_enabled": bool(os.getenv("STRIPE_SECRET_KEY")),
@@ -1552,34 +1747,52 @@ def _run_index(agent_id: str, text: str) -> None:
         update_agent_status(agent_id, "error", {"error": str(exc)})
 
 
-@app.post("/api/agents/upload")
-def api_create_upload_agent(request: Request, background_tasks: BackgroundTasks, file: UploadFile = File(...)) -> dict[str, Any]:
-    _check_quota(request, "upload")
-    user_id = _get_user_id(request)
-    name = Path(file.filename).stem if file.filename else "Uploaded Book"
+def _schedule_index(background_tasks: BackgroundTasks, agent_id: str, text: str) -> None:
+    if config.IS_SERVERLESS:
+        background_tasks.add_task(_run_index, agent_id, text)
+    else:
+        _index_pool.submit(_run_index, agent_id, text)
 
+
+def _create_upload(request: Request, name: str, filename: str | None) -> tuple[dict[str, Any] | None, str | None]:
+    """(existing duplicate, None) or (None, new agent id) for an uploaded file."""
     existing = find_existing_upload(name)
     if existing:
-        return {"id": existing["id"], "status": existing["status"], "duplicate": True, "name": existing["name"]}
-
+        return existing, None
     _check_upload_limit(request)
+    user_id = _get_user_id(request)
+    return None, create_agent(name=name, agent_type="upload", source=filename, meta={}, user_id=user_id)
 
-    agent_id = create_agent(name=name, agent_type="upload", source=file.filename, meta={}, user_id=user_id)
-    config.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    dest = config.UPLOAD_DIR / f"{agent_id}_{file.filename}"
-    with dest.open("wb") as f:
-        f.write(file.file.read())
 
+def _extract_upload(agent_id: str, dest: Path, src: BinaryIO) -> str:
+    config.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    # Copy in 64 KiB blocks so large PDFs are never held in memory whole.
+    with dest.open("wb") as out:
+        shutil.copyfileobj(src, out, length=1 << 16)
     try:
-        text = extract_text_from_file(dest)
+        return extract_text_from_file(dest)
     except Exception as exc:
         update_agent_status(agent_id, "error", {"error": str(exc)})
         raise HTTPException(status_code=400, detail=str(exc))
     finally:
         dest.unlink(missing_ok=True)
 
-    background_tasks.add_task(_run_index, agent_id, text)
-    _track_usage(request, "upload")
+
+@app.post("/api/agents/upload")
+async def api_create_upload_agent(request: Request, background_tasks: BackgroundTasks, file: UploadFile = File(...)) -> dict[str, Any]:
+    await run_in_threadpool(_check_quota, request, "upload")
+    name = Path(file.filename).stem if file.filename else "Uploaded Book"
+
+    existing, agent_id = await run_in_threadpool(_create_upload, request, name, file.filename)
+    if existing:
+        return {"id": existing["id"], "status": existing["status"], "duplicate": True, "name": existing["name"]}
+
+    dest = config.UPLOAD_DIR / f"{agent_id}_{file.filename}"
+    # Saving and extraction (PDF parsing is CPU-bound) stay off the event loop.
+    text = await run_in_threadpool(_extract_upload, agent_id, dest, file.file)
+
+    _schedule_index(background_tasks, agent_id, text)
+    await run_in_threadpool(_track_usage, request, "upload")
     return {"id": agent_id, "status": "indexing"}
 
 
@@ -1610,7 +1823,7 @@ def api_create_upload_from_url(
         meta={"import_url": final_url},
         user_id=user_id,
     )
-    background_tasks.add_task(_run_index, agent_id, text)
+    _schedule_index(background_tasks, agent_id, text)
     _track_usage(request, "upload")
     return {"id": agent_id, "status": "indexing"}
 
@@ -1634,17 +1847,21 @@ def api_create_topic_agent(payload: TopicAgentRequest, request: Request, backgro
 
     user_id = _get_user_id(request)
     agent_id = create_agent(name=topic, agent_type="topic", source="wikipedia", meta={"language": payload.language}, user_id=user_id)
-    background_tasks.add_task(_run_index, agent_id, text)
+    _schedule_index(background_tasks, agent_id, text)
     _track_usage(request, "upload")
     return {"id": agent_id, "status": "indexing"}
 
 
 # ─── Book-specific chat (skill-based) ───
 
-@app.post("/api/agents/{agent_id}/chat")
-def api_chat(agent_id: str, payload: ChatRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
-    _check_quota(request, "chat")
-    agent = get_agent(agent_id)
+async def _prepare_book_chat(
+    agent_id: str, payload: ChatRequest, request: Request, background_tasks: BackgroundTasks,
+) -> tuple[dict[str, Any], SkillResult, str, str, list[dict[str, str]], str | None]:
+    """(agent, skill result, system prompt, user prompt, history, user id) for a book chat."""
+    # Database work and skill resolution stay synchronous and run on the
+    # threadpool; the LLM call, which dominates latency, is awaited directly.
+    await run_in_threadpool(_check_quota, request, "chat")
+    agent = await run_in_threadpool(get_agent, agent_id)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     if agent["status"] in ("error",):
@@ -1652,10 +1869,10 @@ def api_chat(agent_id: str, payload: ChatRequest, request: Request, background_t
 
     # Trigger background learning for catalog agents
     if agent["status"] == "catalog":
-        background_tasks.add_task(_learn_agent, agent_id)
+        _schedule_learning(background_tasks, agent_id)
 
     # Resolve skills
-    skill_result = resolve_skills(agent, payload.message, top_k=payload.top_k)
+    skill_result = await run_in_threadpool(resolve_skills, agent, payload.message, top_k=payload.top_k)
 
     # Build prompt
     meta = agent.get("meta") or {}
@@ -1663,9 +1880,11 @@ def api_chat(agent_id: str, payload: ChatRequest, request: Request, background_t
     author = meta.get("author") or ""
     book_hint = f'the book "{title}"' + (f" by {author}" if author else "")
 
+    # The system prompt is identical for every book so providers can serve it
+    # from their prompt cache; the book itself is named in the user message.
     system = (
         "You are Feynman, a Socratic study assistant inspired by the Feynman learning method. "
-        f"You are helping the user study {book_hint}. "
+        "You are helping the user study the book named at the start of their message. "
         "Answer using the provided context passages. Each passage has a unique number: [Passage 1], [Passage 2], [Passage 3], etc. "
         "IMPORTANT: Even though all passages are from the same book, they are DIFFERENT text segments with DIFFERENT numbers. "
         "Cite the specific passage number you used, e.g. [1], [2], [3]. Never cite all as [1] — each passage must keep its own number. "
@@ -1675,42 +1894,43 @@ def api_chat(agent_id: str, payload: ChatRequest, request: Request, background_t
     )
 
     if skill_result.context:
-        user_prompt = f"Context:\n{skill_result.context}\n\nQuestion:\n{payload.message}"
+        user_prompt = f"I am studying {book_hint}.\n\nContext:\n{skill_result.context}\n\nQuestion:\n{payload.message}"
     else:
-        user_prompt = payload.message
+        user_prompt = f"I am studying {book_hint}.\n\n{payload.message}"
 
     uid = _get_user_id(request)
-    history = [{"role": msg["role"], "content": msg["content"]} for msg in list_messages(agent_id, limit=6, user_id=uid)]
+    recent = await run_in_threadpool(list_messages, agent_id, limit=6, user_id=uid)
+    history = [{"role": msg["role"], "content": msg["content"]} for msg in recent]
+    return agent, skill_result, system, user_prompt, history, uid
+
+
+@app.post("/api/agents/{agent_id}/chat")
+async def api_chat(agent_id: str, payload: ChatRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
+    agent, skill_result, system, user_prompt, history, uid = await _prepare_book_chat(
+        agent_id, payload, request, background_tasks,
+    )
 
     try:
-        result, chat_provider = chat_with_fallback(
+        result, chat_provider = await achat_with_fallback(
             system=system, user=user_prompt, history=history,
-            use_grounding=skill_result.use_grounding,
+            use_grounding=skill_result.use_grounding, use_cache=True,
         )
+    except TimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
     except ProviderError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
-    add_message(agent_id, "user", payload.message, user_id=uid)
-    add_message(agent_id, "assistant", result.content, user_id=uid)
+    await run_in_threadpool(add_message, agent_id, "user", payload.message, user_id=uid)
+    await run_in_threadpool(add_message, agent_id, "assistant", result.content, user_id=uid)
 
     # Process LLM recommendations in background
-    background_tasks.add_task(_process_recommendations, result.content)
+    _schedule_recommendations(background_tasks, result.content)
 
     # Build references only for chunks actually cited in the response
-    answer_text = _normalize_citations(result.content)
-    cited_nums = _extract_cited_numbers(answer_text)
-    chunks = skill_result.metadata.get("chunks", [])
-    references = []
-    for idx, chunk in enumerate(chunks, start=1):
-        if idx not in cited_nums:
-            continue
-        text = chunk.get("text", "")
-        references.append({
-            "index": idx,
-            "book": agent.get("name", "Unknown"),
-            "snippet": _clean_snippet(text),
-            "full_text": text.strip(),
-        })
+    answer_text, cited_nums = _normalize_and_extract(result.content)
+    references = _cited_references(
+        skill_result.metadata.get("chunks", []), cited_nums, book=agent.get("name", "Unknown"),
+    )
 
     resp: dict[str, Any] = {
         "answer": answer_text,
@@ -1724,50 +1944,123 @@ def api_chat(agent_id: str, payload: ChatRequest, request: Request, background_t
         resp["grounded"] = True
     else:
         resp["grounded"] = False
-    _track_usage(request, "chat", resp["usage"].get("total_tokens", 0))
+    if not result.cached:
+        await run_in_threadpool(_track_usage, request, "chat", resp["usage"].get("total_tokens", 0))
     return resp
 
 
+def _sse(event: str, data: dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.post("/api/agents/{agent_id}/chat/stream")
+async def api_chat_stream(
+    agent_id: str, payload: ChatRequest, request: Request, background_tasks: BackgroundTasks,
+) -> StreamingResponse:
+    """Book chat as Server-Sent Events.
+
+    `delta` events carry answer fragments as the provider produces them; a
+    final `done` event carries the normalized answer and its references, or
+    an `error` event reports a provider failing mid-answer. Streamed answers
+    are never web-grounded or cached.
+    """
+    agent, skill_result, system, user_prompt, history, uid = await _prepare_book_chat(
+        agent_id, payload, request, background_tasks,
+    )
+
+    stream = chat_stream_with_fallback(system=system, user=user_prompt, history=history)
+    # Wait for the first fragment here so that no provider answering is
+    # still reported as a plain HTTP error.
+    try:
+        first = await run_in_threadpool(next, stream, None)
+    except ProviderError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    def events() -> Iterator[bytes]:
+        parts: list[str] = []
+        try:
+            if first is not None:
+                parts.append(first)
+                yield _sse("delta", {"text": first})
+            for fragment in stream:
+                parts.append(fragment)
+                yield _sse("delta", {"text": fragment})
+        except Exception as exc:
+            log.warning("Chat stream for agent %s failed: %s", agent_id, exc)
+            yield _sse("error", {"detail": str(exc)})
+            return
+
+        content = "".join(parts)
+        add_message(agent_id, "user", payload.message, user_id=uid)
+        add_message(agent_id, "assistant", content, user_id=uid)
+        # Background tasks run once the response has been sent in full.
+        _schedule_recommendations(background_tasks, content)
+
+        answer_text, cited_nums = _normalize_and_extract(content)
+        references = _cited_references(
+            skill_result.metadata.get("chunks", []), cited_nums, book=agent.get("name", "Unknown"),
+        )
+        # Streaming APIs don't report token counts, so only the request is counted.
+        _track_usage(request, "chat")
+        yield _sse("done", {
+            "answer": answer_text,
+            "skill_used": skill_result.skill_name,
+            "references": references,
+            "grounded": False,
+        })
+
+    # A sync iterator: Starlette pulls each event on its threadpool.
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 # ─── Global cross-book chat (skill-based) ───
 
-@app.post("/api/chat")
-def api_global_chat(payload: GlobalChatRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
-    _check_quota(request, "chat")
-    # Gather target agents
+def _global_chat_targets(payload: GlobalChatRequest) -> list[dict[str, Any]]:
+    """Agents a global chat is about: explicit agent_ids plus book_context titles."""
     target_agents: list[dict[str, Any]] = []
 
     if payload.agent_ids:
-        for aid in payload.agent_ids:
-            a = get_agent(aid)
-            if a:
-                target_agents.append(a)
+        target_agents.extend(list_agents_by_ids(payload.agent_ids))
 
     # Also resolve from book_context titles (for catalog books without agent_ids in payload)
     if payload.book_context:
         known_ids = {a["id"] for a in target_agents}
+        by_name = find_agents_by_names([bc.title for bc in payload.book_context])
+        missing = [
+            {"title": bc.title, "author": bc.author}
+            for bc in payload.book_context if bc.title.lower() not in by_name
+        ]
+        if missing:
+            # Chat-driven creation: auto-create agents for unknown books
+            new_ids = [agent_id for agent_id, _ in create_catalog_agents_bulk(missing)]
+            new_agents = {a["id"]: a for a in list_agents_by_ids(new_ids)}
+            for book, agent_id in zip(missing, new_ids):
+                if agent_id in new_agents:
+                    by_name[book["title"].lower()] = new_agents[agent_id]
         for bc in payload.book_context:
-            agent = find_agent_by_name(bc.title)
+            agent = by_name.get(bc.title.lower())
             if agent and agent["id"] not in known_ids:
                 target_agents.append(agent)
                 known_ids.add(agent["id"])
-            elif not agent:
-                # Chat-driven creation: auto-create agent for unknown book
-                new_id = create_catalog_agent(title=bc.title, author=bc.author)
-                new_agent = get_agent(new_id)
-                if new_agent:
-                    target_agents.append(new_agent)
-                    known_ids.add(new_id)
+    return target_agents
+
+
+@app.post("/api/chat")
+async def api_global_chat(payload: GlobalChatRequest, request: Request, background_tasks: BackgroundTasks) -> dict[str, Any]:
+    await run_in_threadpool(_check_quota, request, "chat")
+    # Gather target agents
+    target_agents = await run_in_threadpool(_global_chat_targets, payload)
 
     # Trigger learning for catalog agents
     for a in target_agents:
         if a["status"] == "catalog":
-            background_tasks.add_task(_learn_agent, a["id"])
+            _schedule_learning(background_tasks, a["id"])
 
     # Build book focus string
     book_focus = ""
     if payload.book_context:
         titles = [f'"{b.title}" by {b.author}' if b.author else f'"{b.title}"' for b in payload.book_context]
-        book_focus = "The user is studying: " + ", ".join(titles) + ". "
+        book_focus = "I am studying: " + ", ".join(titles) + ".\n\n"
 
     # Run skill resolution and RAG retrieval concurrently
     use_grounding = False
@@ -1777,14 +2070,8 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
     rag_context = ""
     rag_chunks: list[dict[str, Any]] = []
 
-    skill_results: list | None = None
     rag_result_holder: list[dict[str, Any]] = []
 
-    def _run_skills():
-        nonlocal skill_results
-        if target_agents:
-            skill_results = resolve_multi_agent(target_agents, payload.message, top_k=payload.top_k)
-
     def _run_rag():
         nonlocal rag_result_holder
         try:
@@ -1798,10 +2085,11 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
         except ProviderError:
             pass
 
-    with ThreadPoolExecutor(max_workers=2) as pool:
-        futures = [pool.submit(_run_skills), pool.submit(_run_rag)]
-        for f in futures:
-            f.result()
+    # Every agent's skill resolution and the cross-book retrieval run at once
+    *skill_results, _ = await asyncio.gather(
+        *(aresolve_agent_skill(a, payload.message, payload.top_k) for a in target_agents),
+        run_in_threadpool(_run_rag),
+    )
 
     if skill_results and target_agents:
         context_parts = []
@@ -1809,7 +2097,7 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
             if sr.use_grounding:
                 use_grounding = True
             if sr.context:
-                clean = re.sub(r"\[\d+\]\s*(?:\(from\s+\"[^\"]*\"\)\s*)?", "", sr.context)
+                clean = _SKILL_CITE_RE.sub("", sr.context)
                 context_parts.append(f"--- {agent['name']} ---\n{clean}")
         supplementary_context = "\n\n".join(context_parts)
 
@@ -1831,11 +2119,12 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
     else:
         final_context = supplementary_context
 
-    # Build system prompt and user message
+    # Build system prompt and user message. Each system prompt is fixed text so
+    # providers can serve it from their prompt cache; the selected books go at
+    # the start of the user message instead.
     if final_context:
         system = (
             "You are Feynman, a Socratic study assistant that helps users learn through questioning. "
-            f"{book_focus}"
             "Use the provided context passages to answer. Each passage has a unique number: [Passage 1], [Passage 2], [Passage 3], etc. "
             "IMPORTANT: Even when multiple passages come from the same book, they are DIFFERENT text segments with DIFFERENT numbers. "
             "Cite the specific passage number you used, e.g. [1], [2], [3]. Never cite all as [1] — each passage must keep its own number. "
@@ -1843,27 +2132,27 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
             "Encourage deeper thinking by suggesting follow-up questions. "
             "Respond in the same language as the user's question."
         )
-        user_prompt = f"Context from books:\n{final_context}\n\nQuestion:\n{payload.message}"
+        user_prompt = f"{book_focus}Context from books:\n{final_context}\n\nQuestion:\n{payload.message}"
     elif book_focus and use_grounding:
         system = (
             "You are Feynman, a Socratic study assistant that helps users learn through questioning. "
-            f"{book_focus}"
+            "The user is studying the books named at the start of their message. "
             "Use your deep knowledge of these books to answer the user's questions. "
             "Reference specific ideas, chapters, and arguments from the books. "
             "Encourage deeper thinking by suggesting follow-up questions. "
             "Respond in the same language as the user's question."
         )
-        user_prompt = payload.message
+        user_prompt = f"{book_focus}{payload.message}"
     elif book_focus:
         system = (
             "You are Feynman, a Socratic study assistant that helps users learn through questioning. "
-            f"{book_focus}"
+            "The user is studying the books named at the start of their message. "
             "Use your knowledge of these books to answer. "
             "Reference specific ideas and concepts from the books. "
             "Encourage deeper thinking by suggesting follow-up questions. "
             "Respond in the same language as the user's question."
         )
-        user_prompt = payload.message
+        user_prompt = f"{book_focus}{payload.message}"
     else:
         system = (
             "You are Feynman, a Socratic study assistant that helps users learn through questioning. "
@@ -1878,14 +2167,17 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
         conv_history = None
         if payload.history:
             conv_history = [{"role": m.role, "content": m.content} for m in payload.history]
-        result, chat_provider = chat_with_fallback(
+        result, chat_provider = await achat_with_fallback(
             system=system, user=user_prompt, history=conv_history, use_grounding=use_grounding,
+            use_cache=True,
         )
+    except TimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
     except ProviderError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
 
     # Process LLM recommendations in background
-    background_tasks.add_task(_process_recommendations, result.content)
+    _schedule_recommendations(background_tasks, result.content)
 
     # Deduplicate source agents from RAG chunks
     seen: set[str] = set()
@@ -1897,19 +2189,8 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
             sources.append({"agent_id": aid, "agent_name": chunk.get("agent_name", "Unknown")})
 
     # Build references only for chunks actually cited in the response
-    answer_text = _normalize_citations(result.content)
-    cited_nums = _extract_cited_numbers(answer_text)
-    references = []
-    for idx, chunk in enumerate(rag_chunks, start=1):
-        if idx not in cited_nums:
-            continue
-        text = chunk.get("text", "")
-        references.append({
-            "index": idx,
-            "book": chunk.get("agent_name", "Unknown"),
-            "snippet": _clean_snippet(text),
-            "full_text": text.strip(),
-        })
+    answer_text, cited_nums = _normalize_and_extract(result.content)
+    references = _cited_references(rag_chunks, cited_nums)
 
     resp: dict[str, Any] = {
         "answer": answer_text,
@@ -1924,7 +2205,8 @@ def api_global_chat(payload: GlobalChatRequest, request: Request, background_tas
     else:
         resp["grounded"] = False
 
-    _track_usage(request, "chat", resp["usage"].get("total_tokens", 0))
+    if not result.cached:
+        await run_in_threadpool(_track_usage, request, "chat", resp["usage"].get("total_tokens", 0))
     return resp
 
 
@@ -2054,9 +2336,9 @@ def api_create_vote(payload: VoteRequest, background_tasks: BackgroundTasks) ->
         existing = find_agent_by_name(payload.title.strip())
         if not existing:
             agent_id = create_catalog_agent(title=payload.title.strip())
-            background_tasks.add_task(_learn_agent, agent_id)
+            _schedule_learning(background_tasks, agent_id)
         elif existing["status"] == "catalog":
-            background_tasks.add_task(_learn_agent, existing["id"])
+            _schedule_learning(background_tasks, existing["id"])
     return result
 
 
@@ -2070,9 +2352,9 @@ def api_upvote(vote_id: str, background_tasks: BackgroundTasks) -> dict[str, Any
         existing = find_agent_by_name(result["title"])
         if not existing:
             agent_id = create_catalog_agent(title=result["title"])
-            background_tasks.add_task(_learn_agent, agent_id)
+            _schedule_learning(background_tasks, agent_id)
         elif existing["status"] == "catalog":
-            background_tasks.add_task(_learn_agent, existing["id"])
+            _schedule_learning(background_tasks, existing["id"])
     return result
 
 
@@ -2514,7 +2796,7 @@ def api_generate_mind(payload: MindGenerateRequest, request: Request, background
         for agent_id in get_mind_work_ids(mind["id"]):
             agent = get_agent(agent_id)
             if agent and agent["status"] == "catalog":
-                background_tasks.add_task(_learn_agent, agent_id)
+                _schedule_learning(background_tasks, agent_id)
     safe = {k: v for k, v in mind.items() if k != "persona"}
     _track_usage(request, "generate_mind")
     return safe
@@ -2541,7 +2823,7 @@ def api_create_mind_from_content(
     for agent_id in get_mind_work_ids(mind["id"]):
         agent = get_agent(agent_id)
         if agent and agent["status"] == "catalog":
-            background_tasks.add_task(_learn_agent, agent_id)
+            _schedule_learning(background_tasks, agent_id)
     safe = {k: v for k, v in mind.items() if k != "persona"}
     _track_usage(request, "custom_minds")
     return safe
@@ -0,0 +1,21 @@
+"""Shared fixtures for the test suite."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from app.core import db
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    """An initialised SQLite database under tmp_path, in place of the real one."""
+    path = tmp_path / "test.db"
+    with patch("app.core.db.DB_PATH", path), \
+         patch("app.core.db.DATA_DIR", tmp_path), \
+         patch("app.core.db._USE_PG", False):
+        db.init_db()
+        yield path
+    db._close_sqlite_pools(str(path))
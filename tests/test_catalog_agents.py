@@ -0,0 +1,141 @@
+"""Tests for catalog agent seeding/creation helpers in db.py."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from app.core import db
+
+
+def _agent_names() -> list[str]:
+    with db.get_conn() as conn:
+        return sorted(r["name"] for r in db._fetchall(conn, "SELECT name FROM agents"))
+
+
+class TestEnsureCatalogAgents:
+    def test_inserts_missing_titles(self, fresh_db):
+        db.ensure_catalog_agents([
+            {"title": "Thinking, Fast and Slow", "author": "Daniel Kahneman"},
+            {"title": "The Selfish Gene", "author": "Richard Dawkins"},
+        ])
+        assert _agent_names() == ["The Selfish Gene", "Thinking, Fast and Slow"]
+
+    def test_skips_existing_titles_case_insensitively(self, fresh_db):
+        db.create_agent("the selfish gene", "upload", None, {})
+        db.ensure_catalog_agents([{"title": "The Selfish Gene"}, {"title": "Sapiens"}])
+        assert _agent_names() == ["Sapiens", "the selfish gene"]
+
+    def test_is_idempotent_and_dedupes_input(self, fresh_db):
+        catalog = [{"title": "Sapiens"}, {"title": "SAPIENS"}]
+        db.ensure_catalog_agents(catalog)
+        db.ensure_catalog_agents(catalog)
+        assert _agent_names() == ["Sapiens"]
+
+    def test_large_catalog_spans_lookup_batches(self, fresh_db):
+        catalog = [{"title": f"Book {i}"} for i in range(1200)]
+        db.ensure_catalog_agents(catalog[:700])
+        db.ensure_catalog_agents(catalog)
+        assert len(_agent_names()) == 1200
+
+    def test_name_lookup_uses_index(self, fresh_db):
+        with db.get_conn() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM agents WHERE LOWER(name) = LOWER(?)", ("x",)
+            ).fetchall()
+        assert any("idx_agents_name_lower" in row["detail"] for row in plan)
+
+
+class TestCreateCatalogAgentsBulk:
+    def test_creates_new_and_reuses_existing(self, fresh_db):
+        existing_id = db.create_catalog_agent(title="Dune", author="Frank Herbert")
+        result = db.create_catalog_agents_bulk([
+            {"title": "DUNE"},
+            {"title": "Emma", "author": "Jane Austen", "category": "Fiction"},
+        ])
+        assert result[0] == (existing_id, False)
+        new_id, created = result[1]
+        assert created
+        agent = db.get_agent(new_id)
+        assert agent["status"] == "catalog"
+        assert agent["meta"]["category"] == "Fiction"
+        assert agent["source"] == "Jane Austen"
+
+    def test_duplicates_in_batch_share_one_agent(self, fresh_db):
+        result = db.create_catalog_agents_bulk([{"title": "Emma"}, {"title": "emma"}])
+        assert result[0][0] == result[1][0]
+        assert [created for _, created in result] == [True, False]
+        assert _agent_names() == ["Emma"]
+
+    def test_empty_input(self, fresh_db):
+        assert db.create_catalog_agents_bulk([]) == []
+
+
+class TestUpdateAgentMeta:
+    def test_merges_keys_without_touching_others(self, fresh_db):
+        agent_id = db.create_catalog_agent(title="Dune", author="Frank Herbert", category="Fiction")
+        db.update_agent_meta(agent_id, {"title": "Dune Messiah", "extra": {"n": 1}, "isbn": None})
+        meta = db.get_agent(agent_id)["meta"]
+        assert meta["title"] == "Dune Messiah"
+        assert meta["extra"] == {"n": 1}
+        assert meta["isbn"] is None
+        assert meta["category"] == "Fiction"
+        assert meta["author"] == "Frank Herbert"
+
+    def test_unknown_agent_is_noop(self, fresh_db):
+        db.update_agent_meta("missing", {"title": "x"})
+
+
+class TestClaimAgentStatus:
+    def test_only_first_claim_wins(self, fresh_db):
+        agent_id = db.create_catalog_agent(title="Dune")
+        assert db.claim_agent_status(agent_id, "catalog", "indexing")
+        assert not db.claim_agent_status(agent_id, "catalog", "indexing")
+        assert db.get_agent(agent_id)["status"] == "indexing"
+
+    def test_unknown_agent_is_not_claimed(self, fresh_db):
+        assert not db.claim_agent_status("missing", "catalog", "indexing")
+
+
+class TestAgentCache:
+    def test_repeat_reads_skip_the_database(self, fresh_db):
+        agent_id = db.create_catalog_agent(title="Dune")
+        db.get_agent(agent_id)
+        db.find_agent_by_name("DUNE")
+        with patch("app.core.db.get_ro_conn", side_effect=AssertionError("queried")):
+            assert db.get_agent(agent_id)["name"] == "Dune"
+            assert db.find_agent_by_name("dune")["id"] == agent_id
+
+    def test_writes_invalidate(self, fresh_db):
+        agent_id = db.create_catalog_agent(title="Dune")
+        assert db.get_agent(agent_id)["status"] == "catalog"
+        db.update_agent_status(agent_id, "ready")
+        assert db.get_agent(agent_id)["status"] == "ready"
+        db.rename_agent(agent_id, "Dune Messiah")
+        assert db.find_agent_by_name("Dune") is None
+        assert db.find_agent_by_name("Dune Messiah")["id"] == agent_id
+
+    def test_returned_agents_are_copies(self, fresh_db):
+        agent_id = db.create_catalog_agent(title="Dune", category="Fiction")
+        db.get_agent(agent_id)["meta"]["category"] = "changed"
+        assert db.get_agent(agent_id)["meta"]["category"] == "Fiction"
+
+
+class TestBatchAgentLookups:
+    def test_list_agents_by_ids_keeps_order_and_skips_unknown(self, fresh_db):
+        a = db.create_catalog_agent(title="Dune")
+        b = db.create_catalog_agent(title="Emma")
+        agents = db.list_agents_by_ids([b, "missing", a, b])
+        assert [x["id"] for x in agents] == [b, a, b]
+
+    def test_find_agents_by_names_is_case_insensitive(self, fresh_db):
+        a = db.create_catalog_agent(title="Dune")
+        found = db.find_agents_by_names(["DUNE", "Unknown"])
+        assert list(found) == ["dune"]
+        assert found["dune"]["id"] == a
+
+    def test_one_query_for_many_ids(self, fresh_db):
+        ids = [db.create_catalog_agent(title=f"Book {i}") for i in range(5)]
+        db._agent_cache.clear()
+        with patch("app.core.db._fetchall", wraps=db._fetchall) as fetchall:
+            assert len(db.list_agents_by_ids(ids)) == 5
+        assert fetchall.call_count == 1
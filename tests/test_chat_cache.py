@@ -0,0 +1,112 @@
+"""Tests for the in-process chat response cache."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.providers import ChatResult, TokenUsage, _TTLCache, achat_with_fallback, cached_chat, chat_with_fallback
+
+
+def _provider(name: str = "p1") -> MagicMock:
+    provider = MagicMock()
+    provider.name = name
+    provider.chat_model = "m"
+    provider.chat.side_effect = lambda **kw: ChatResult(content=kw["user"].upper(), raw={})
+    return provider
+
+
+class TestTTLCache:
+    def test_evicts_least_recently_used(self):
+        cache = _TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+
+    def test_entries_expire(self):
+        cache = _TTLCache(maxsize=2, ttl=10)
+        with patch("app.core.providers.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("app.core.providers.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+
+    def test_zero_ttl_disables(self):
+        cache = _TTLCache(maxsize=2, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+class TestCachedChat:
+    def test_repeat_prompt_is_served_from_cache(self):
+        with patch("app.core.providers._chat_cache", _TTLCache(8, 60)):
+            provider = _provider()
+            assert cached_chat(provider, "sys", "hello").content == "HELLO"
+            assert cached_chat(provider, "sys", "hello").content == "HELLO"
+            assert provider.chat.call_count == 1
+
+    def test_key_covers_provider_system_and_history(self):
+        with patch("app.core.providers._chat_cache", _TTLCache(8, 60)):
+            p1, p2 = _provider("p1"), _provider("p2")
+            cached_chat(p1, "sys", "hello")
+            cached_chat(p2, "sys", "hello")
+            cached_chat(p1, "other", "hello")
+            cached_chat(p1, "sys", "hello", history=[{"role": "user", "content": "x"}])
+            assert p1.chat.call_count == 3
+            assert p2.chat.call_count == 1
+
+
+class TestFallbackCache:
+    def _patched(self, provider):
+        return (
+            patch("app.core.providers._chat_cache", _TTLCache(8, 60)),
+            patch("app.core.providers.get_provider", return_value=provider),
+            patch("app.core.providers.config.PROVIDER_ORDER", ["p1"]),
+        )
+
+    def test_opt_in_repeat_skips_providers(self):
+        provider = _provider()
+        cache, get, order = self._patched(provider)
+        with cache, get, order:
+            first, _ = chat_with_fallback("sys", "hello", use_cache=True)
+            second, used = chat_with_fallback("sys", "hello", use_cache=True)
+            assert second.content == first.content == "HELLO"
+            assert used is provider
+            assert provider.chat.call_count == 1
+
+    def test_hits_report_no_usage(self):
+        provider = _provider()
+        provider.chat.side_effect = lambda **kw: ChatResult(
+            content="hi", raw={}, usage=TokenUsage(input_tokens=3, output_tokens=2, total_tokens=5),
+        )
+        cache, get, order = self._patched(provider)
+        with cache, get, order:
+            first, _ = chat_with_fallback("sys", "hello", use_cache=True)
+            second, _ = chat_with_fallback("sys", "hello", use_cache=True)
+            assert first.usage.total_tokens == 5 and not first.cached
+            assert second.usage is None and second.cached
+            assert second.content == "hi"
+
+    def test_uncached_by_default_and_when_grounded(self):
+        provider = _provider()
+        cache, get, order = self._patched(provider)
+        with cache, get, order:
+            chat_with_fallback("sys", "hello")
+            chat_with_fallback("sys", "hello")
+            chat_with_fallback("sys", "hello", use_grounding=True, use_cache=True)
+            chat_with_fallback("sys", "hello", use_grounding=True, use_cache=True)
+            assert provider.chat.call_count == 4
+
+    def test_async_shares_the_cache(self):
+        provider = _provider()
+        provider.achat = AsyncMock(side_effect=lambda **kw: ChatResult(content="async", raw={}))
+        cache, get, order = self._patched(provider)
+        with cache, get, order:
+            chat_with_fallback("sys", "hello", use_cache=True)
+            result, _ = asyncio.run(achat_with_fallback("sys", "hello", use_cache=True))
+            assert result.content == "HELLO"
+            provider.achat.assert_not_called()
+            result, _ = asyncio.run(achat_with_fallback("sys", "new", use_cache=True))
+            assert result.content == "async"
@@ -0,0 +1,89 @@
+"""Tests for the streaming book chat endpoint in main.py."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core import db
+from app.core.providers import ProviderError
+from app.core.skills import SkillResult
+
+SKILL = SkillResult(
+    context="[Passage 1] passage", skill_name="rag",
+    metadata={"chunks": [{"id": "c1", "chunk_index": 0, "text": "passage"}]},
+)
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        event, data = block.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[7:], orjson.loads(data[6:])))
+    return events
+
+
+@pytest.fixture
+def agent_id(fresh_db):
+    agent = db.create_agent("Book", "upload", "book.txt", {})
+    db.update_agent_status(agent, "ready")
+    return agent
+
+
+def _stream(agent_id: str, fragments):
+    with patch("app.main.resolve_skills", return_value=SKILL), \
+         patch("app.main.chat_stream_with_fallback", side_effect=lambda **kw: fragments()), \
+         patch("app.main._schedule_recommendations") as schedule:
+        resp = TestClient(main.app).post(f"/api/agents/{agent_id}/chat/stream", json={"message": "hi"})
+    return resp, schedule
+
+
+class TestChatStream:
+    def test_deltas_then_done(self, agent_id):
+        def fragments():
+            yield "Hello "
+            yield "[Context 1]"
+
+        resp, schedule = _stream(agent_id, fragments)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = _events(resp.text)
+        assert events[:2] == [("delta", {"text": "Hello "}), ("delta", {"text": "[Context 1]"})]
+        name, done = events[2]
+        assert name == "done" and len(events) == 3
+        assert done["answer"] == "Hello [1]"
+        assert done["skill_used"] == "rag"
+        assert [r["index"] for r in done["references"]] == [1]
+        assert done["grounded"] is False
+        schedule.assert_called_once()
+        assert schedule.call_args[0][1] == "Hello [Context 1]"
+
+    def test_no_provider_is_an_http_error(self, agent_id):
+        def fragments():
+            raise ProviderError("All providers failed")
+            yield
+
+        resp, schedule = _stream(agent_id, fragments)
+        assert resp.status_code == 400
+        schedule.assert_not_called()
+
+    def test_failure_mid_answer_is_an_error_event(self, agent_id):
+        def fragments():
+            yield "partial"
+            raise RuntimeError("connection dropped")
+
+        resp, schedule = _stream(agent_id, fragments)
+        assert resp.status_code == 200
+        assert _events(resp.text) == [("delta", {"text": "partial"}), ("error", {"detail": "connection dropped"})]
+        schedule.assert_not_called()
+
+    def test_unknown_agent(self, fresh_db):
+        resp = TestClient(main.app).post("/api/agents/missing/chat/stream", json={"message": "hi"})
+        assert resp.status_code == 404
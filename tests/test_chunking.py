@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import pytest
 
-from app.core.text_utils import chunk_text, _split_by_sentences
+from app.core.text_utils import chunk_text, normalize_text, _split_by_sentences
 
 
 class TestChunkTextBasics:
@@ -118,3 +118,11 @@ class TestBackwardCompatibility:
         chunks = chunk_text(text, max_chars=1200, overlap=0)
         assert len(chunks) > 0
         assert all(len(c) <= 1200 for c in chunks)
+
+
+class TestNormalizeText:
+    def test_collapses_unicode_whitespace(self):
+        assert normalize_text("  a\u00a0\u00a0b\n\n\tc\u2003d\u3000 ") == "a b c d"
+
+    def test_whitespace_only(self):
+        assert normalize_text(" \n\t\u00a0") == ""
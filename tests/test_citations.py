@@ -0,0 +1,55 @@
+"""Tests for citation normalization in main.py."""
+
+from __future__ import annotations
+
+import random
+import re
+
+from app.main import _normalize_and_extract
+
+# The two passes _normalize_and_extract replaced, kept as the reference.
+_VERBOSE_CITE_RE = re.compile(
+    r"\[(?:Google [\w\s]+?|Context|Source|Sources|Ref|Reference|Passage)\s*((?:\d+(?:\s*,\s*)?)+)\]"
+)
+_CITE_GROUP_RE = re.compile(r"\[([\d,\s]+)\]")
+
+
+def _two_pass(text: str) -> tuple[str, set[int]]:
+    if "[" not in text:
+        return text, set()
+    text = _VERBOSE_CITE_RE.sub(lambda m: f"[{m.group(1).strip()}]", text)
+    cited: set[int] = set()
+    for group in _CITE_GROUP_RE.findall(text):
+        for num in group.split(","):
+            num = num.strip()
+            if num.isdigit():
+                cited.add(int(num))
+    return text, cited
+
+
+_PIECES = [
+    "[", "]", "1", "23", ",", " ", ", ", "Context", "Context ", "Source ", "Sources", "Ref",
+    "Reference ", "Passage ", "Google Books ", "Google ", "word", "\n", "[[", "]]", "x",
+]
+
+
+class TestNormalizeAndExtract:
+    def test_verbose_citations_become_plain(self):
+        text, cited = _normalize_and_extract("As shown [Context 1, 2] and [Passage 3].")
+        assert text == "As shown [1, 2] and [3]."
+        assert cited == {1, 2, 3}
+
+    def test_plain_citations_are_kept(self):
+        assert _normalize_and_extract("See [1] and [2, 4].") == ("See [1] and [2, 4].", {1, 2, 4})
+
+    def test_text_without_brackets(self):
+        assert _normalize_and_extract("No citations here.") == ("No citations here.", set())
+
+    def test_non_numeric_brackets_are_ignored(self):
+        assert _normalize_and_extract("A [note] and [ , ].") == ("A [note] and [ , ].", set())
+
+    def test_matches_the_two_pass_version(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            text = "".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 24)))
+            assert _normalize_and_extract(text) == _two_pass(text), text
@@ -30,6 +30,19 @@ def _make_chunk(agent_id: str, index: int, vec: np.ndarray) -> dict:
     }
 
 
+@pytest.fixture(autouse=True)
+def isolated_db(tmp_path):
+    # Keyword search and the embedding cache still read the database; keep
+    # them on an empty throwaway file instead of the real data directory.
+    path = tmp_path / "dedup.db"
+    with patch("app.core.db.DB_PATH", path), \
+         patch("app.core.db.DATA_DIR", tmp_path), \
+         patch("app.core.db._USE_PG", False):
+        yield path
+    from app.core import db
+    db._close_sqlite_pools(str(path))
+
+
 @pytest.fixture
 def three_agents():
     return [_make_agent("Book A"), _make_agent("Book B"), _make_agent("Book C")]
@@ -131,3 +144,22 @@ def test_dedup_preserves_score_order_within_overflow(three_agents):
     assert results[1]["agent_id"] == b["id"], "Best from B should come next (dedup)"
     # Overflow from A should follow
     assert results[2]["agent_id"] == a["id"]
+
+
+def test_agent_outside_candidate_pool_keeps_its_slot(three_agents):
+    """An agent whose best chunk ranks below the top-k candidate pool is still represented."""
+    a, b = three_agents[:2]
+    query_dir = np.array([1, 0, 0, 0], dtype=np.float32)
+
+    chunks = [_make_chunk(a["id"], i, query_dir + np.array([0, i * 0.01, 0, 0], dtype=np.float32))
+              for i in range(30)]
+    chunks.append(_make_chunk(b["id"], 0, np.array([0.2, 1, 0, 0], dtype=np.float32)))
+
+    with patch("app.core.rag.list_agents", return_value=three_agents[:2]), \
+         patch("app.core.rag.get_chunks_batch", return_value=chunks), \
+         patch("app.core.rag.pick_provider") as mock_pick:
+        mock_pick.return_value.embed_texts.return_value = [[float(x) for x in query_dir]]
+
+        results = retrieve_cross_book("test query", top_k=2)
+
+    assert [r["agent_id"] for r in results] == [a["id"], b["id"]]
@@ -0,0 +1,52 @@
+"""Tests for batched multi-category book discovery in main.py."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import pytest
+
+from app.core import db
+from app.core.providers import ChatResult
+from app.main import _discover_books_for_categories
+
+
+def _reply(payload) -> AsyncMock:
+    return AsyncMock(return_value=(ChatResult(content=orjson.dumps(payload).decode(), raw={}), None))
+
+
+class TestDiscoverBooksForCategories:
+    def test_one_call_covers_every_category(self, fresh_db):
+        reply = _reply({
+            "Physics": [
+                {"title": "QED", "author": "Feynman", "description": "Light."},
+                {"title": "Cosmos", "author": "Sagan"},
+                {"title": "Extra", "author": "Over the count"},
+            ],
+            "History": [{"title": " ", "author": "blank"}, {"title": "SPQR", "author": "Beard"}],
+            "Unasked": [{"title": "Ignored"}],
+        })
+        with patch("app.main.achat_with_fallback", reply):
+            books = asyncio.run(_discover_books_for_categories({"Physics": 2, "History": 2, "Art": 1}))
+        reply.assert_awaited_once()
+        assert [(b["title"], b["author"], b["created"]) for b in books] == [
+            ("QED", "Feynman", True), ("Cosmos", "Sagan", True), ("SPQR", "Beard", True),
+        ]
+        agent = db.get_agent(books[0]["id"])
+        assert agent["status"] == "catalog"
+        assert agent["meta"]["category"] == "Physics"
+
+    def test_known_titles_are_not_recreated(self, fresh_db):
+        reply = _reply({"Physics": [{"title": "QED", "author": "Feynman"}]})
+        with patch("app.main.achat_with_fallback", reply):
+            first = asyncio.run(_discover_books_for_categories({"Physics": 1}))
+            second = asyncio.run(_discover_books_for_categories({"Physics": 1}))
+        assert second[0]["id"] == first[0]["id"]
+        assert second[0]["created"] is False
+
+    def test_non_object_reply_raises(self, fresh_db):
+        with patch("app.main.achat_with_fallback", _reply([{"title": "QED"}])):
+            with pytest.raises(ValueError):
+                asyncio.run(_discover_books_for_categories({"Physics": 1}))
@@ -0,0 +1,53 @@
+"""Tests for the content-addressed embedding cache."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+from app.core.embed_cache import embed_with_cache, get_or_compute_many
+
+
+class TestGetOrComputeMany:
+    def test_only_misses_are_computed(self, fresh_db):
+        compute = MagicMock(side_effect=lambda batch: [[float(len(t)), 1.0] for t in batch])
+        first = get_or_compute_many(["a", "bb"], "m", "RETRIEVAL_QUERY", compute)
+        second = get_or_compute_many(["bb", "ccc", "a"], "m", "RETRIEVAL_QUERY", compute)
+        assert first == [[1.0, 1.0], [2.0, 1.0]]
+        assert second == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+        assert compute.call_args_list[1].args[0] == ["ccc"]
+
+    def test_key_includes_model_and_task_type(self, fresh_db):
+        compute = MagicMock(return_value=[[1.0]])
+        get_or_compute_many(["a"], "m1", "RETRIEVAL_QUERY", compute)
+        get_or_compute_many(["a"], "m2", "RETRIEVAL_QUERY", compute)
+        get_or_compute_many(["a"], "m1", "RETRIEVAL_DOCUMENT", compute)
+        assert compute.call_count == 3
+
+
+class TestEmbedWithCache:
+    def test_provider_without_model_name_bypasses_cache(self):
+        embedder = MagicMock()
+        embedder.embed_texts.return_value = [[0.5]]
+        with patch("app.core.embed_cache.get_cached_embeddings") as lookup:
+            assert embed_with_cache(embedder, ["x"]) == [[0.5]]
+        lookup.assert_not_called()
+
+    def test_repeated_texts_are_embedded_once(self, fresh_db):
+        embedder = MagicMock()
+        embedder.name = "openai"
+        embedder.embed_model = "m"
+        embedder.embed_texts.side_effect = lambda batch, task_type=None: [[float(len(t))] for t in batch]
+        vectors = embed_with_cache(embedder, ["aa", "b", "aa", "b", "ccc"], task_type="RETRIEVAL_DOCUMENT")
+        assert vectors == [[2.0], [1.0], [2.0], [1.0], [3.0]]
+        embedder.embed_texts.assert_called_once_with(["aa", "b", "ccc"], task_type="RETRIEVAL_DOCUMENT")
+
+    def test_query_embeddings_are_not_stored(self, fresh_db):
+        embedder = MagicMock()
+        embedder.name = "openai"
+        embedder.embed_model = "m"
+        embedder.embed_texts.return_value = [[0.5]]
+        with patch("app.core.embed_cache.put_cached_embeddings") as store, \
+             patch("app.core.embed_cache.get_cached_embeddings") as lookup:
+            assert embed_with_cache(embedder, ["what is dune?"], task_type="RETRIEVAL_QUERY") == [[0.5]]
+        store.assert_not_called()
+        lookup.assert_not_called()
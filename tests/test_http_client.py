@@ -0,0 +1,29 @@
+"""Tests for the shared pooled httpx clients."""
+
+from __future__ import annotations
+
+from app.core import http_client
+
+
+class TestSharedClient:
+    def test_same_name_reuses_client(self):
+        try:
+            assert http_client.get_client("t1") is http_client.get_client("t1")
+            assert http_client.get_client("t1") is not http_client.get_client("t2")
+        finally:
+            http_client.close_clients()
+
+    def test_close_clients_forgets_closed_clients(self):
+        first = http_client.get_client("t1")
+        http_client.close_clients()
+        assert first.is_closed
+        second = http_client.get_client("t1")
+        assert second is not first
+        http_client.close_clients()
+
+    def test_fork_reset_drops_inherited_clients(self):
+        inherited = http_client.get_client("t1")
+        http_client._forget_clients_after_fork()
+        assert http_client.get_client("t1") is not inherited
+        inherited.close()
+        http_client.close_clients()
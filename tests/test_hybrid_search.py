@@ -52,6 +52,13 @@ class TestRRFFusion:
     def test_empty_both(self):
         assert _rrf_fuse([], []) == []
 
+    def test_keeps_vector_score_for_keyword_hits(self):
+        kw = [{"id": "a", "text": ""}, {"id": "b", "text": ""}]
+        vec = [{"id": "a", "text": "", "score": 0.8, "vector_score": 0.8}]
+        fused = {r["id"]: r for r in _rrf_fuse(kw, vec)}
+        assert fused["a"]["vector_score"] == 0.8
+        assert "vector_score" not in fused["b"]
+
 
 class TestSyncFTS:
     """Test FTS sync with a real SQLite DB."""
@@ -176,3 +183,84 @@ class TestHybridRetrieve:
 
         assert len(results) == 1
         assert results[0]["id"] == "c1"
+
+
+class TestVectorScoring:
+    def test_matches_per_row_cosine(self):
+        from app.core.rag import _cosine_scores, _stack_vectors
+
+        rng = np.random.default_rng(0)
+        vecs = rng.normal(size=(6, 8)).astype(np.float32)
+        rows = [{"vector": v.tobytes(), "dim": 8, "norm": float(np.linalg.norm(v))} for v in vecs]
+        # A float16 row mixed in, as after a partial re-index
+        rows[2]["vector"] = vecs[2].astype(np.float16).tobytes()
+        # And one already stored unit-normalized
+        rows[4]["vector"] = (vecs[4] / np.linalg.norm(vecs[4])).tobytes()
+        rows[4]["norm"] = 1.0
+        query = rng.normal(size=8).astype(np.float32)
+        qn = float(np.linalg.norm(query))
+
+        matrix = _stack_vectors(rows)
+        np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-2)
+        scores = _cosine_scores(matrix, query)
+        expected = [float(np.dot(query, v) / (qn * np.linalg.norm(v))) for v in vecs]
+        np.testing.assert_allclose(scores, expected, rtol=1e-2)
+
+    def test_empty_rows(self):
+        from app.core.rag import _cosine_scores, _stack_vectors
+
+        assert _cosine_scores(_stack_vectors([]), np.ones(4, dtype=np.float32)).size == 0
+
+    def test_top_indices_match_stable_sort(self):
+        from app.core.rag import _top_indices
+
+        rng = np.random.default_rng(1)
+        scores = rng.integers(0, 5, size=200).astype(np.float32)  # many ties
+        full = np.argsort(-scores, kind="stable")
+        for k in (0, 1, 7, 50, 200, 500):
+            np.testing.assert_array_equal(_top_indices(scores, k), full[:k])
+
+
+class TestChunkStoreCache:
+    def _rows(self):
+        v = np.array([1, 0, 0, 0], dtype=np.float32)
+        return [{"id": "c1", "chunk_index": 0, "text": "t", "vector": v.tobytes(), "dim": 4, "norm": 1.0}]
+
+    def _retrieve(self, version):
+        from app.core.rag import retrieve
+
+        with patch("app.core.rag.get_chunks", return_value=self._rows()) as get_chunks, \
+             patch("app.core.rag.keyword_search_chunks", return_value=[]), \
+             patch("app.core.rag.pick_provider") as mock_pick:
+            mock_pick.return_value.embed_texts.return_value = [[1.0, 0.0, 0.0, 0.0]]
+            results = retrieve("agent-store", "q", top_k=1, version=version)
+        return results, get_chunks
+
+    def test_versioned_store_is_reused(self):
+        from app.core.rag import _stores
+
+        _stores.clear()
+        _, first = self._retrieve("v1")
+        results, second = self._retrieve("v1")
+        assert first.call_count == 1
+        assert second.call_count == 0
+        assert results[0]["id"] == "c1"
+        _, third = self._retrieve("v2")
+        assert third.call_count == 1
+        _stores.clear()
+
+    def test_unversioned_reads_every_time(self):
+        from app.core.rag import _stores
+
+        _stores.clear()
+        self._retrieve(None)
+        _, again = self._retrieve(None)
+        assert again.call_count == 1
+
+    def test_index_version(self):
+        from app.core.rag import index_version
+
+        assert index_version({"index_id": "abc", "content_hash": "h"}) == "abc"
+        assert index_version({"content_hash": "h", "embed_model": "m", "chunk_count": 3}) == "h:m:3"
+        assert index_version({}) is None
+        assert index_version(None) is None
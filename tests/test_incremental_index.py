@@ -6,7 +6,14 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from app.core.indexer import _content_hash, index_text
+from app.core.indexer import _content_hash, index_text, schedule_questions
+
+
+@pytest.fixture(autouse=True)
+def no_embedding_cache():
+    with patch("app.core.embed_cache.get_cached_embeddings", return_value={}), \
+         patch("app.core.embed_cache.put_cached_embeddings"):
+        yield
 
 
 class TestContentHash:
@@ -54,6 +61,7 @@ class TestIndexTextSkip:
              patch("app.core.indexer.pick_provider", return_value=mock_embedder), \
              patch("app.core.indexer.add_chunks"), \
              patch("app.core.indexer.generate_questions", return_value=[]), \
+             patch("app.core.indexer._DEFER_QUESTIONS", False), \
              patch("app.core.indexer.update_agent_status"), \
              patch("app.core.indexer.chunk_text", return_value=["chunk1"]):
             result = index_text("agent1", "new content")
@@ -75,6 +83,7 @@ class TestIndexTextSkip:
              patch("app.core.indexer.pick_provider", return_value=mock_embedder), \
              patch("app.core.indexer.add_chunks"), \
              patch("app.core.indexer.generate_questions", return_value=[]), \
+             patch("app.core.indexer._DEFER_QUESTIONS", False), \
              patch("app.core.indexer.update_agent_status"), \
              patch("app.core.indexer.chunk_text", return_value=["chunk1"]):
             result = index_text("agent1", text, force=True)
@@ -94,9 +103,123 @@ class TestIndexTextSkip:
              patch("app.core.indexer.pick_provider", return_value=mock_embedder), \
              patch("app.core.indexer.add_chunks"), \
              patch("app.core.indexer.generate_questions", return_value=[]), \
+             patch("app.core.indexer._DEFER_QUESTIONS", False), \
              patch("app.core.indexer.update_agent_status"), \
              patch("app.core.indexer.chunk_text", return_value=["chunk1"]):
             result = index_text("agent1", "new book text")
 
         assert "skipped" not in result
         assert "content_hash" in result
+
+
+class TestQuestionDeferral:
+    def _index(self, defer: bool):
+        mock_embedder = MagicMock()
+        mock_embedder.name = "test"
+        mock_embedder.embed_texts.return_value = [[0.1, 0.2, 0.3]]
+        pool = MagicMock()
+        with patch("app.core.indexer.get_agent", return_value=None), \
+             patch("app.core.indexer.pick_provider", return_value=mock_embedder), \
+             patch("app.core.indexer.add_chunks"), \
+             patch("app.core.indexer.generate_questions", return_value=["Q?"]) as gen, \
+             patch("app.core.indexer.update_agent_status") as status, \
+             patch("app.core.indexer.chunk_text", return_value=["chunk1"]), \
+             patch("app.core.indexer._DEFER_QUESTIONS", defer), \
+             patch("app.core.indexer._questions_pool", pool):
+            result = index_text("agent1", "book text")
+        return result, gen, status, pool
+
+    def test_deferred_questions_do_not_block_ready(self):
+        result, gen, status, pool = self._index(defer=True)
+        gen.assert_not_called()
+        assert "questions" not in result
+        assert status.call_args[0][1] == "ready"
+        pool.submit.assert_called_once()
+
+    def test_inline_questions_when_not_deferred(self):
+        result, gen, _, pool = self._index(defer=False)
+        assert result["questions"] == ["Q?"]
+        pool.submit.assert_not_called()
+
+    def test_job_is_submitted_after_meta_is_written(self):
+        calls = MagicMock()
+        mock_embedder = MagicMock()
+        mock_embedder.name = "test"
+        mock_embedder.embed_texts.return_value = [[0.1, 0.2, 0.3]]
+        with patch("app.core.indexer.get_agent", return_value=None), \
+             patch("app.core.indexer.pick_provider", return_value=mock_embedder), \
+             patch("app.core.indexer.add_chunks"), \
+             patch("app.core.indexer.update_agent_status", calls.status), \
+             patch("app.core.indexer.chunk_text", return_value=["chunk1"]), \
+             patch("app.core.indexer._DEFER_QUESTIONS", True), \
+             patch("app.core.indexer._questions_pool", calls.pool):
+            index_text("agent1", "book text")
+        assert [c[0] for c in calls.mock_calls] == ["status", "pool.submit"]
+
+    def test_caller_schedules_when_it_writes_meta(self):
+        pool = MagicMock()
+        mock_embedder = MagicMock()
+        mock_embedder.name = "test"
+        mock_embedder.embed_texts.return_value = [[0.1, 0.2, 0.3]]
+        with patch("app.core.indexer.get_agent", return_value=None), \
+             patch("app.core.indexer.pick_provider", return_value=mock_embedder), \
+             patch("app.core.indexer.add_chunks"), \
+             patch("app.core.indexer.update_agent_status") as status, \
+             patch("app.core.indexer.chunk_text", return_value=["chunk1"]), \
+             patch("app.core.indexer._DEFER_QUESTIONS", True), \
+             patch("app.core.indexer._questions_pool", pool):
+            index_text("agent1", "book text", update_status=False)
+            status.assert_not_called()
+            pool.submit.assert_not_called()
+            schedule_questions("agent1", "book text")
+        pool.submit.assert_called_once()
+
+    def test_background_job_merges_questions_into_meta(self):
+        from app.core.indexer import _generate_questions_later
+
+        with patch("app.core.indexer.generate_questions", return_value=["Q?"]), \
+             patch("app.core.indexer.update_agent_meta") as update_meta:
+            _generate_questions_later("agent1", "book text")
+        update_meta.assert_called_once_with("agent1", {"questions": ["Q?"]})
+
+
+class TestVectorPacking:
+    def test_rows_are_float16_and_decode(self):
+        import numpy as np
+        from app.core.indexer import _vector_rows
+        from app.core.rag import _bytes_to_vector
+
+        rows = _vector_rows([[3.0, 4.0, 0.0], [0.0, 0.0, 0.0]])
+        blob, dim, norm = rows[0]
+        assert dim == 3
+        assert len(blob) == 3 * 2
+        assert norm == 1.0
+        assert rows[1][2] == 1.0
+        np.testing.assert_allclose(_bytes_to_vector(blob, dim), [0.6, 0.8, 0.0], rtol=1e-3)
+        np.testing.assert_array_equal(_bytes_to_vector(rows[1][0], dim), [0.0, 0.0, 0.0])
+
+    def test_int8_rows_recover_cosine(self):
+        import numpy as np
+        from app.core.indexer import _vector_rows
+        from app.core.rag import _stack_vectors
+
+        vecs = np.random.default_rng(0).normal(size=(5, 64)).astype(np.float32)
+        vecs[4] = 0.0
+        with patch("app.core.indexer.VECTOR_STORAGE", "int8"):
+            rows = _vector_rows(vecs.tolist())
+        assert all(len(blob) == 64 for blob, _, _ in rows)
+        assert rows[4][2] == 0.0
+
+        matrix = _stack_vectors([{"vector": b, "dim": d, "norm": n} for b, d, n in rows])
+        unit = vecs[:4] / np.linalg.norm(vecs[:4], axis=1, keepdims=True)
+        np.testing.assert_allclose(matrix[:4] @ unit.T, unit @ unit.T, atol=0.02)
+        np.testing.assert_array_equal(matrix[4], 0.0)
+
+    def test_legacy_float32_rows_still_decode(self):
+        import numpy as np
+        from app.core.rag import _bytes_to_vector
+
+        blob = np.array([0.25, -0.5], dtype=np.float32).tobytes()
+        vec = _bytes_to_vector(blob, 2)
+        assert vec.dtype == np.float32
+        np.testing.assert_allclose(vec, [0.25, -0.5])
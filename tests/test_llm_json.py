@@ -0,0 +1,31 @@
+"""Tests for lenient LLM JSON parsing in main.py."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.main import _parse_llm_json
+
+
+class TestParseLlmJson:
+    def test_plain_json(self):
+        assert _parse_llm_json('[{"title": "Dune"}]') == [{"title": "Dune"}]
+
+    def test_code_fence(self):
+        text = '```json\n{"Physics": [{"title": "QED"}]}\n```'
+        assert _parse_llm_json(text) == {"Physics": [{"title": "QED"}]}
+
+    def test_surrounding_prose(self):
+        text = 'Here are the books:\n[{"title": "Emma"}, {"title": "Persuasion"}]\nEnjoy!'
+        assert _parse_llm_json(text) == [{"title": "Emma"}, {"title": "Persuasion"}]
+
+    def test_outermost_container_wins(self):
+        assert _parse_llm_json('Note {"books": ["a", "b"]} end') == {"books": ["a", "b"]}
+
+    def test_no_json_raises(self):
+        with pytest.raises(ValueError):
+            _parse_llm_json("I couldn't find any books.")
+
+    def test_truncated_json_raises(self):
+        with pytest.raises(ValueError):
+            _parse_llm_json('[{"title": "Dune"')
@@ -128,9 +128,12 @@ class TestMultiQueryInRetrieveCrossBook:
              patch("app.core.rag._expand_query", return_value=["alternative query"]) as mock_expand, \
              patch("app.core.rag.pick_provider") as mock_pick:
             mock_provider = mock_pick.return_value
-            mock_provider.embed_texts.return_value = [[float(x) for x in query_dir]]
+            mock_provider.embed_texts.side_effect = lambda texts, **kw: [[float(x) for x in query_dir]] * len(texts)
 
             results = retrieve_cross_book("test", top_k=5, expand=True)
 
         mock_expand.assert_called_once_with("test")
+        # Original and expanded queries are embedded in one request
+        mock_provider.embed_texts.assert_called_once()
+        assert mock_provider.embed_texts.call_args.args[0] == ["test", "alternative query"]
         assert len(results) <= 5
@@ -0,0 +1,97 @@
+"""Tests for PDF text extraction in text_utils.py."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from app.core import text_utils
+from app.core.text_utils import extract_text_from_file
+
+
+def _fake_pages(path: str, start: int, stop: int) -> list[str]:
+    return [f"page {i}" for i in range(start, stop)]
+
+
+def _text_pdf(path, words: list[str]) -> None:
+    """Write a PDF with one Helvetica word per page."""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for word in words:
+        page = writer.add_blank_page(width=200, height=200)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 20 100 Td ({word}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+    with path.open("wb") as fh:
+        writer.write(fh)
+
+
+class TestExtractPdf:
+    def test_pdfium_reads_pages(self, tmp_path):
+        path = tmp_path / "book.pdf"
+        _text_pdf(path, ["alpha", "beta"])
+        with patch.object(text_utils, "PdfReader", side_effect=AssertionError("pypdf used")):
+            assert text_utils._read_pdf_pages(str(path), 0, 2) == ["alpha", "beta"]
+            assert text_utils._pdf_page_count(str(path)) == 2
+
+    def test_pypdf_reads_pages_without_pdfium(self, tmp_path):
+        path = tmp_path / "book.pdf"
+        _text_pdf(path, ["alpha", "beta"])
+        with patch.dict("sys.modules", {"pypdfium2": None}):
+            assert extract_text_from_file(path) == "alpha beta"
+
+    def test_blank_pdf_reads_through_fallback(self, tmp_path):
+        path = tmp_path / "blank.pdf"
+        writer = PdfWriter()
+        writer.add_blank_page(width=72, height=72)
+        with path.open("wb") as fh:
+            writer.write(fh)
+        assert extract_text_from_file(path) == ""
+
+    def test_short_pdf_extracts_sequentially(self, tmp_path):
+        with patch.object(text_utils, "_pdf_page_count", return_value=3), \
+             patch.object(text_utils, "_read_pdf_pages", side_effect=_fake_pages) as read, \
+             patch.object(text_utils, "_get_pdf_pool") as pool:
+            text = text_utils._extract_pdf(tmp_path / "book.pdf")
+        assert text == "page 0\npage 1\npage 2"
+        read.assert_called_once()
+        pool.assert_not_called()
+
+    def test_long_pdf_splits_ranges_in_order(self, tmp_path):
+        count = 130
+        with patch.object(text_utils, "_pdf_page_count", return_value=count), \
+             patch.object(text_utils, "_read_pdf_pages", side_effect=_fake_pages), \
+             patch.object(text_utils, "IS_SERVERLESS", False), \
+             patch.object(text_utils.os, "cpu_count", return_value=4), \
+             patch.object(text_utils, "_get_pdf_pool", side_effect=ThreadPoolExecutor) as pool:
+            text = text_utils._extract_pdf(tmp_path / "book.pdf")
+        assert text.split("\n") == [f"page {i}" for i in range(count)]
+        pool.assert_called_once_with(4)
+
+    def test_pool_failure_falls_back_to_sequential(self, tmp_path):
+        with patch.object(text_utils, "_pdf_page_count", return_value=100), \
+             patch.object(text_utils, "_read_pdf_pages", side_effect=_fake_pages), \
+             patch.object(text_utils, "IS_SERVERLESS", False), \
+             patch.object(text_utils.os, "cpu_count", return_value=4), \
+             patch.object(text_utils, "_get_pdf_pool", side_effect=OSError("no spawn")):
+            text = text_utils._extract_pdf(tmp_path / "book.pdf")
+        assert text.split("\n") == [f"page {i}" for i in range(100)]
+
+    def test_pool_is_shared_and_spawns_workers(self):
+        try:
+            pool = text_utils._get_pdf_pool(2)
+            assert text_utils._get_pdf_pool(2) is pool
+            assert pool._mp_context.get_start_method() == "spawn"
+        finally:
+            text_utils._discard_pdf_pool()
+        assert text_utils._pdf_pool is None
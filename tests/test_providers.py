@@ -0,0 +1,298 @@
+"""Tests for provider request shaping."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import orjson
+import pytest
+
+from app.core.providers import (
+    AnthropicProvider,
+    BaseProvider,
+    ChatResult,
+    GeminiProvider,
+    OpenAICompatibleProvider,
+    ProviderError,
+    achat_with_fallback,
+    chat_stream_with_fallback,
+    chat_with_fallback,
+)
+
+
+class TestOpenAIEmbedBatching:
+    def test_large_inputs_are_split_and_reordered(self):
+        provider = OpenAICompatibleProvider("openai", "k", "https://x", "chat", "embed")
+        texts = [f"t{i}" for i in range(600)]
+
+        def fake_post(path, payload, timeout=None):
+            items = [{"index": i, "embedding": [float(t[1:])]} for i, t in enumerate(payload["input"])]
+            return {"data": list(reversed(items))}
+
+        with patch.object(provider, "_post", side_effect=fake_post) as post, \
+             patch("app.core.providers._OPENAI_EMBED_BATCH", 256):
+            vectors = provider.embed_texts(texts)
+
+        assert [len(c.args[1]["input"]) for c in post.call_args_list] == [256, 256, 88]
+        assert vectors == [[float(i)] for i in range(600)]
+
+
+def _sse_client(chunks: list[bytes], status: int = 200, seen: list | None = None) -> httpx.Client:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if seen is not None:
+            seen.append(request)
+        return httpx.Response(status, content=iter(chunks))
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+class TestChatStream:
+    def test_openai_deltas_split_across_reads(self):
+        provider = OpenAICompatibleProvider("openai", "k", "https://x", "chat")
+        seen: list = []
+        chunks = [
+            b'data: {"choices":[{"delta":{"role":"assistant"}}]}\n\ndata: {"choi',
+            b'ces":[{"delta":{"content":"Hel"}}]}\n\n',
+            b'data: {"choices":[{"delta":{"content":"lo"}}]}\n\ndata: [DONE]\n\n',
+        ]
+        with patch("app.core.providers.get_client", return_value=_sse_client(chunks, seen=seen)):
+            assert list(provider.chat_stream("sys", "hi")) == ["Hel", "lo"]
+        assert orjson.loads(seen[0].content)["stream"] is True
+
+    def test_anthropic_text_deltas(self):
+        provider = AnthropicProvider("k", "https://x", "model")
+        chunks = [
+            b'event: message_start\ndata: {"type":"message_start"}\n\n',
+            b'event: content_block_delta\ndata: {"type":"content_block_delta","delta":{"type":"text_delta","text":"Hi"}}\n\n',
+            b'event: message_stop\ndata: {"type":"message_stop"}\n\n',
+        ]
+        with patch("app.core.providers.get_client", return_value=_sse_client(chunks)):
+            assert list(provider.chat_stream("sys", "hi")) == ["Hi"]
+
+    def test_gemini_rotates_key_before_first_chunk(self):
+        provider = GeminiProvider(["bad", "good"], "https://x", "model", "embed")
+        calls: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.headers["x-goog-api-key"])
+            if request.headers["x-goog-api-key"] == "bad":
+                return httpx.Response(429, content=b"quota")
+            body = b'data: {"candidates":[{"content":{"parts":[{"text":"ok"}]}}]}\n\n'
+            return httpx.Response(200, content=body)
+
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        with patch("app.core.providers.get_client", return_value=client):
+            assert list(provider.chat_stream("sys", "hi")) == ["ok"]
+        assert calls == ["bad", "good"]
+
+    def test_error_status_raises_provider_error(self):
+        provider = OpenAICompatibleProvider("openai", "k", "https://x", "chat")
+        with patch("app.core.providers.get_client", return_value=_sse_client([b"nope"], status=500)):
+            with pytest.raises(ProviderError, match="500"):
+                list(provider.chat_stream("sys", "hi"))
+
+    def test_fallback_skips_provider_failing_before_output(self):
+        broken = OpenAICompatibleProvider("openai", "k", "https://x", "chat")
+        working = OpenAICompatibleProvider("deepseek", "k", "https://y", "chat")
+        with patch.object(broken, "chat_stream", side_effect=ProviderError("down")), \
+             patch.object(working, "chat_stream", return_value=iter(["a", "b"])), \
+             patch("app.core.providers.get_provider", side_effect=[broken, working]):
+            fragments = list(chat_stream_with_fallback("sys", "hi", provider_order=["openai", "deepseek"]))
+        assert fragments == ["a", "b"]
+
+    def test_non_streaming_provider_yields_whole_reply(self):
+        class Plain(BaseProvider):
+            name = "plain"
+
+            def chat(self, system, user, history=None, use_grounding=False, timeout=None):
+                return ChatResult(content="whole reply", raw={})
+
+        assert list(Plain().chat_stream("sys", "hi")) == ["whole reply"]
+
+
+class TestProviderReuse:
+    def test_same_instance_until_settings_change(self):
+        from app.core.providers import get_provider
+
+        with patch("app.core.config.OPENAI_API_KEY", "k1"):
+            first = get_provider("openai")
+            assert get_provider("OpenAI") is first
+        with patch("app.core.config.OPENAI_API_KEY", "k2"):
+            changed = get_provider("openai")
+        assert changed is not first
+        assert changed.api_key == "k2"
+
+    def test_gemini_key_list_is_part_of_the_key(self):
+        from app.core.providers import get_provider
+
+        with patch("app.core.config.GEMINI_API_KEYS", ["a"]):
+            one = get_provider("gemini")
+        with patch("app.core.config.GEMINI_API_KEYS", ["a", "b"]):
+            two = get_provider("gemini")
+        assert one.api_keys == ["a"] and two.api_keys == ["a", "b"]
+
+    def test_unknown_provider(self):
+        from app.core.providers import get_provider
+
+        with pytest.raises(ProviderError):
+            get_provider("nope")
+
+
+class TestJsonMode:
+    def test_gemini_requests_json_output(self):
+        provider = GeminiProvider(["k"], "https://x", "model", "embed")
+        assert provider._grounded_payload("sys", "q", False, json_mode=True)["generationConfig"] == {
+            "responseMimeType": "application/json",
+        }
+        assert "generationConfig" not in provider._grounded_payload("sys", "q", False)
+        # Grounding tools and JSON output can't be combined; grounding wins.
+        grounded = provider._grounded_payload("sys", "q", True, json_mode=True)
+        assert "tools" in grounded and "generationConfig" not in grounded
+
+    def test_fallback_passes_json_mode_to_gemini_only(self):
+        openai = OpenAICompatibleProvider("openai", "k", "https://x", "chat")
+        gemini = GeminiProvider(["k"], "https://y", "model", "embed")
+        seen: dict[str, dict] = {}
+
+        def fake_chat(provider):
+            def chat(**kwargs):
+                seen[provider.name] = kwargs
+                raise ProviderError("down")
+            return chat
+
+        with patch.object(openai, "chat", fake_chat(openai)), patch.object(gemini, "chat", fake_chat(gemini)), \
+             patch("app.core.providers.get_provider", side_effect=[openai, gemini]):
+            with pytest.raises(ProviderError):
+                chat_with_fallback("sys", "q", provider_order=["openai", "gemini"], json_mode=True)
+        assert "json_mode" not in seen["openai"]
+        assert seen["gemini"]["json_mode"] is True
+
+
+class TestAsyncChat:
+    def _run(self, coro_fn, handler):
+        async def main():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+                with patch("app.core.providers.get_async_client", return_value=client):
+                    return await coro_fn()
+        return asyncio.run(main())
+
+    def test_openai_achat_parses_like_chat(self):
+        provider = OpenAICompatibleProvider("openai", "k", "https://x", "chat")
+        body = {"choices": [{"message": {"content": "hi"}}], "usage": {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4}}
+        result = self._run(lambda: provider.achat("sys", "q"), lambda request: httpx.Response(200, json=body))
+        assert result.content == "hi"
+        assert result.usage.total_tokens == 4
+
+    def test_gemini_achat_rotates_keys(self):
+        provider = GeminiProvider(["bad", "good"], "https://x", "model", "embed")
+        body = {"candidates": [{"content": {"parts": [{"text": "ok"}]}}]}
+
+        def handler(request):
+            if request.headers["x-goog-api-key"] == "bad":
+                return httpx.Response(429, text="quota")
+            return httpx.Response(200, json=body)
+
+        assert self._run(lambda: provider.achat("sys", "q"), handler).content == "ok"
+
+    def test_anthropic_marks_system_prompt_cacheable(self):
+        provider = AnthropicProvider("k", "https://x", "model")
+        seen: list[httpx.Request] = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={"content": [{"type": "text", "text": "hi"}]})
+
+        assert self._run(lambda: provider.achat("sys", "q"), handler).content == "hi"
+        assert orjson.loads(seen[0].content)["system"] == [
+            {"type": "text", "text": "sys", "cache_control": {"type": "ephemeral"}},
+        ]
+
+    def test_fallback_moves_to_next_provider(self):
+        broken = OpenAICompatibleProvider("openai", "k", "https://x", "chat")
+        working = OpenAICompatibleProvider("deepseek", "k", "https://y", "chat")
+
+        def handler(request):
+            if request.url.host == "x":
+                return httpx.Response(500, text="down")
+            return httpx.Response(200, json={"choices": [{"message": {"content": "from y"}}]})
+
+        with patch("app.core.providers.get_provider", side_effect=[broken, working]):
+            result, used = self._run(
+                lambda: achat_with_fallback("sys", "q", provider_order=["openai", "deepseek"]), handler,
+            )
+        assert result.content == "from y"
+        assert used is working
+
+
+class TestAsyncFallbackTimeouts:
+    def _providers(self, delays: dict[str, float]):
+        providers = []
+        for name, delay in delays.items():
+            provider = OpenAICompatibleProvider(name, "k", f"https://{name}", "chat")
+
+            async def achat(*args, _delay=delay, _name=name, **kwargs):
+                await asyncio.sleep(_delay)
+                return ChatResult(content=_name, raw={})
+
+            provider.achat = achat
+            providers.append(provider)
+        return providers
+
+    def test_slow_provider_is_abandoned_for_the_next(self):
+        slow, fast = self._providers({"slow": 5, "fast": 0})
+        with patch("app.core.providers.get_provider", side_effect=[slow, fast]), \
+             patch("app.core.config.CHAT_REQUEST_TIMEOUT", 0.05):
+            result, used = asyncio.run(achat_with_fallback("sys", "q", provider_order=["slow", "fast"]))
+        assert used is fast
+        assert result.content == "fast"
+
+    def test_all_timeouts_raise_timeout_error(self):
+        providers = self._providers({"a": 5, "b": 5})
+        with patch("app.core.providers.get_provider", side_effect=providers), \
+             patch("app.core.config.CHAT_REQUEST_TIMEOUT", 0.05):
+            with pytest.raises(TimeoutError):
+                asyncio.run(achat_with_fallback("sys", "q", provider_order=["a", "b"]))
+
+    def test_slow_provider_fails_over_within_budget(self):
+        import time
+
+        slow, fast = self._providers({"slow": 5, "fast": 0})
+        with patch("app.core.providers.get_provider", side_effect=[slow, fast]), \
+             patch("app.core.config.CHAT_REQUEST_TIMEOUT", 0.1):
+            start = time.monotonic()
+            result, used = asyncio.run(achat_with_fallback("sys", "q", provider_order=["slow", "fast"]))
+            elapsed = time.monotonic() - start
+        assert used is fast
+        assert elapsed < 0.5
+
+    def test_grounded_attempt_gets_its_own_budget(self):
+        gemini = GeminiProvider(["k"], "https://gemini", "chat", "embed")
+
+        async def achat(*args, **kwargs):
+            await asyncio.sleep(0.2)
+            return ChatResult(content="grounded", raw={})
+
+        gemini.achat = achat
+        with patch("app.core.providers.get_provider", return_value=gemini), \
+             patch("app.core.config.CHAT_REQUEST_TIMEOUT", 0.05), \
+             patch("app.core.config.CHAT_GROUNDED_TIMEOUT", 1):
+            result, _ = asyncio.run(achat_with_fallback("sys", "q", use_grounding=True, provider_order=["gemini"]))
+            assert result.content == "grounded"
+            with pytest.raises(TimeoutError):
+                asyncio.run(achat_with_fallback("sys", "q", provider_order=["gemini"]))
+
+    def test_zero_budget_waits_for_http_timeout(self):
+        (slow,) = self._providers({"slow": 0.2})
+        with patch("app.core.providers.get_provider", return_value=slow), \
+             patch("app.core.config.CHAT_REQUEST_TIMEOUT", 0), \
+             patch("app.core.providers._CHAT_TIMEOUT", 1):
+            result, used = asyncio.run(achat_with_fallback("sys", "q", provider_order=["slow"]))
+        assert used is slow
+        (slow,) = self._providers({"slow": 0.2})
+        with patch("app.core.providers.get_provider", return_value=slow), \
+             patch("app.core.config.CHAT_REQUEST_TIMEOUT", 0), \
+             patch("app.core.providers._CHAT_TIMEOUT", 0.05):
+            with pytest.raises(TimeoutError):
+                asyncio.run(achat_with_fallback("sys", "q", provider_order=["slow"]))
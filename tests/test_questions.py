@@ -0,0 +1,27 @@
+"""Tests for study question generation."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from app.core.providers import ChatResult
+from app.core.questions import generate_questions
+
+
+def _generate(llm_output: str) -> list[str]:
+    with patch("app.core.questions.list_questions", return_value=[]), \
+         patch("app.core.questions.add_questions"), \
+         patch("app.core.questions.pick_provider"), \
+         patch("app.core.questions.cached_chat", return_value=ChatResult(content=llm_output, raw={})):
+        return generate_questions("agent1", "sample text", count=4)
+
+
+class TestGenerateQuestions:
+    def test_strips_numbering_and_crlf(self):
+        out = "1. What is it?\r\n2) Why now?\r\n\r\n3 - How so?\r\n- Who cares?\r\n5. Extra?"
+        assert _generate(out) == ["What is it?", "Why now?", "How so?", "Who cares?"]
+
+    def test_keeps_leading_numbers_that_are_not_numbering(self):
+        assert _generate("1984 and Brave New World: which is closer?") == [
+            "1984 and Brave New World: which is closer?"
+        ]
@@ -0,0 +1,78 @@
+"""Tests for batched recommendation processing in main.py."""
+
+from __future__ import annotations
+
+import queue
+import threading
+from unittest.mock import patch
+
+from fastapi import BackgroundTasks
+
+from app import main
+from app.core import db
+
+
+def _reply(*titles: str) -> str:
+    return "You might enjoy " + " and ".join(f'"{t}" by Someone' for t in titles) + "."
+
+
+class TestProcessRecommendations:
+    def test_batch_shares_one_bulk_create(self, fresh_db):
+        texts = [_reply("Dune", "Emma"), _reply("dune", "Ulysses"), _reply("Middlemarch", "Beloved", "Persuasion", "Hamlet")]
+        with patch("app.main.create_catalog_agents_bulk", wraps=db.create_catalog_agents_bulk) as create:
+            main._process_recommendations(texts)
+        create.assert_called_once()
+        titles = [b["title"] for b in create.call_args[0][0]]
+        # Case-insensitive dedupe across texts, at most three titles per text.
+        assert titles == ["Dune", "Emma", "Ulysses", "Middlemarch", "Beloved", "Persuasion"]
+        assert sorted(a["name"] for a in db.list_agents(limit=100)) == sorted(titles)
+
+
+class TestRecommendationQueue:
+    def test_drain_collects_queued_texts_up_to_the_cap(self):
+        q: queue.Queue[str] = queue.Queue()
+        for i in range(5):
+            q.put_nowait(f"t{i}")
+        with patch("app.main._rec_queue", q), patch("app.main._REC_BATCH_MAX", 4):
+            assert main._drain_recommendations("first") == ["first", "t0", "t1", "t2"]
+        assert q.qsize() == 2
+
+    def test_drain_stops_when_the_window_closes(self):
+        with patch("app.main._rec_queue", queue.Queue()), patch("app.main._REC_BATCH_WINDOW", 0.01):
+            assert main._drain_recommendations("first") == ["first"]
+
+    def test_worker_processes_queued_replies_in_one_batch(self):
+        q: queue.Queue[str] = queue.Queue()
+        stop, running = threading.Event(), threading.Event()
+        with patch("app.main._rec_queue", q), patch("app.main._rec_stop", stop), \
+             patch("app.main._rec_worker_running", running), \
+             patch("app.main._process_recommendations") as process:
+            for i in range(10):
+                q.put_nowait(_reply(f"Book {i}"))
+            worker = threading.Thread(target=main._recommendation_loop, daemon=True)
+            worker.start()
+            while process.call_count == 0:
+                worker.join(0.01)
+            stop.set()
+            worker.join(2)
+        assert not worker.is_alive()
+        assert not running.is_set()
+        assert process.call_count == 1
+        assert len(process.call_args[0][0]) == 10
+
+    def test_schedule_queues_while_the_worker_runs(self):
+        q: queue.Queue[str] = queue.Queue()
+        running = threading.Event()
+        running.set()
+        tasks = BackgroundTasks()
+        with patch("app.main._rec_queue", q), patch("app.main._rec_worker_running", running):
+            main._schedule_recommendations(tasks, _reply("Dune"))
+        assert q.get_nowait() == _reply("Dune")
+        assert not tasks.tasks
+
+    def test_schedule_falls_back_to_a_background_task(self):
+        tasks = BackgroundTasks()
+        with patch("app.main._rec_worker_running", threading.Event()):
+            main._schedule_recommendations(tasks, _reply("Dune"))
+        assert len(tasks.tasks) == 1
+        assert tasks.tasks[0].args == ([_reply("Dune")],)
@@ -0,0 +1,136 @@
+"""Tests for the skill chain's RAG quality gate in skills.py."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from app.core.skills import resolve_skills
+
+AGENT = {
+    "id": "agent1", "name": "Book", "type": "catalog", "status": "ready",
+    "meta": {"title": "Book", "author": "Author"},
+}
+UPLOAD = {"id": "agent2", "name": "notes.pdf", "type": "upload", "source": "notes.pdf", "status": "ready", "meta": {}}
+
+
+def _chunks(score: float) -> list[dict]:
+    return [{"id": "c1", "chunk_index": 0, "text": "passage", "score": 0.03, "vector_score": score}]
+
+
+@pytest.fixture
+def min_score():
+    with patch("app.core.skills.config.RAG_MIN_SCORE", 0.3):
+        yield
+
+
+@pytest.mark.usefixtures("min_score")
+class TestRagScoreGate:
+    def test_strong_rag_skips_content_fetch(self):
+        with patch("app.core.skills.retrieve", return_value=_chunks(0.7)), \
+             patch("app.core.skills.fetch_book_content") as fetch:
+            result = resolve_skills(AGENT, "q")
+        assert result.skill_name == "rag"
+        assert result.metadata["max_score"] == 0.7
+        fetch.assert_not_called()
+
+    def test_weak_rag_prefers_fetched_content(self):
+        with patch("app.core.skills.retrieve", return_value=_chunks(0.1)), \
+             patch("app.core.skills.fetch_book_content", return_value="summary") as fetch:
+            result = resolve_skills(AGENT, "q")
+        assert result.skill_name == "content_fetch"
+        fetch.assert_called_once()
+
+    def test_weak_rag_beats_generic_fallbacks(self):
+        with patch("app.core.skills.retrieve", return_value=_chunks(0.1)), \
+             patch("app.core.skills.fetch_book_content", return_value=""), \
+             patch("app.core.skills.config.GEMINI_API_KEY", "key"):
+            result = resolve_skills(AGENT, "q")
+        assert result.skill_name == "rag"
+
+    def test_threshold_is_configurable(self):
+        with patch("app.core.skills.retrieve", return_value=_chunks(0.1)), \
+             patch("app.core.skills.fetch_book_content") as fetch, \
+             patch("app.core.skills.config.RAG_MIN_SCORE", 0.05):
+            result = resolve_skills(AGENT, "q")
+        assert result.skill_name == "rag"
+        fetch.assert_not_called()
+
+    def test_uploads_are_not_gated(self):
+        with patch("app.core.skills.retrieve", return_value=_chunks(0.1)), \
+             patch("app.core.skills.fetch_book_content", return_value="summary") as fetch:
+            result = resolve_skills(UPLOAD, "q")
+        assert result.skill_name == "rag"
+        fetch.assert_not_called()
+
+    def test_catalog_book_without_author_is_not_gated(self):
+        agent = {**AGENT, "meta": {"title": "Book"}}
+        with patch("app.core.skills.retrieve", return_value=_chunks(0.1)), \
+             patch("app.core.skills.fetch_book_content", return_value="summary") as fetch:
+            result = resolve_skills(agent, "q")
+        assert result.skill_name == "rag"
+        fetch.assert_not_called()
+
+
+class TestRagScoreGateDefault:
+    def test_catalog_book_skips_rag_below_default_threshold(self):
+        from app.core import config
+
+        assert config.RAG_MIN_SCORE > 0
+        below = config.RAG_MIN_SCORE - 0.05
+        with patch("app.core.skills.retrieve", return_value=_chunks(below)), \
+             patch("app.core.skills.fetch_book_content", return_value="summary") as fetch:
+            result = resolve_skills(AGENT, "q")
+        assert result.skill_name == "content_fetch"
+        fetch.assert_called_once()
+
+    def test_catalog_book_keeps_rag_at_default_threshold(self):
+        from app.core import config
+
+        with patch("app.core.skills.retrieve", return_value=_chunks(config.RAG_MIN_SCORE)), \
+             patch("app.core.skills.fetch_book_content") as fetch:
+            result = resolve_skills(AGENT, "q")
+        assert result.skill_name == "rag"
+        fetch.assert_not_called()
+
+    def test_zero_disables_the_gate(self):
+        with patch("app.core.skills.retrieve", return_value=_chunks(0.1)), \
+             patch("app.core.skills.fetch_book_content") as fetch, \
+             patch("app.core.skills.config.RAG_MIN_SCORE", 0):
+            result = resolve_skills(AGENT, "q")
+        assert result.skill_name == "rag"
+        fetch.assert_not_called()
+
+
+class TestAsyncResolve:
+    def test_agents_resolve_concurrently(self):
+        import asyncio
+        import time
+
+        from app.core.skills import SkillResult, aresolve_agent_skill
+
+        def slow(agent, query, top_k=None):
+            time.sleep(0.2)
+            return SkillResult(context=agent["id"], skill_name="rag")
+
+        async def fan_out():
+            agents = [{"id": f"a{i}"} for i in range(4)]
+            return await asyncio.gather(*(aresolve_agent_skill(a, "q") for a in agents))
+
+        with patch("app.core.skills.resolve_skills", side_effect=slow):
+            start = time.monotonic()
+            results = asyncio.run(fan_out())
+            elapsed = time.monotonic() - start
+        assert [r.context for r in results] == ["a0", "a1", "a2", "a3"]
+        assert elapsed < 0.6
+
+    def test_failure_resolves_to_empty_result(self):
+        import asyncio
+
+        from app.core.skills import aresolve_agent_skill
+
+        with patch("app.core.skills.resolve_skills", side_effect=RuntimeError("boom")):
+            result = asyncio.run(aresolve_agent_skill(AGENT, "q"))
+        assert result.skill_name == "none"
+        assert result.context == ""
@@ -0,0 +1,85 @@
+"""Tests for book content source orchestration."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import httpx
+
+from app.core import db
+from app.core.sources import _cached_get, fetch_book_content, fetch_wikipedia_summary
+
+OL_TEXT = "Title: Dune by Frank Herbert\n\n" + "Open Library description. " * 10
+GB_TEXT = "Title: Dune\n\nDescription: Google Books description text."
+
+
+def _fetch(ol: str = "", gb: str = "", wiki: str | Exception = ""):
+    wiki_kwargs = {"side_effect": wiki} if isinstance(wiki, Exception) else {"return_value": wiki}
+    with patch("app.core.sources.fetch_open_library_text", return_value=ol), \
+         patch("app.core.sources.fetch_google_books_info", return_value=gb), \
+         patch("app.core.sources.fetch_wikipedia_summary", **wiki_kwargs):
+        return fetch_book_content("Dune", "Frank Herbert")
+
+
+class TestFetchBookContent:
+    def test_open_library_supplemented_by_google_books(self):
+        text = _fetch(ol=OL_TEXT, gb=GB_TEXT, wiki="ignored")
+        assert text == OL_TEXT + "\n\n--- Google Books ---\n\n" + GB_TEXT
+
+    def test_google_books_when_open_library_is_thin(self):
+        assert _fetch(ol="short", gb=GB_TEXT, wiki="ignored") == GB_TEXT
+
+    def test_wikipedia_fallback(self):
+        text = _fetch(wiki="A novel.")
+        assert text == "Title: Dune by Frank Herbert\n\nWikipedia: A novel."
+
+    def test_wikipedia_error_means_no_content(self):
+        assert _fetch(wiki=RuntimeError("down")) == ""
+
+
+class TestHttpCache:
+    URL = "https://en.wikipedia.org/api/rest_v1/page/summary/Dune"
+
+    def _client(self, handler):
+        return patch("app.core.sources.get_client", return_value=httpx.Client(transport=httpx.MockTransport(handler)))
+
+    def test_fresh_entry_skips_network(self, fresh_db):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, content=b'{"extract": "A novel."}', headers={"ETag": '"v1"'})
+
+        with self._client(handler):
+            assert fetch_wikipedia_summary("Dune", lang="en") == "A novel."
+            assert fetch_wikipedia_summary("Dune", lang="en") == "A novel."
+        assert len(calls) == 1
+
+    def test_stale_entry_revalidates_with_etag(self, fresh_db):
+        db.put_http_cache(self.URL, '"v1"', None, b'{"extract": "Cached."}', 0)
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("if-none-match"))
+            return httpx.Response(304)
+
+        with self._client(handler):
+            assert _cached_get(self.URL, timeout=5) == b'{"extract": "Cached."}'
+        assert seen == ['"v1"']
+        assert db.get_http_cache(self.URL)["fetched_at"] > 0
+
+    def test_errors_are_not_cached(self, fresh_db):
+        with self._client(lambda request: httpx.Response(404)):
+            assert _cached_get(self.URL, timeout=5) is None
+        assert db.get_http_cache(self.URL) is None
+
+    def test_store_prunes_long_unused_entries(self, fresh_db):
+        old_url = "https://en.wikipedia.org/api/rest_v1/page/summary/Old"
+        db.put_http_cache(old_url, None, None, b"old", 0)
+        db.put_http_cache(self.URL, None, None, b"recent", 5_000)
+        with self._client(lambda request: httpx.Response(200, content=b"new")), \
+             patch("app.core.sources._HTTP_CACHE_MAX_AGE", 10_000), \
+             patch("app.core.sources.time.time", return_value=12_000):
+            _cached_get("https://en.wikipedia.org/api/rest_v1/page/summary/New", timeout=5)
+        assert db.get_http_cache(old_url) is None
+        assert db.get_http_cache(self.URL)["body"] == b"recent"
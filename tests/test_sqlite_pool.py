@@ -0,0 +1,120 @@
+"""Tests for the pooled SQLite connections behind db.get_conn()."""
+
+from __future__ import annotations
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from app.core import db
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "pool.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.commit()
+    conn.close()
+    with patch("app.core.db.DB_PATH", path), patch("app.core.db._USE_PG", False):
+        yield path
+    db._close_sqlite_pools(str(path))
+
+
+class TestSQLitePool:
+    def test_connection_is_reused(self, db_path):
+        with db.get_conn() as c1:
+            pass
+        with db.get_conn() as c2:
+            pass
+        assert c1 is c2
+
+    def test_nested_borrows_get_distinct_connections(self, db_path):
+        with db.get_conn() as c1:
+            with db.get_conn() as c2:
+                assert c1 is not c2
+
+    def test_commits_on_success(self, db_path):
+        with db.get_conn() as conn:
+            conn.execute("INSERT INTO t (v) VALUES ('kept')")
+        check = sqlite3.connect(db_path)
+        assert check.execute("SELECT v FROM t").fetchall() == [("kept",)]
+        check.close()
+
+    def test_rolls_back_on_error_and_returns_connection(self, db_path):
+        with pytest.raises(RuntimeError):
+            with db.get_conn() as conn:
+                conn.execute("INSERT INTO t (v) VALUES ('dropped')")
+                raise RuntimeError("boom")
+        with db.get_conn() as again:
+            assert again is conn
+            assert again.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+    def test_pragmas_applied(self, db_path):
+        with db.get_conn() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+    def test_busy_timeout_set(self, db_path):
+        with db.get_conn() as conn:
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 8000
+
+
+class TestInitDbJournalMode:
+    def test_init_db_enables_wal(self, tmp_path):
+        path = tmp_path / "wal.db"
+        with patch("app.core.db.DB_PATH", path), \
+             patch("app.core.db.DATA_DIR", tmp_path), \
+             patch("app.core.db._USE_PG", False):
+            db.init_db()
+        try:
+            check = sqlite3.connect(path)
+            assert check.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            check.close()
+        finally:
+            db._close_sqlite_pools(str(path))
+
+
+class TestBeginWrite:
+    def test_begin_write_opens_transaction(self, db_path):
+        with db.get_conn() as conn:
+            db._begin_write(conn)
+            assert conn.in_transaction
+            db._begin_write(conn)  # no-op when already inside one
+            conn.execute("INSERT INTO t (v) VALUES ('x')")
+        assert not conn.in_transaction
+        check = sqlite3.connect(db_path)
+        assert check.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        check.close()
+
+
+class TestReadOnlyConn:
+    def test_sees_committed_writes(self, db_path):
+        with db.get_conn() as conn:
+            conn.execute("INSERT INTO t (v) VALUES ('x')")
+        with db.get_ro_conn() as ro:
+            assert ro.execute("SELECT v FROM t").fetchall()[0][0] == "x"
+
+    def test_rejects_writes(self, db_path):
+        with pytest.raises(sqlite3.OperationalError):
+            with db.get_ro_conn() as ro:
+                ro.execute("INSERT INTO t (v) VALUES ('nope')")
+
+    def test_separate_pool_from_writers(self, db_path):
+        with db.get_ro_conn() as ro:
+            pass
+        with db.get_conn() as rw:
+            assert rw is not ro
+        with db.get_ro_conn() as ro_again:
+            assert ro_again is ro
+
+    def test_missing_database_file_is_created(self, tmp_path):
+        path = tmp_path / "new.db"
+        with patch("app.core.db.DB_PATH", path), patch("app.core.db.DATA_DIR", tmp_path), \
+             patch("app.core.db._USE_PG", False):
+            with db.get_ro_conn() as ro:
+                assert ro.execute("SELECT 1").fetchone()[0] == 1
+            assert db.keyword_search_chunks("anything") == []
+        db._close_sqlite_pools(str(path))
+        assert path.exists()
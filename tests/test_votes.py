@@ -0,0 +1,51 @@
+"""Tests for book-request votes in db.py."""
+
+from __future__ import annotations
+
+import sqlite3
+from unittest.mock import patch
+
+from app.core import db
+
+
+class TestVotes:
+    def test_create_then_repeat_increments_case_insensitively(self, fresh_db):
+        first = db.create_vote("Dune")
+        second = db.create_vote("DUNE")
+        assert first["count"] == 1
+        assert second == {"id": first["id"], "title": "Dune", "count": 2}
+        assert len(db.list_votes()) == 1
+
+    def test_upvote(self, fresh_db):
+        vote = db.create_vote("Emma")
+        assert db.upvote(vote["id"])["count"] == 2
+        assert db.upvote("missing") is None
+
+    def test_init_db_merges_duplicate_titles(self, tmp_path):
+        path = tmp_path / "legacy.db"
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE votes (id TEXT PRIMARY KEY, title TEXT NOT NULL, "
+                     "count INTEGER NOT NULL DEFAULT 1, created_at TEXT NOT NULL)")
+        conn.executemany("INSERT INTO votes VALUES (?, ?, ?, '')",
+                         [("a", "Dune", 2), ("b", "dune", 3), ("c", "Emma", 1)])
+        conn.commit()
+        conn.close()
+        with patch("app.core.db.DB_PATH", path), \
+             patch("app.core.db.DATA_DIR", tmp_path), \
+             patch("app.core.db._USE_PG", False):
+            db.init_db()
+            votes = {v["title"].lower(): v["count"] for v in db.list_votes()}
+        db._close_sqlite_pools(str(path))
+        assert votes == {"dune": 5, "emma": 1}
+
+    def test_votes_still_count_without_unique_index(self, fresh_db):
+        with sqlite3.connect(fresh_db) as conn:
+            conn.execute("DROP INDEX idx_votes_title_lower_u")
+        with patch("app.core.db._votes_title_unique", True):
+            with patch("app.core.db._dedupe_votes", side_effect=RuntimeError("locked")):
+                db.init_db()
+            assert db._votes_title_unique is False
+            first = db.create_vote("Dune")
+            second = db.create_vote("dune")
+        assert second == {"id": first["id"], "title": "Dune", "count": 2}
+        assert len(db.list_votes()) == 1